@@ -1,51 +1,108 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_login import LoginManager
-from flask_jwt_extended import JWTManager
-from flask_cors import CORS
-from config import Config  # Import Config from our config.py file
-from datetime import timedelta
-
-db = SQLAlchemy()
-migrate = Migrate()
-login_manager = LoginManager()
-jwt = JWTManager()
-
-def create_app(config_class=Config):
-    app = Flask(__name__)
-    
-    # Initialize config
-    app.config.from_object(config_class)
-    
-    # JWT Configuration
-    app.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=6)
-    
-    # Initialize extensions
-    db.init_app(app)
-    migrate.init_app(app, db)
-    jwt.init_app(app)
-    CORS(app)
-    
-    # Initialize Flask-Login
-    login_manager.init_app(app)
-    login_manager.login_view = 'auth.login'
-    login_manager.login_message = 'Please log in to access this page.'
-    
-    # User loader for Flask-Login
-    @login_manager.user_loader
-    def load_user(user_id):
-        from app.models.models import User
-        return User.query.get(int(user_id))
-    
-    # Register blueprints
-    from .auth.routes import auth
-    from .dashboard.routes import dashboard
-    from .api.routes import api
-    
-    app.register_blueprint(auth, url_prefix='/auth')
-    app.register_blueprint(dashboard, url_prefix='/dashboard')
-    app.register_blueprint(api, url_prefix='/api')
-    
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
+from flask_login import LoginManager
+from flask_jwt_extended import JWTManager
+from flask_cors import CORS
+from config import Config  # Import Config from our config.py file
+from datetime import timedelta
+
+db = SQLAlchemy()
+migrate = Migrate()
+login_manager = LoginManager()
+jwt = JWTManager()
+
+def create_app(config_class=Config):
+    app = Flask(__name__)
+    
+    # Initialize config
+    app.config.from_object(config_class)
+    
+    # orjson-backed JSON (stdlib fallback), datetimes as ISO-8601
+    from .utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
+    # JWT Configuration
+    app.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=6)
+    
+    # Initialize extensions
+    db.init_app(app)
+    migrate.init_app(app, db)
+    jwt.init_app(app)
+    CORS(app)
+    
+    # Password hashing scheme and cost
+    from .utils.hashing import hasher
+    hasher.init_app(app)
+    
+    # Pooled HTTP client shared by probes, scrapes and integrations
+    from .services.http_client import http_client
+    http_client.init_app(app)
+    
+    # Cache for user_loader / JWT identity lookups
+    from .services.user_cache import user_cache
+    user_cache.init_app(app)
+    
+    # Initialize Flask-Login
+    login_manager.init_app(app)
+    login_manager.login_view = 'auth.login'
+    login_manager.login_message = 'Please log in to access this page.'
+    
+    # User loader for Flask-Login
+    @login_manager.user_loader
+    def load_user(user_id):
+        return user_cache.get_user(user_id)
+    
+    # Compress large JSON responses
+    from .utils.compression import compress_response
+    app.after_request(compress_response)
+    
+    # Install script templates, compiled once
+    from .services.scripts import script_renderer
+    script_renderer.init_app(app)
+    
+    # Register blueprints
+    from .auth.routes import auth
+    from .dashboard.routes import dashboard
+    from .api.routes import api
+    
+    app.register_blueprint(auth, url_prefix='/auth')
+    app.register_blueprint(dashboard, url_prefix='/dashboard')
+    app.register_blueprint(api, url_prefix='/api')
+    
+    # Background services
+    from .services.prober import prober
+    from .services.ingest import scraper
+    from .services.rollup import rollups
+    from .services.audit_log import audit_log
+    audit_log.init_app(app)  # starts on first use, flushes at exit
+    from .services.target_registry import target_registry
+    target_registry.init_app(app)
+    from .services.event_hub import event_hub
+    event_hub.init_app(app)
+    from .services.probe_cache import probe_cache
+    probe_cache.init_app(app)
+    from .services.status_writer import status_writer
+    status_writer.init_app(app)
+    prober.init_app(app)
+    from .services.notifier import notifier
+    notifier.init_app(app)  # sender threads start on first notification
+    from .services.loki import loki
+    loki.init_app(app)
+    from .services.grafana import grafana
+    grafana.init_app(app)
+    from .services.reports import report_queue
+    report_queue.init_app(app)
+    from .services.alerting import alert_engine
+    alert_engine.init_app(app)
+    scraper.init_app(app)
+    rollups.init_app(app)
+    if app.config.get('BACKGROUND_TASKS_ENABLED') and not app.testing:
+        status_writer.start()
+        prober.start()
+        scraper.start()
+        rollups.start()
+        report_queue.start()  # picks up reports queued or stalled before a restart
+    
     return app
\ No newline at end of file
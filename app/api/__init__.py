@@ -1,5 +1,5 @@
-from flask import Blueprint
-
-api = Blueprint('api', __name__)
-
+from flask import Blueprint
+
+api = Blueprint('api', __name__)
+
 from . import routes
\ No newline at end of file
@@ -1,231 +1,743 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.models import Node, User, Alert
-from app import db
-import requests
-from requests.exceptions import RequestException
-import subprocess
-import json
-
-api = Blueprint('api', __name__)
-
-@api.route('/health')
-def health_check():
-    return jsonify({
-        'status': 'healthy',
-        'message': 'API is running'
-    })
-
-@api.route('/nodes', methods=['GET'])
-@jwt_required()
-def get_nodes():
-    try:
-        current_user_id = get_jwt_identity()
-        search = request.args.get('search', '')
-        status = request.args.get('status', 'all')
-        
-        nodes = Node.get_nodes_by_user(current_user_id, search, status)
-        return jsonify([node.to_dict() for node in nodes])
-    except Exception as e:
-        print(f"Error in get_nodes: {str(e)}")  # Log the error
-        return jsonify({'error': str(e)}), 500
-
-@api.route('/nodes', methods=['POST'])
-@jwt_required()
-def create_node():
-    try:
-        current_user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        new_node = Node.create_node(current_user_id, data)
-        return jsonify(new_node.to_dict()), 201
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@api.route('/nodes/<int:node_id>', methods=['PUT'])
-@jwt_required()
-def update_node(node_id):
-    try:
-        current_user_id = get_jwt_identity()
-        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
-        
-        if not node:
-            return jsonify({'error': 'Node not found'}), 404
-            
-        data = request.get_json()
-        node.update_node(data)
-        return jsonify(node.to_dict())
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@api.route('/nodes/<int:node_id>', methods=['DELETE'])
-@jwt_required()
-def delete_node(node_id):
-    try:
-        current_user_id = get_jwt_identity()
-        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
-        
-        if not node:
-            return jsonify({'error': 'Node not found'}), 404
-            
-        node.delete_node()
-        return jsonify({'message': 'Node deleted successfully'})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@api.route('/nodes/<int:node_id>/metrics', methods=['GET'])
-@jwt_required()
-def get_node_metrics(node_id):
-    try:
-        node = Node.query.get_or_404(node_id)
-        
-        # Check Node Exporter status
-        nodeExporter_status = 'Inactive'
-        try:
-            response = requests.get(
-                f'http://{node.ipAddress}:{node.portNodeExporter}/metrics', 
-                timeout=2,
-                verify=False
-            )
-            if response.ok:
-                nodeExporter_status = 'Active'
-        except:
-            pass
-
-        # Check Promtail status
-        promtail_status = 'Inactive'
-        try:
-            response = requests.get(
-                f'http://{node.ipAddress}:{node.portPromtail}/ready', 
-                timeout=2,
-                verify=False
-            )
-            if response.ok:
-                promtail_status = 'Active'
-        except:
-            pass
-
-        # Update node status based on either service being active
-        if nodeExporter_status == 'Active' or promtail_status == 'Active':
-            node.status = 'active'
-        else:
-            node.status = 'inactive'
-        
-        db.session.commit()
-
-        return jsonify({
-            'nodeExporter': nodeExporter_status,
-            'promtail': promtail_status,
-            'status': node.status
-        })
-
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@api.route('/nodes/<int:node_id>/alerts', methods=['GET', 'POST'])
-@jwt_required()
-def manage_alerts(node_id):
-    try:
-        current_user_id = get_jwt_identity()
-        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
-
-        if not node:
-            return jsonify({'error': 'Node not found'}), 404
-
-        if request.method == 'GET':
-            alerts = Alert.query.filter_by(nodeId=node_id).all()
-            return jsonify([alert.to_dict() for alert in alerts])
-
-        # Handle POST request
-        data = request.get_json()
-        print("Received alert data:", data)  # Debug log
-        
-        if not data or 'message' not in data or 'destination' not in data:
-            return jsonify({'error': 'Missing required fields'}), 400
-
-        alert = Alert.create_alert(
-            node_id=node_id,
-            message=data['message'],
-            destination=data['destination']
-        )
-
-        return jsonify(alert.to_dict()), 201
-
-    except Exception as e:
-        print(f"Error managing alerts: {str(e)}")  # Debug log
-        return jsonify({'error': str(e)}), 500
-
-@api.route('/nodes/<int:node_id>/check-service', methods=['POST'])
-@jwt_required()
-def check_service(node_id):
-    try:
-        data = request.get_json()
-        service_type = data.get('type')
-        ip = data.get('ip')
-        port = data.get('port')
-
-        # Set up request parameters
-        url = f'http://{ip}:{port}/{"metrics" if service_type == "nodeExporter" else "ready"}'
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        timeout = 5
-
-        try:
-            response = requests.get(url, headers=headers, timeout=timeout, verify=False)
-            return jsonify({
-                'status': 'success' if response.status_code == 200 else 'error',
-                'message': ('Service is running' if response.status_code == 200 
-                          else f'Service responded with status {response.status_code}')
-            })
-        except requests.exceptions.ConnectTimeout:
-            return jsonify({
-                'status': 'error',
-                'message': f'Connection timed out after {timeout} seconds'
-            }), 408
-        except requests.exceptions.ConnectionError:
-            return jsonify({
-                'status': 'error',
-                'message': 'Could not connect to service'
-            }), 503
-        except RequestException as e:
-            return jsonify({
-                'status': 'error',
-                'message': str(e)
-            }), 500
-
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': f'Server error: {str(e)}'
-        }), 500
-
-@api.route('/nodes/connect-node-exporter', methods=['POST'])
-@jwt_required()
-def connect_node_exporter():
-    try:
-        data = request.get_json()
-        ip = data.get('ip')
-        port = data.get('port')
-        
-        if not ip or not port:
-            return jsonify({'error': 'Missing IP or port'}), 400
-
-        target = f"{ip}:{port}"
-        file_path = "/root/prometheus-config/tg_prometheus.json"
-        
-        # Construct the jq command
-        command = f"""
-        NEW_TARGET="{target}"
-        FILE_PATH="{file_path}"
-        jq --arg new_target "$NEW_TARGET" '.[] .targets += [$new_target]' "$FILE_PATH" > "$FILE_PATH.tmp" && mv "$FILE_PATH.tmp" "$FILE_PATH"
-        """
-        
-        # Execute the command
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            raise Exception(f"Command failed: {result.stderr}")
-
-        return jsonify({'status': 'success', 'message': 'Node Exporter connected successfully'})
-
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.models import Node, User, Alert, PerformanceRollup, WebDisplay, ScriptGenerator, Report
+from app import db
+from app.services.prober import prober
+from app.services.probe_cache import probe_cache
+from app.services.status_writer import status_writer
+from app.services.event_hub import event_hub
+from app.services.alerting import alert_engine
+from app.services.notifier import notifier
+from app.services.loki import loki, DIRECTIONS
+from app.services.grafana import grafana
+from app.services.scripts import script_renderer
+from app.services.reports import report_queue
+from app.services.audit_log import audit_log
+from app.services.user_cache import user_cache
+from app.services.target_registry import target_registry
+from app.services.http_client import http_client
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.conditional import fleet_etag
+from app.utils.timeutils import parse_time
+from datetime import datetime, timedelta
+import csv
+import gzip
+import io
+import json
+import re
+import zlib
+
+# Values interpolated into install scripts
+_JOB_NAME_RE = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+_LOG_PATH_RE = re.compile(r'^/[^\x00-\x1f\x7f]{0,254}$')
+
+api = Blueprint('api', __name__)
+
+@api.route('/health')
+def health_check():
+    return jsonify({
+        'status': 'healthy',
+        'message': 'API is running'
+    })
+
+def _paginate_nodes(user_id, columns_only=False):
+    """Fetch one page of the user's nodes using the request's query args."""
+    search = request.args.get('search', '')
+    status = request.args.get('status', 'all')
+    sort = request.args.get('sort', 'id')
+    limit = request.args.get('limit', current_app.config['NODES_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['NODES_MAX_PAGE_SIZE']))
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor, sort) if cursor else None
+
+    # Fetch one extra row to know whether another page exists
+    nodes = Node.get_nodes_by_user(user_id, search, status,
+                                   sort=sort, after=after, limit=limit + 1,
+                                   columns_only=columns_only)
+    next_cursor = None
+    if len(nodes) > limit:
+        nodes = nodes[:limit]
+        last = nodes[-1]
+        next_cursor = encode_cursor(sort, Node.sort_value(last, sort), last.id)
+    return nodes, next_cursor
+
+@api.route('/stats')
+@jwt_required()
+def get_stats():
+    """Internal cache/queue counters (admin only)."""
+    user = user_cache.get_user(get_jwt_identity())
+    if not user or user.role != 'admin':
+        return jsonify({'error': 'Forbidden'}), 403
+
+    return jsonify({
+        'user_cache': user_cache.stats(),
+        'audit_log': audit_log.stats(),
+        'http_client': http_client.stats(),
+        'probe_cache': probe_cache.stats(),
+        'status_writer': status_writer.stats(),
+        'event_hub': event_hub.stats(),
+        'alert_engine': alert_engine.stats(),
+        'notifier': notifier.stats(),
+        'loki': loki.stats(),
+        'grafana': grafana.stats(),
+        'scripts': script_renderer.stats(),
+        'reports': report_queue.stats()
+    })
+
+@api.route('/nodes', methods=['GET'])
+@jwt_required()
+@fleet_etag
+def get_nodes():
+    try:
+        current_user_id = get_jwt_identity()
+        nodes, next_cursor = _paginate_nodes(current_user_id, columns_only=True)
+        return jsonify({
+            'nodes': [Node.row_to_dict(node) for node in nodes],
+            'next_cursor': next_cursor
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_nodes: {str(e)}")  # Log the error
+        return jsonify({'error': str(e)}), 500
+
+def _fleet(nodes):
+    """Serialize nodes together with their latest probe results."""
+    results = prober.get_many([node.id for node in nodes])
+
+    fleet = []
+    for node in nodes:
+        state = prober.snapshot(node, results[node.id])
+        item = node.to_dict()
+        item.update({
+            'status': state['status'],
+            'last_checked': state['last_checked'],
+            'metrics': {
+                'nodeExporter': state['nodeExporter'],
+                'promtail': state['promtail']
+            }
+        })
+        fleet.append(item)
+    return fleet
+
+@api.route('/nodes/status', methods=['GET'])
+@jwt_required()
+def get_nodes_status():
+    """Return every node of the user together with its latest probe result."""
+    try:
+        current_user_id = get_jwt_identity()
+        nodes, next_cursor = _paginate_nodes(current_user_id)
+        return jsonify({'nodes': _fleet(nodes), 'next_cursor': next_cursor})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_nodes_status: {str(e)}")  # Log the error
+        return jsonify({'error': str(e)}), 500
+
+def _sse(event_id, event_type, data):
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+@api.route('/nodes/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_nodes():
+    """Server-Sent Events: a snapshot of the user's nodes, then only changes.
+
+    EventSource cannot send headers, so the token may also be passed as
+    ``?jwt=``. A reconnecting client sends ``Last-Event-ID`` and gets the
+    events it missed, or a new snapshot when they are no longer buffered.
+    """
+    current_user_id = get_jwt_identity()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    keepalive = current_app.config['SSE_KEEPALIVE']
+    retry_ms = current_app.config['SSE_RETRY_MS']
+
+    def generate():
+        subscription, latest = event_hub.subscribe(current_user_id)
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            missed = event_hub.since(current_user_id, last_event_id) if last_event_id else None
+            if missed is None:
+                nodes = Node.query.filter_by(ownerId=current_user_id).order_by(Node.id).all()
+                yield _sse(event_hub.format_id(latest), 'snapshot', {'nodes': _fleet(nodes)})
+                last_seq = latest
+            else:
+                for event in missed:
+                    yield _sse(event['id'], event['type'], event['data'])
+                last_seq = missed[-1]['seq'] if missed else event_hub.parse_id(last_event_id)
+            # Don't hold a database connection while the stream is idle
+            db.session.remove()
+
+            # A client that falls too far behind is dropped and resyncs on reconnect
+            while not subscription.overflowed:
+                event = subscription.get(timeout=keepalive)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                elif event['seq'] > last_seq:
+                    yield _sse(event['id'], event['type'], event['data'])
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@api.route('/nodes', methods=['POST'])
+@jwt_required()
+def create_node():
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        new_node = Node.create_node(current_user_id, data)
+        grafana.register([new_node.id])
+        event_hub.publish(current_user_id, 'node.added', new_node.to_dict())
+        return jsonify(new_node.to_dict()), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _read_bulk_rows():
+    """Yield (row number, row) from the streamed NDJSON or CSV request body."""
+    lines = iter(request.stream.readline, b'')
+    if request.mimetype in ('text/csv', 'application/csv'):
+        # Undecodable bytes become U+FFFD and the row is reported, not imported
+        reader = csv.DictReader(line.decode('utf-8-sig', errors='replace') for line in lines)
+        row_number = 0
+        while True:
+            row_number += 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield row_number, ValueError(f'Invalid CSV: {str(e)}')
+                continue
+            if any(isinstance(value, str) and '\ufffd' in value for value in row.values()):
+                yield row_number, ValueError('Invalid UTF-8')
+            else:
+                yield row_number, row
+        return
+
+    for row_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, ValueError(f'Invalid JSON: {str(e)}')
+
+@api.route('/nodes/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_nodes():
+    """Import nodes from an NDJSON (default) or CSV body.
+
+    Rows are validated one by one and inserted in batches of
+    ``batch_size`` rows, one transaction per batch, so the body is never
+    held in memory as a whole.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        batch_size = request.args.get('batch_size', current_app.config['NODES_BULK_BATCH_SIZE'], type=int)
+        if not batch_size or batch_size < 1:
+            return jsonify({'error': 'batch_size must be a positive integer'}), 400
+        max_errors = current_app.config['NODES_BULK_MAX_ERRORS']
+
+        inserted, failed, errors = 0, 0, []
+        inserted_ids = []  # None once the backend cannot return them
+
+        def report(row_number, error):
+            nonlocal failed
+            failed += 1
+            if len(errors) < max_errors:
+                errors.append({'row': row_number, 'error': error})
+
+        def flush(batch):
+            nonlocal inserted, inserted_ids
+            try:
+                ids = Node.bulk_create(current_user_id, [values for _, values in batch])
+                inserted += len(batch)
+                if ids is None:
+                    inserted_ids = None
+                elif inserted_ids is not None:
+                    inserted_ids.extend(ids)
+            except Exception as e:
+                for row_number, _ in batch:
+                    report(row_number, str(e))
+
+        batch = []
+        for row_number, row in _read_bulk_rows():
+            if isinstance(row, Exception):
+                report(row_number, str(row))
+                continue
+            values, error = Node.validate_row(row)
+            if error:
+                report(row_number, error)
+                continue
+            batch.append((row_number, values))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        if inserted:
+            # One dashboard lookup and display insert for the imported nodes only
+            if inserted_ids is not None:
+                grafana.register(inserted_ids)
+            else:
+                grafana.register(owner_id=current_user_id)
+            # Rows were inserted without loading them; clients reload the list
+            event_hub.publish(current_user_id, 'nodes.imported', {'count': inserted})
+
+        return jsonify({
+            'inserted': inserted,
+            'failed': failed,
+            'errors': errors,
+            'errors_truncated': failed > len(errors)
+        }), 200 if not failed else 207
+    except Exception as e:
+        print(f"Error in bulk_create_nodes: {str(e)}")  # Log the error
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/nodes/export', methods=['GET'])
+@jwt_required()
+def export_nodes():
+    """Stream all nodes of the user as NDJSON, one node per line."""
+    current_user_id = get_jwt_identity()
+    query = (db.select(*Node.api_columns())
+             .filter_by(ownerId=current_user_id)
+             .order_by(Node.id)
+             .execution_options(yield_per=1000))
+    dumps = current_app.json.dumps
+
+    def generate():
+        for row in db.session.execute(query):
+            yield dumps(Node.row_to_dict(row)) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=nodes.ndjson'}
+    )
+
+@api.route('/nodes/<int:node_id>', methods=['PUT'])
+@jwt_required()
+def update_node(node_id):
+    try:
+        current_user_id = get_jwt_identity()
+        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
+        
+        if not node:
+            return jsonify({'error': 'Node not found'}), 404
+            
+        data = request.get_json()
+        node.update_node(data)
+        grafana.register([node.id])
+        event_hub.publish(current_user_id, 'node.updated', node.to_dict())
+        return jsonify(node.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/nodes/<int:node_id>', methods=['DELETE'])
+@jwt_required()
+def delete_node(node_id):
+    try:
+        current_user_id = get_jwt_identity()
+        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
+        
+        if not node:
+            return jsonify({'error': 'Node not found'}), 404
+            
+        ip, port = node.ipAddress, node.portNodeExporter
+        node.delete_node()
+        event_hub.publish(current_user_id, 'node.removed', {'id': node_id})
+        # Keep the scrape target while another node still points at it
+        if not Node.query.filter_by(ipAddress=ip, portNodeExporter=port).first():
+            try:
+                target_registry.remove([f"{ip}:{port}"])
+            except Exception as e:
+                # The node is gone either way; tell the client the target is still scraped
+                return jsonify({'message': 'Node deleted successfully',
+                                'warning': f'Failed to remove Prometheus target: {str(e)}'})
+        return jsonify({'message': 'Node deleted successfully'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/nodes/<int:node_id>/metrics', methods=['GET'])
+@jwt_required()
+def get_node_metrics(node_id):
+    try:
+        node = Node.query.get_or_404(node_id)
+
+        # Probing happens in the background; serve the cached result
+        return jsonify(prober.snapshot(node))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/nodes/<int:node_id>/performance', methods=['GET'])
+@jwt_required()
+def get_node_performance(node_id):
+    """Return performance history, read from the coarsest rollup that fits ``step``."""
+    try:
+        current_user_id = get_jwt_identity()
+        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
+
+        if not node:
+            return jsonify({'error': 'Node not found'}), 404
+
+        end = parse_time(request.args.get('to'), datetime.utcnow())
+        start = parse_time(request.args.get('from'), end - timedelta(hours=1))
+        step = request.args.get('step', 60, type=int)
+        if start >= end:
+            return jsonify({'error': "'from' must be before 'to'"}), 400
+
+        resolution, series = PerformanceRollup.query_range(node.id, start, end, step)
+        return jsonify({
+            'nodeId': node.id,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'resolution': resolution,
+            'series': series
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/nodes/<int:node_id>/display', methods=['GET'])
+@jwt_required()
+def get_node_display(node_id):
+    """Grafana iframe URLs of a node; computed locally, never waits on Grafana."""
+    try:
+        current_user_id = get_jwt_identity()
+        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
+
+        if not node:
+            return jsonify({'error': 'Node not found'}), 404
+        if not grafana.configured:
+            return jsonify({'error': 'Grafana is not configured'}), 503
+
+        return jsonify(WebDisplay.for_node(node))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/nodes/<int:node_id>/script/<script_type>', methods=['GET'])
+@jwt_required()
+def get_node_script(node_id, script_type):
+    """Install script of a node; the ETag is the hash of its content."""
+    try:
+        current_user_id = get_jwt_identity()
+        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
+
+        if not node:
+            return jsonify({'error': 'Node not found'}), 404
+
+        options = {}
+        if request.args.get('port'):
+            port = request.args.get('port', type=int)
+            if port is None or not 0 < port < 65536:
+                return jsonify({'error': 'port must be between 1 and 65535'}), 400
+            options['port'] = port
+        if request.args.get('name_logs'):
+            if not _JOB_NAME_RE.match(request.args['name_logs']):
+                return jsonify({'error': 'name_logs may only contain letters, digits, _ . -'}), 400
+            options['name_logs'] = request.args['name_logs']
+        if request.args.get('log_path'):
+            if not _LOG_PATH_RE.match(request.args['log_path']):
+                return jsonify({'error': 'log_path must be an absolute path'}), 400
+            options['log_path'] = request.args['log_path']
+
+        content, digest = ScriptGenerator.for_node(node, script_type, **options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    response = Response(content, mimetype='text/x-shellscript')
+    response.set_etag(digest)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['Content-Disposition'] = f'attachment; filename={script_type}.sh'
+    return response.make_conditional(request)
+
+@api.route('/nodes/<int:node_id>/logs', methods=['GET'])
+@jwt_required()
+def get_node_logs(node_id):
+    """Stream the node's Loki logs as NDJSON, one entry per line.
+
+    ``query`` is an optional LogQL pipeline (e.g. ``|= "error"``) applied
+    after the node's stream selector.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
+
+        if not node:
+            return jsonify({'error': 'Node not found'}), 404
+        if loki.url is None:
+            return jsonify({'error': 'Loki is not configured'}), 503
+
+        end = parse_time(request.args.get('to'), datetime.utcnow())
+        start = parse_time(request.args.get('from'), end - timedelta(hours=1))
+        if start >= end:
+            return jsonify({'error': "'from' must be before 'to'"}), 400
+        if end - start > timedelta(hours=current_app.config.get('LOKI_MAX_RANGE_HOURS', 720)):
+            return jsonify({'error': 'Time range is too long'}), 400
+        direction = request.args.get('direction', 'backward')
+        if direction not in DIRECTIONS:
+            return jsonify({'error': f"'direction' must be one of {', '.join(DIRECTIONS)}"}), 400
+        max_lines = current_app.config.get('LOKI_MAX_LINES', 100000)
+        limit = min(request.args.get('limit', max_lines, type=int), max_lines)
+        if limit < 1:
+            return jsonify({'error': "'limit' must be at least 1"}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = loki.node_query(node.ipAddress, request.args.get('query', ''))
+    lines = loki.stream(query, start, end, direction=direction, limit=limit)
+    dumps = current_app.json.dumps
+
+    def generate():
+        try:
+            yield from lines
+        except Exception as e:
+            # Headers are already sent; report the failure as the last line
+            print(f"Loki query failed: {str(e)}")
+            yield dumps({'error': str(e)}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@api.route('/nodes/<int:node_id>/alerts', methods=['GET', 'POST'])
+@jwt_required()
+@fleet_etag
+def manage_alerts(node_id):
+    try:
+        current_user_id = get_jwt_identity()
+        node = Node.query.filter_by(id=node_id, ownerId=current_user_id).first()
+
+        if not node:
+            return jsonify({'error': 'Node not found'}), 404
+
+        if request.method == 'GET':
+            return jsonify(Alert.get_alerts_for_node(node_id))
+
+        # Handle POST request
+        data = request.get_json()
+        print("Received alert data:", data)  # Debug log
+        
+        if not data or 'message' not in data or 'destination' not in data:
+            return jsonify({'error': 'Missing required fields'}), 400
+        try:
+            rule = Alert.parse_rule(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        alert = Alert.create_alert(
+            node_id=node_id,
+            message=data['message'],
+            destination=data['destination'],
+            rule=rule
+        )
+
+        return jsonify(alert.to_dict()), 201
+
+    except Exception as e:
+        print(f"Error managing alerts: {str(e)}")  # Debug log
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/nodes/<int:node_id>/check-service', methods=['POST'])
+@jwt_required()
+def check_service(node_id):
+    try:
+        data = request.get_json()
+        service_type = data.get('type')
+        ip = data.get('ip')
+        try:
+            port = int(data.get('port'))
+        except (TypeError, ValueError):
+            return jsonify({'status': 'error', 'message': 'Invalid port'}), 400
+
+        # Served from the probe cache; ``force`` re-probes even a host that is backing off
+        service = 'nodeExporter' if service_type == 'nodeExporter' else 'promtail'
+        result = prober.check_service(service, ip, port, force=bool(data.get('force')))
+        last_checked = result['checked_at'].isoformat()
+
+        if result['error'] == 'timeout':
+            return jsonify({
+                'status': 'error',
+                'message': f'Connection timed out after {prober.timeout} seconds',
+                'last_checked': last_checked
+            }), 408
+        if result['error'] == 'connection':
+            return jsonify({
+                'status': 'error',
+                'message': 'Could not connect to service',
+                'last_checked': last_checked
+            }), 503
+        if result['error']:
+            return jsonify({
+                'status': 'error',
+                'message': result['error'],
+                'last_checked': last_checked
+            }), 500
+
+        status_code = result['status_code']
+        return jsonify({
+            'status': 'success' if result['ok'] else 'error',
+            'message': ('Service is running' if result['ok']
+                      else f'Service responded with status {status_code}'),
+            'last_checked': last_checked
+        })
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@api.route('/nodes/connect-node-exporter', methods=['POST'])
+@jwt_required()
+def connect_node_exporter():
+    try:
+        data = request.get_json()
+
+        # Accept a single {ip, port} or a batch {targets: [{ip, port}, ...]}
+        items = data.get('targets') or [data]
+        targets = []
+        for item in items:
+            ip = item.get('ip')
+            port = item.get('port')
+            if not ip or not port:
+                return jsonify({'error': 'Missing IP or port'}), 400
+            targets.append(f"{ip}:{port}")
+
+        added = target_registry.add(targets)
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Node Exporter connected successfully',
+            'added': added
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/reports', methods=['GET', 'POST'])
+@jwt_required()
+def manage_reports():
+    """List the user's reports, or queue a new one (built in the background)."""
+    try:
+        current_user_id = get_jwt_identity()
+
+        if request.method == 'GET':
+            reports = Report.query.filter_by(ownerId=current_user_id).order_by(Report.createdAt.desc()).all()
+            return jsonify([report.to_dict() for report in reports])
+
+        data = request.get_json() or {}
+        node_id = data.get('nodeId')
+        if node_id is not None and not Node.query.filter_by(id=node_id, ownerId=current_user_id).first():
+            return jsonify({'error': 'Node not found'}), 404
+
+        end = parse_time(data.get('to'), datetime.utcnow())
+        start = parse_time(data.get('from'), end - timedelta(days=30))
+        if start >= end:
+            return jsonify({'error': "'from' must be before 'to'"}), 400
+        if end - start > timedelta(days=current_app.config.get('REPORT_MAX_DAYS', 400)):
+            return jsonify({'error': 'Time range is too long'}), 400
+
+        report = Report.create_report(current_user_id, start, end, node_id=node_id,
+                                      granularity=data.get('granularity', 'day'))
+        return jsonify(report.to_dict()), 202, {'Location': f'/api/reports/{report.id}'}
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/reports/<int:report_id>', methods=['GET', 'DELETE'])
+@jwt_required()
+def manage_report(report_id):
+    try:
+        current_user_id = get_jwt_identity()
+        report = Report.query.filter_by(id=report_id, ownerId=current_user_id).first()
+
+        if not report:
+            return jsonify({'error': 'Report not found'}), 404
+
+        if request.method == 'GET':
+            return jsonify(report.to_dict())
+
+        if report.status == 'running' and not report_queue.is_stalled(report):
+            return jsonify({'error': 'Report is still running'}), 409
+        report.delete_report()
+        return jsonify({'message': 'Report deleted successfully'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _export_chunks(content, fmt, compress, chunk_size=64 * 1024):
+    """Yield a stored (gzip NDJSON) report as NDJSON or CSV, optionally gzipped, in pieces."""
+    with content:
+        if fmt == 'ndjson' and compress:
+            # Already in the requested form
+            yield from iter(lambda: content.read(chunk_size), b'')
+            return
+
+        compressor = zlib.compressobj(current_app.config.get('COMPRESS_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+        buffer = io.StringIO()
+        writer = None
+        if fmt == 'csv':
+            writer = csv.DictWriter(buffer, fieldnames=Report.COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+
+        def drain():
+            data = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            return compressor.compress(data) if compress else data
+
+        with gzip.GzipFile(fileobj=content) as lines:
+            for line in lines:
+                if writer is not None:
+                    writer.writerow(json.loads(line))
+                else:
+                    buffer.write(line.decode())
+                if buffer.tell() >= chunk_size:
+                    piece = drain()
+                    if piece:
+                        yield piece
+        piece = drain()
+        if compress:
+            piece += compressor.flush()
+        if piece:
+            yield piece
+
+@api.route('/reports/<int:report_id>/export', methods=['GET'])
+@jwt_required()
+def export_report(report_id):
+    """Stream a finished report as ``format=csv|ndjson``; ``gzip=1`` for a .gz download."""
+    current_user_id = get_jwt_identity()
+    report = Report.query.filter_by(id=report_id, ownerId=current_user_id).first()
+
+    if not report:
+        return jsonify({'error': 'Report not found'}), 404
+    if report.status != 'done':
+        return jsonify({'error': f'Report is {report.status}', 'progress': report.progress}), 409
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': "'format' must be csv or ndjson"}), 400
+    compress = request.args.get('gzip', 'false').lower() in ('1', 'true', 'yes')
+    content = report.open_content()
+    if content is None:
+        return jsonify({'error': 'Report content is missing'}), 410
+
+    filename = f'report-{report.id}.{fmt}' + ('.gz' if compress else '')
+    if compress:
+        mimetype = 'application/gzip'
+    else:
+        mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(_export_chunks(content, fmt, compress)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
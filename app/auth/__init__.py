@@ -1,5 +1,5 @@
-from flask import Blueprint
-
-auth = Blueprint('auth', __name__)
-
+from flask import Blueprint
+
+auth = Blueprint('auth', __name__)
+
 from . import routes 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from flask import Blueprint
-
-dashboard = Blueprint('dashboard', __name__)
-
+from flask import Blueprint
+
+dashboard = Blueprint('dashboard', __name__)
+
 from . import routes 
\ No newline at end of file
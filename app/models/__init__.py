@@ -1,14 +1,16 @@
-from .models import (
-    User, 
-    Node, 
-    AccessLog, 
-    DataCollectionConfig, 
-    OnchainData, 
-    PerformanceData, 
-    Alert, 
-    Report, 
-    WebDisplay, 
-    ScriptGenerator, 
-    ExternalSystem,
-    TypeScript
+from .models import (
+    User, 
+    Node, 
+    AccessLog, 
+    DataCollectionConfig, 
+    OnchainData, 
+    PerformanceData, 
+    PerformanceRollup, 
+    Alert, 
+    Report, 
+    WebDisplay, 
+    ScriptGenerator, 
+    ScriptBlob, 
+    ExternalSystem,
+    TypeScript
 ) 
\ No newline at end of file
@@ -1,333 +1,1084 @@
-from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-from enum import Enum
-import json
-from flask_login import UserMixin, logout_user
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-
-auth = Blueprint('auth', __name__)
-
-class TypeScript(Enum):
-    NODE_EXPORTER = "node_exporter"
-    PROMTAIL = "promtail"
-    LOKI = "loki"
-
-class User(UserMixin, db.Model):
-    __tablename__ = 'users'
-
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(64), unique=True, nullable=False)
-    password = db.Column(db.String(128), nullable=False)
-    role = db.Column(db.String(20))
-    email = db.Column(db.String(120), unique=True)
-    
-    # Relationships
-    nodes = db.relationship('Node', backref='owner', lazy='dynamic')
-    access_logs = db.relationship('AccessLog', backref='user', lazy='dynamic')
-    
-    def set_password(self, password):
-        self.password = generate_password_hash(password)
-    
-    def check_password(self, password):
-        return check_password_hash(self.password, password)
-    
-    def register(self):
-        db.session.add(self)
-        db.session.commit()
-    
-    def login(self, username, password):
-        user = User.query.filter_by(username=username).first()
-        if user and user.check_password(password):
-            return user
-        return None
-    
-    def updateProfile(self, username=None, email=None):
-        if username:
-            self.username = username
-        if email:
-            self.email = email
-        db.session.commit()
-    
-    def deleteAccount(self, id):
-        user = User.query.get(id)
-        if user:
-            db.session.delete(user)
-            db.session.commit()
-            return True
-        return False
-
-class Node(db.Model):
-    __tablename__ = 'nodes'
-
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100))
-    ipAddress = db.Column(db.String(100))
-    status = db.Column(db.String(20), default='inactive')
-    portNodeExporter = db.Column(db.Integer)
-    portPromtail = db.Column(db.Integer)
-    ownerId = db.Column(db.Integer, db.ForeignKey('users.id'))
-    last_checked = db.Column(db.DateTime, nullable=True)
-
-    @classmethod
-    def get_nodes_by_user(cls, user_id, search=None, status=None):
-        """Get all nodes for a user with optional filters."""
-        query = cls.query.filter_by(ownerId=user_id)
-        
-        if search:
-            query = query.filter(cls.name.ilike(f'%{search}%'))
-        if status and status != 'all':
-            query = query.filter_by(status=status)
-            
-        return query.all()
-
-    @classmethod
-    def create_node(cls, owner_id, data):
-        """Create a new node."""
-        try:
-            node = cls(
-                name=data.get('name'),
-                ipAddress=data.get('ipAddress'),
-                status=data.get('status', 'inactive'),
-                portNodeExporter=data.get('portNodeExporter'),
-                portPromtail=data.get('portPromtail'),
-                ownerId=owner_id
-            )
-            db.session.add(node)
-            db.session.commit()
-            return node
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error creating node: {str(e)}")  # Debug log
-            raise Exception(f"Failed to create node: {str(e)}")
-
-    def update_node(self, data):
-        """Update node information."""
-        try:
-            if 'name' in data:
-                self.name = data['name']
-            if 'ipAddress' in data:
-                self.ipAddress = data['ipAddress']
-            if 'portNodeExporter' in data:
-                self.portNodeExporter = data['portNodeExporter']
-            if 'portPromtail' in data:
-                self.portPromtail = data['portPromtail']
-            if 'status' in data:
-                self.status = data['status']
-                
-            db.session.commit()
-            return self
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error updating node: {str(e)}")  # Debug log
-            raise Exception(f"Failed to update node: {str(e)}")
-
-    def delete_node(self):
-        """Delete the node."""
-        try:
-            # Delete related alerts first
-            Alert.query.filter_by(nodeId=self.id).delete()
-            
-            # Delete the node
-            db.session.delete(self)
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error deleting node: {str(e)}")  # Debug log
-            raise Exception(f"Failed to delete node: {str(e)}")
-
-    def to_dict(self):
-        """Convert node to dictionary."""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'ipAddress': self.ipAddress,
-            'status': self.status,
-            'portNodeExporter': self.portNodeExporter,
-            'portPromtail': self.portPromtail,
-            'last_checked': self.last_checked.isoformat() if self.last_checked else None
-        }
-
-class AccessLog(db.Model):
-    __tablename__ = 'access_logs'
-
-    id = db.Column(db.Integer, primary_key=True)
-    userId = db.Column(db.Integer, db.ForeignKey('users.id'))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    action = db.Column(db.String(100))
-
-    @classmethod
-    def log_access(cls, user_id, action):
-        """Log a user action."""
-        try:
-            print(f"Logging access: user_id={user_id}, action={action}")  # Debug statement
-            log = cls(userId=user_id, action=action)
-            db.session.add(log)
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            print(f"Failed to log access: {str(e)}")  # Debug statement
-            raise Exception(f"Failed to log access: {str(e)}")
-
-class DataCollectionConfig(db.Model):
-    __tablename__ = 'data_collection_configs'
-
-    id = db.Column(db.Integer, primary_key=True)
-    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
-    dataSources = db.Column(db.String(500))  # JSON string representing Map<String, Map<String, boolean>>
-    
-    def configureCollection(self, id, source):
-        pass
-    
-    def getCollectionConfig(self, id):
-        return {}  # Map<String, Map<String, boolean>>
-
-class OnchainData(db.Model):
-    __tablename__ = 'onchain_data'
-
-    id = db.Column(db.Integer, primary_key=True)
-    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
-    blockHeight = db.Column(db.Integer)
-    transactionCount = db.Column(db.Integer)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    def queryOnchainData(self, nodeId):
-        return OnchainData
-    
-    def storeOnchainData(self):
-        pass
-
-class PerformanceData(db.Model):
-    __tablename__ = 'performance_data'
-
-    id = db.Column(db.Integer, primary_key=True)
-    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    cpuUsage = db.Column(db.Float)
-    memoryUsage = db.Column(db.Float)
-    diskUsage = db.Column(db.Float)
-    networkUpUsage = db.Column(db.Float)
-    networkDownUsage = db.Column(db.Float)
-    uptime = db.Column(db.Float)
-    
-    def fetchPerformanceData(self, nodeId):
-        return PerformanceData
-    
-    def storePerformanceData(self):
-        pass
-
-class Alert(db.Model):
-    __tablename__ = 'alerts'
-
-    id = db.Column(db.Integer, primary_key=True)
-    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'), nullable=False)
-    message = db.Column(db.String(200), nullable=False)
-    destination = db.Column(db.String(100), nullable=False)
-
-    # Add relationship to Node
-    node = db.relationship('Node', backref=db.backref('alerts', lazy=True))
-
-    @classmethod
-    def create_alert(cls, node_id, message, destination):
-        """Create a new alert for a node."""
-        try:
-            print(f"Creating alert for node {node_id}")  # Debug log
-            alert = cls(
-                nodeId=node_id,
-                message=message,
-                destination=destination
-            )
-            db.session.add(alert)
-            db.session.commit()
-            return alert
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error creating alert: {str(e)}")  # Debug log
-            raise Exception(f"Failed to create alert: {str(e)}")
-
-    def to_dict(self):
-        """Convert alert to dictionary."""
-        return {
-            'id': self.id,
-            'nodeId': self.nodeId,
-            'message': self.message,
-            'destination': self.destination
-        }
-
-class Report(db.Model):
-    __tablename__ = 'reports'
-
-    id = db.Column(db.Integer, primary_key=True)
-    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
-    startDate = db.Column(db.DateTime)
-    endDate = db.Column(db.DateTime)
-    content = db.Column(db.Text)
-    
-    def generateReport(self, id, startDate, endDate):
-        return Report
-    
-    def exportReport(self, reportId):
-        pass
-
-class WebDisplay(db.Model):
-    __tablename__ = 'web_displays'
-
-    id = db.Column(db.Integer, primary_key=True)
-    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
-    frameUrlLogs = db.Column(db.String(500))
-    frameUrlPerformance = db.Column(db.String(500))
-    
-    def generateIframeUrl(self, id, type):
-        return ""
-    
-    def displayData(self, nodeId):
-        pass
-
-class ScriptGenerator(db.Model):
-    __tablename__ = 'script_generators'
-
-    id = db.Column(db.Integer, primary_key=True)
-    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
-    typeScript = db.Column(db.Enum(TypeScript))
-    scriptContent = db.Column(db.Text)
-    
-    def generateScript(self, id, port, ip, type):
-        return ""
-    
-    def saveScript(self):
-        pass
-
-class ExternalSystem(db.Model):
-    __tablename__ = 'external_systems'
-
-    id = db.Column(db.Integer, primary_key=True)
-    type = db.Column(db.String(50))
-    apiKey = db.Column(db.String(200))
-    
-    def fetchIframeUrlFromGrafana(self, nodeId, id, type):
-        return ""
-    
-    def fetchLogFromLoki(self, id, query, startTime=None, endTime=None):
-        return []
-    
-    def sendTelegramMessage(self, message):
-        pass
-    
-    def addTargetToGrafana(self, nodeId, ipAddress, port):
-        return False
-
-@auth.route('/logout', methods=['POST'])
-@jwt_required()
-def logout():
-    current_user_id = get_jwt_identity()
-    
-    # Log the logout action
-    try:
-        AccessLog.log_access(current_user_id, "User logged out")
-        print("Logout action logged successfully")  # Debug statement
-    except Exception as e:
-        print(f"Failed to log access: {str(e)}")
-    
-    logout_user()
-    return jsonify({'msg': 'User logged out successfully'}), 200
+from app import db
+from app.utils.hashing import hasher
+from app.services.user_cache import user_cache
+from app.services.alerting import alert_engine
+from app.services.notifier import notifier
+from app.services.loki import loki
+from app.services.grafana import grafana, COLUMNS as DISPLAY_COLUMNS
+from app.services.scripts import script_renderer
+from app.utils.timeutils import floor_time
+from datetime import datetime, timedelta
+import gzip
+import io
+import os
+from itertools import product
+import re
+from enum import Enum
+import json
+from flask_login import UserMixin, logout_user
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+auth = Blueprint('auth', __name__)
+
+class TypeScript(Enum):
+    NODE_EXPORTER = "node_exporter"
+    PROMTAIL = "promtail"
+    LOKI = "loki"
+
+class User(UserMixin, db.Model):
+    __tablename__ = 'users'
+
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(64), unique=True, nullable=False)
+    password = db.Column(db.String(255), nullable=False)
+    role = db.Column(db.String(20))
+    email = db.Column(db.String(120), unique=True)
+    # Bumped whenever the user's nodes, alerts or profile change; used for ETags
+    fleetVersion = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Relationships
+    nodes = db.relationship('Node', backref='owner', lazy='dynamic')
+    access_logs = db.relationship('AccessLog', backref='user', lazy='dynamic')
+    
+    def set_password(self, password):
+        self.password = hasher.hash(password)
+    
+    def check_password(self, password):
+        return hasher.verify(self.password, password)
+
+    def upgrade_password_hash(self, password):
+        """Rehash a verified password if it uses an outdated scheme or cost."""
+        if not hasher.needs_rehash(self.password):
+            return False
+        try:
+            self.set_password(password)
+            db.session.commit()
+            user_cache.invalidate(self.id)
+            return True
+        except Exception as e:
+            db.session.rollback()
+            print(f"Failed to upgrade password hash: {str(e)}")
+            return False
+    
+    @classmethod
+    def bump_fleet_version(cls, user_ids):
+        """Increment the fleet version of users in the current transaction.
+
+        ``user_ids`` is a list of ids or a SELECT returning them.
+        """
+        if isinstance(user_ids, (list, tuple, set)):
+            user_ids = [int(user_id) for user_id in user_ids]
+        users = cls.__table__
+        db.session.execute(
+            users.update()
+            .where(users.c.id.in_(user_ids))
+            .values(fleetVersion=users.c.fleetVersion + 1)
+        )
+
+    @classmethod
+    def get_fleet_version(cls, user_id):
+        """Read the current fleet version straight from the table (never cached)."""
+        return db.session.execute(
+            db.select(cls.fleetVersion).where(cls.id == int(user_id))
+        ).scalar()
+
+    def register(self):
+        db.session.add(self)
+        db.session.commit()
+    
+    def login(self, username, password):
+        user = User.query.filter_by(username=username).first()
+        if user and user.check_password(password):
+            return user
+        return None
+    
+    def updateProfile(self, username=None, email=None):
+        if username:
+            self.username = username
+        if email:
+            self.email = email
+        User.bump_fleet_version([self.id])
+        db.session.commit()
+        user_cache.invalidate(self.id)
+    
+    def deleteAccount(self, id):
+        user = User.query.get(id)
+        if user:
+            db.session.delete(user)
+            db.session.commit()
+            user_cache.invalidate(id)
+            return True
+        return False
+
+class Node(db.Model):
+    __tablename__ = 'nodes'
+    __table_args__ = (
+        db.Index('ix_nodes_ownerId_status', 'ownerId', 'status'),
+        # GIN trigram indexes on PostgreSQL, plain B-tree elsewhere
+        db.Index('ix_nodes_name_trgm', 'name',
+                 postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_nodes_ipAddress_trgm', 'ipAddress',
+                 postgresql_using='gin', postgresql_ops={'ipAddress': 'gin_trgm_ops'}),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100))
+    ipAddress = db.Column(db.String(100))
+    status = db.Column(db.String(20), default='inactive')
+    portNodeExporter = db.Column(db.Integer)
+    portPromtail = db.Column(db.Integer)
+    ownerId = db.Column(db.Integer, db.ForeignKey('users.id'))
+    last_checked = db.Column(db.DateTime, nullable=True)
+
+    SORT_OPTIONS = ('id', 'name', '-name', 'status', '-status', 'last_checked', '-last_checked')
+
+    # Columns serialized by the API; same keys as to_dict()
+    API_FIELDS = ('id', 'name', 'ipAddress', 'status', 'portNodeExporter', 'portPromtail', 'last_checked')
+
+    @classmethod
+    def _sort_key(cls, sort):
+        """Return the (non-null) sort expression for a sort option."""
+        field = sort.lstrip('-')
+        if field == 'name':
+            return db.func.coalesce(cls.name, '')
+        if field == 'status':
+            return db.func.coalesce(cls.status, '')
+        if field == 'last_checked':
+            return db.func.coalesce(cls.last_checked, datetime(1970, 1, 1))
+        return cls.id
+
+    @classmethod
+    def sort_value(cls, node, sort):
+        """Return the value of the sort key for a loaded node."""
+        field = sort.lstrip('-')
+        if field == 'name':
+            return node.name or ''
+        if field == 'status':
+            return node.status or ''
+        if field == 'last_checked':
+            return node.last_checked or datetime(1970, 1, 1)
+        return node.id
+
+    @classmethod
+    def get_nodes_by_user(cls, user_id, search=None, status=None, sort='id', after=None, limit=None,
+                          columns_only=False):
+        """Get nodes for a user with optional filters.
+
+        ``after`` is the ``(sort value, id)`` of the last node of the previous
+        page; pages are fetched by keyset on ``(sort key, id)`` rather than
+        OFFSET so deep pages cost the same as the first one.
+
+        With ``columns_only`` only ``API_FIELDS`` are selected and plain rows
+        are returned instead of ORM objects (see ``row_to_dict``).
+        """
+        if sort not in cls.SORT_OPTIONS:
+            raise ValueError(f'Invalid sort option: {sort}')
+
+        query = cls.query.filter_by(ownerId=user_id)
+        
+        if search:
+            # Substring match on name, prefix match on IP; both served by the trigram indexes
+            pattern = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(db.or_(
+                cls.name.ilike(f'%{pattern}%', escape='\\'),
+                cls.ipAddress.like(f'{pattern}%', escape='\\')
+            ))
+        if status and status != 'all':
+            query = query.filter_by(status=status)
+
+        key = cls._sort_key(sort)
+        descending = sort.startswith('-')
+        if after is not None:
+            value, last_id = after
+            if sort == 'id':
+                query = query.filter(cls.id > last_id)
+            elif descending:
+                query = query.filter(db.or_(key < value, db.and_(key == value, cls.id < last_id)))
+            else:
+                query = query.filter(db.or_(key > value, db.and_(key == value, cls.id > last_id)))
+
+        if sort == 'id':
+            query = query.order_by(cls.id)
+        elif descending:
+            query = query.order_by(key.desc(), cls.id.desc())
+        else:
+            query = query.order_by(key, cls.id)
+
+        if limit is not None:
+            query = query.limit(limit)
+        if columns_only:
+            query = query.with_entities(*cls.api_columns())
+            
+        return query.all()
+
+    @classmethod
+    def api_columns(cls):
+        return [getattr(cls, field) for field in cls.API_FIELDS]
+
+    @staticmethod
+    def row_to_dict(row):
+        """Dict of a column-only row; datetimes are left to the JSON provider."""
+        return row._asdict()
+
+    @classmethod
+    def create_node(cls, owner_id, data):
+        """Create a new node."""
+        try:
+            node = cls(
+                name=data.get('name'),
+                ipAddress=data.get('ipAddress'),
+                status=data.get('status', 'inactive'),
+                portNodeExporter=data.get('portNodeExporter'),
+                portPromtail=data.get('portPromtail'),
+                ownerId=owner_id
+            )
+            db.session.add(node)
+            User.bump_fleet_version([owner_id])
+            db.session.commit()
+            return node
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error creating node: {str(e)}")  # Debug log
+            raise Exception(f"Failed to create node: {str(e)}")
+
+    @classmethod
+    def validate_row(cls, data):
+        """Validate one imported row; returns (values, error message)."""
+        if not isinstance(data, dict):
+            return None, 'Row must be an object'
+
+        for field in ('name', 'ipAddress', 'status'):
+            if data.get(field) is not None and not isinstance(data[field], str):
+                return None, f'{field} must be a string'
+
+        name = (data.get('name') or '').strip()
+        ip_address = (data.get('ipAddress') or '').strip()
+        if not name:
+            return None, 'Missing name'
+        if not ip_address:
+            return None, 'Missing ipAddress'
+        if len(name) > 100 or len(ip_address) > 100:
+            return None, 'name and ipAddress must be at most 100 characters'
+        if '\x00' in name or '\x00' in ip_address:
+            return None, 'name and ipAddress must not contain NUL characters'
+
+        values = {'name': name, 'ipAddress': ip_address}
+        for field in ('portNodeExporter', 'portPromtail'):
+            port = data.get(field)
+            if port in (None, ''):
+                values[field] = None
+                continue
+            try:
+                port = int(port)
+            except (TypeError, ValueError):
+                return None, f'{field} must be an integer'
+            if not 0 < port < 65536:
+                return None, f'{field} must be between 1 and 65535'
+            values[field] = port
+
+        status = data.get('status') or 'inactive'
+        if status not in ('active', 'inactive'):
+            return None, "status must be 'active' or 'inactive'"
+        values['status'] = status
+        return values, None
+
+    @classmethod
+    def bulk_create(cls, owner_id, rows):
+        """Insert validated rows in one transaction with a single executemany.
+
+        Returns the new ids, or None on backends that cannot return them
+        from an executemany (MySQL).
+        """
+        table = cls.__table__
+        params = [dict(row, ownerId=owner_id) for row in rows]
+        try:
+            if db.engine.dialect.insert_executemany_returning:
+                ids = list(db.session.execute(table.insert().returning(table.c.id), params).scalars())
+            else:
+                db.session.execute(table.insert(), params)
+                ids = None
+            User.bump_fleet_version([owner_id])
+            db.session.commit()
+            return ids
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error importing nodes: {str(e)}")  # Debug log
+            raise Exception(f"Failed to import nodes: {str(e)}")
+
+    def update_node(self, data):
+        """Update node information."""
+        try:
+            address = (self.ipAddress, self.portNodeExporter, self.portPromtail)
+            if 'name' in data:
+                self.name = data['name']
+            if 'ipAddress' in data:
+                self.ipAddress = data['ipAddress']
+            if 'portNodeExporter' in data:
+                self.portNodeExporter = data['portNodeExporter']
+            if 'portPromtail' in data:
+                self.portPromtail = data['portPromtail']
+            if 'status' in data:
+                self.status = data['status']
+            if (self.ipAddress, self.portNodeExporter, self.portPromtail) != address:
+                # Panel URLs embed the address; they are recomputed on the next view
+                WebDisplay.query.filter_by(nodeId=self.id).delete()
+                
+            User.bump_fleet_version([self.ownerId])
+            db.session.commit()
+            return self
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error updating node: {str(e)}")  # Debug log
+            raise Exception(f"Failed to update node: {str(e)}")
+
+    def delete_node(self):
+        """Delete the node."""
+        try:
+            # Delete collected data, alerts, displays, scripts and reports first
+            for model in (PerformanceRollup, PerformanceData, OnchainData, DataCollectionConfig):
+                model.query.filter_by(nodeId=self.id).delete(synchronize_session=False)
+            paths = [row[0] for row in db.session.query(Report.contentPath)
+                     .filter(Report.nodeId == self.id, Report.contentPath.isnot(None))]
+            Report.query.filter_by(nodeId=self.id).delete()
+            Alert.query.filter_by(nodeId=self.id).delete()
+            WebDisplay.query.filter_by(nodeId=self.id).delete()
+            hashes = [row[0] for row in db.session.query(ScriptGenerator.contentHash).filter_by(nodeId=self.id)]
+            ScriptGenerator.query.filter_by(nodeId=self.id).delete()
+            ScriptBlob.prune(hashes)
+            
+            # Delete the node
+            db.session.delete(self)
+            User.bump_fleet_version([self.ownerId])
+            db.session.commit()
+            alert_engine.invalidate()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error deleting node: {str(e)}")  # Debug log
+            raise Exception(f"Failed to delete node: {str(e)}")
+        # Only once the rows are gone, so a failed commit keeps the content
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def to_dict(self):
+        """Convert node to dictionary."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'ipAddress': self.ipAddress,
+            'status': self.status,
+            'portNodeExporter': self.portNodeExporter,
+            'portPromtail': self.portPromtail,
+            'last_checked': self.last_checked.isoformat() if self.last_checked else None
+        }
+
+class AccessLog(db.Model):
+    __tablename__ = 'access_logs'
+    __table_args__ = (
+        db.Index('ix_access_logs_userId_timestamp', 'userId', db.text('"timestamp" DESC')),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    userId = db.Column(db.Integer, db.ForeignKey('users.id'))
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    action = db.Column(db.String(100))
+
+    @classmethod
+    def log_access(cls, user_id, action):
+        """Log a user action through the buffered audit log writer."""
+        from app.services.audit_log import audit_log
+        if not audit_log.log(user_id, action):
+            print(f"Access log queue full, dropped: user_id={user_id}, action={action}")
+
+class DataCollectionConfig(db.Model):
+    __tablename__ = 'data_collection_configs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
+    dataSources = db.Column(db.String(500))  # JSON string representing Map<String, Map<String, boolean>>
+    
+    def configureCollection(self, id, source):
+        pass
+    
+    def getCollectionConfig(self, id):
+        return {}  # Map<String, Map<String, boolean>>
+
+class OnchainData(db.Model):
+    __tablename__ = 'onchain_data'
+    __table_args__ = (
+        db.Index('ix_onchain_data_nodeId_timestamp', 'nodeId', db.text('"timestamp" DESC')),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
+    blockHeight = db.Column(db.Integer)
+    transactionCount = db.Column(db.Integer)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def queryOnchainData(self, nodeId):
+        return OnchainData
+    
+    def storeOnchainData(self):
+        pass
+
+class PerformanceData(db.Model):
+    __tablename__ = 'performance_data'
+    __table_args__ = (
+        db.Index('ix_performance_data_nodeId_timestamp', 'nodeId', db.text('"timestamp" DESC')),
+    )
+
+    METRICS = ('cpuUsage', 'memoryUsage', 'diskUsage', 'networkUpUsage', 'networkDownUsage', 'uptime')
+
+    id = db.Column(db.Integer, primary_key=True)
+    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    cpuUsage = db.Column(db.Float)
+    memoryUsage = db.Column(db.Float)
+    diskUsage = db.Column(db.Float)
+    networkUpUsage = db.Column(db.Float)
+    networkDownUsage = db.Column(db.Float)
+    uptime = db.Column(db.Float)
+    
+    def fetchPerformanceData(self, nodeId):
+        """Get the latest sample stored for a node."""
+        return PerformanceData.query.filter_by(nodeId=nodeId).order_by(
+            PerformanceData.timestamp.desc()
+        ).first()
+    
+    def storePerformanceData(self):
+        """Store a single sample."""
+        try:
+            db.session.add(self)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Failed to store performance data: {str(e)}")
+
+    @classmethod
+    def bulk_insert(cls, rows, batch_size=500):
+        """Insert sample dicts with one executemany per batch."""
+        try:
+            for i in range(0, len(rows), batch_size):
+                db.session.execute(cls.__table__.insert(), rows[i:i + batch_size])
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Failed to store performance data: {str(e)}")
+
+class PerformanceRollup(db.Model):
+    """Downsampled PerformanceData: one row per node, metric and time bucket."""
+    __tablename__ = 'performance_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('nodeId', 'resolution', 'bucket', 'metric',
+                            name='uq_performance_rollups_bucket'),
+        db.Index('ix_performance_rollups_resolution_bucket', 'resolution', 'bucket'),
+    )
+
+    RESOLUTIONS = (60, 300, 3600)  # seconds
+
+    id = db.Column(db.Integer, primary_key=True)
+    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'), nullable=False)
+    resolution = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.DateTime, nullable=False)
+    metric = db.Column(db.String(32), nullable=False)
+    count = db.Column(db.Integer, nullable=False)
+    min = db.Column(db.Float)
+    max = db.Column(db.Float)
+    avg = db.Column(db.Float)
+    p95 = db.Column(db.Float)
+
+    @classmethod
+    def bulk_insert(cls, rows, batch_size=1000):
+        """Insert rollup dicts with one executemany per batch, in one transaction.
+
+        All or nothing: a failed batch must not leave earlier ones behind,
+        since the caller retries the whole chunk and the unique constraint
+        would reject the rows already committed.
+        """
+        try:
+            for i in range(0, len(rows), batch_size):
+                db.session.execute(cls.__table__.insert(), rows[i:i + batch_size])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Failed to store performance rollups: {str(e)}")
+
+    @classmethod
+    def choose_resolution(cls, step):
+        """Return the coarsest resolution not coarser than ``step`` (0 = raw)."""
+        candidates = [resolution for resolution in cls.RESOLUTIONS if resolution <= step]
+        return max(candidates) if candidates else 0
+
+    @classmethod
+    def query_range(cls, node_id, start, end, step):
+        """Get ``{metric: [points]}`` for a node between ``start`` and ``end``.
+
+        Reads the coarsest rollup that satisfies ``step`` and falls back to
+        raw samples for steps below the finest resolution.
+        """
+        resolution = cls.choose_resolution(step)
+        series = {metric: [] for metric in PerformanceData.METRICS}
+
+        if resolution == 0:
+            columns = [getattr(PerformanceData, metric) for metric in PerformanceData.METRICS]
+            rows = db.session.query(PerformanceData.timestamp, *columns).filter(
+                PerformanceData.nodeId == node_id,
+                PerformanceData.timestamp >= start,
+                PerformanceData.timestamp < end
+            ).order_by(PerformanceData.timestamp)
+            for row in rows:
+                for metric, value in zip(PerformanceData.METRICS, row[1:]):
+                    if value is not None:
+                        series[metric].append({
+                            't': row[0].isoformat(),
+                            'min': value, 'max': value, 'avg': value, 'p95': value
+                        })
+            return resolution, series
+
+        rows = db.session.query(
+            cls.bucket, cls.metric, cls.min, cls.max, cls.avg, cls.p95
+        ).filter(
+            cls.nodeId == node_id,
+            cls.resolution == resolution,
+            cls.bucket >= start,
+            cls.bucket < end
+        ).order_by(cls.bucket)
+        for bucket, metric, min_, max_, avg, p95 in rows:
+            if metric in series:
+                series[metric].append({
+                    't': bucket.isoformat(),
+                    'min': min_, 'max': max_, 'avg': avg, 'p95': p95
+                })
+        return resolution, series
+
+class Alert(db.Model):
+    __tablename__ = 'alerts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'), nullable=False)
+    message = db.Column(db.String(200), nullable=False)
+    destination = db.Column(db.String(100), nullable=False)
+
+    # Optional rule evaluated by the alert engine; alerts without a metric
+    # are plain notes as before
+    kind = db.Column(db.String(20))
+    metric = db.Column(db.String(32))
+    operator = db.Column(db.String(2))
+    threshold = db.Column(db.Float)
+    duration = db.Column(db.Integer)  # seconds
+    state = db.Column(db.String(20), default='ok', server_default='ok')
+    stateChangedAt = db.Column(db.DateTime)
+
+    # Add relationship to Node
+    node = db.relationship('Node', backref=db.backref('alerts', lazy=True))
+
+    RULE_KINDS = ('threshold', 'rate')
+    OPERATORS = ('>', '>=', '<', '<=')
+    _RULE_RE = re.compile(
+        r'^\s*(?:rate\(\s*(?P<rate>\w+)\s*\)|(?P<metric>\w+))\s*(?P<op>>=|<=|>|<)\s*'
+        r'(?P<threshold>-?\d+(?:\.\d+)?)\s*(?:for\s+(?P<for>\d+)\s*(?P<unit>[smh]?))?\s*$'
+    )
+    _UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600}
+
+    @classmethod
+    def parse_rule(cls, data):
+        """Return the rule columns from request data, or None for a plain alert.
+
+        Accepts either ``rule`` as a string such as ``"cpuUsage > 90 for 5m"``
+        or ``"rate(networkDownUsage) > 1000 for 10m"``, or the separate
+        ``metric``/``operator``/``threshold``/``duration``/``kind`` fields.
+        Raises ValueError for an invalid rule.
+        """
+        if data.get('rule'):
+            match = cls._RULE_RE.match(str(data['rule']))
+            if not match:
+                raise ValueError('Invalid rule, expected e.g. "cpuUsage > 90 for 5m"')
+            rule = {
+                'kind': 'rate' if match.group('rate') else 'threshold',
+                'metric': match.group('rate') or match.group('metric'),
+                'operator': match.group('op'),
+                'threshold': float(match.group('threshold')),
+                'duration': int(match.group('for') or 0) * cls._UNITS[match.group('unit') or ''],
+            }
+        elif data.get('metric'):
+            try:
+                rule = {
+                    'kind': data.get('kind') or 'threshold',
+                    'metric': data['metric'],
+                    'operator': data.get('operator') or '>',
+                    'threshold': float(data['threshold']),
+                    'duration': int(data.get('duration') or 0),
+                }
+            except (KeyError, TypeError, ValueError):
+                raise ValueError('threshold must be a number and duration a number of seconds')
+        else:
+            return None
+
+        if rule['metric'] not in PerformanceData.METRICS:
+            raise ValueError(f"Unknown metric: {rule['metric']}")
+        if rule['kind'] not in cls.RULE_KINDS:
+            raise ValueError(f"Unknown rule kind: {rule['kind']}")
+        if rule['operator'] not in cls.OPERATORS:
+            raise ValueError(f"Unknown operator: {rule['operator']}")
+        if rule['duration'] < 0:
+            raise ValueError('duration must not be negative')
+        return rule
+
+    def describe_rule(self):
+        if not self.metric:
+            return None
+        metric = f'rate({self.metric})' if self.kind == 'rate' else self.metric
+        return f'{metric} {self.operator} {self.threshold:g} for {self.duration}s'
+
+    @classmethod
+    def create_alert(cls, node_id, message, destination, rule=None):
+        """Create a new alert for a node, optionally with a rule from parse_rule."""
+        try:
+            print(f"Creating alert for node {node_id}")  # Debug log
+            alert = cls(
+                nodeId=node_id,
+                message=message,
+                destination=destination,
+                **(rule or {})
+            )
+            db.session.add(alert)
+            User.bump_fleet_version(db.select(Node.ownerId).where(Node.id == node_id))
+            db.session.commit()
+            alert_engine.invalidate()
+            return alert
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error creating alert: {str(e)}")  # Debug log
+            raise Exception(f"Failed to create alert: {str(e)}")
+
+    @classmethod
+    def get_alerts_for_node(cls, node_id):
+        """Alerts of a node as plain dicts, selecting only the serialized columns."""
+        columns = [getattr(cls, column.key) for column in cls.__table__.columns]
+        rows = db.session.execute(db.select(*columns).where(cls.nodeId == node_id).order_by(cls.id))
+        return [row._asdict() for row in rows]
+
+    def to_dict(self):
+        """Convert alert to dictionary."""
+        return {
+            'id': self.id,
+            'nodeId': self.nodeId,
+            'message': self.message,
+            'destination': self.destination,
+            'kind': self.kind,
+            'metric': self.metric,
+            'operator': self.operator,
+            'threshold': self.threshold,
+            'duration': self.duration,
+            'state': self.state,
+            'stateChangedAt': self.stateChangedAt.isoformat() if self.stateChangedAt else None
+        }
+
+class Report(db.Model):
+    """Aggregated node metrics over a period, built by a background job.
+
+    Rows are one ``(node, bucket)`` each (see ``COLUMNS``). The content is
+    kept as gzip-compressed NDJSON: inline in ``contentCompressed`` when it
+    is small, otherwise in a file under ``REPORT_DIR`` (``contentPath``).
+    """
+    __tablename__ = 'reports'
+    __table_args__ = (
+        db.Index('ix_reports_ownerId_createdAt', 'ownerId', 'createdAt'),
+    )
+
+    GRANULARITIES = {'hour': 3600, 'day': 86400}
+    STATUSES = ('queued', 'running', 'done', 'failed')
+    AGGREGATES = ('avg', 'min', 'max')
+    COLUMNS = (('nodeId', 'nodeName', 'bucket', 'samples')
+               + tuple(f'{metric}_{agg}' for metric, agg in product(PerformanceData.METRICS, AGGREGATES))
+               + ('blockHeight_max', 'transactionCount_sum'))
+
+    id = db.Column(db.Integer, primary_key=True)
+    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))  # None: every node of the owner
+    ownerId = db.Column(db.Integer, db.ForeignKey('users.id'))
+    startDate = db.Column(db.DateTime)
+    endDate = db.Column(db.DateTime)
+    granularity = db.Column(db.String(10), default='day')
+    status = db.Column(db.String(20), default='queued', server_default='queued')
+    progress = db.Column(db.Float, default=0)
+    error = db.Column(db.String(500))
+    rowCount = db.Column(db.Integer)
+    createdAt = db.Column(db.DateTime, default=datetime.utcnow)
+    updatedAt = db.Column(db.DateTime)  # heartbeat of the worker building it
+    worker = db.Column(db.String(32))  # claim token of that worker
+    finishedAt = db.Column(db.DateTime)
+    contentCompressed = db.Column(db.LargeBinary)  # gzip NDJSON, small reports
+    contentPath = db.Column(db.String(500))  # gzip NDJSON file, large reports
+    contentSize = db.Column(db.Integer)  # compressed bytes
+    
+    def generateReport(self, id, startDate, endDate):
+        """Queue a report for node ``id``; it is built in the background."""
+        node = db.session.get(Node, id)
+        if node is None:
+            return None
+        return Report.create_report(node.ownerId, startDate, endDate, node_id=id)
+    
+    def exportReport(self, reportId):
+        """Iterate the rows of a finished report as dicts."""
+        report = db.session.get(Report, reportId)
+        if report is None or report.status != 'done':
+            return iter(())
+        return report.iter_rows()
+
+    @classmethod
+    def create_report(cls, owner_id, start, end, node_id=None, granularity='day'):
+        from app.services.reports import report_queue
+
+        if granularity not in cls.GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(cls.GRANULARITIES)}")
+        try:
+            report = cls(ownerId=owner_id, nodeId=node_id, startDate=start, endDate=end,
+                         granularity=granularity, status='queued', progress=0)
+            db.session.add(report)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Failed to create report: {str(e)}")
+        report_queue.submit(report.id)
+        return report
+
+    def chunks(self):
+        """Day-aligned ``(start, end)`` ranges the report is aggregated in."""
+        current = self.startDate
+        while current < self.endDate:
+            boundary = min(self.endDate, floor_time(current, 86400) + timedelta(days=1))
+            yield current, boundary
+            current = boundary
+
+    def _bucket(self, column):
+        """SQL expression truncating ``column`` to the report granularity."""
+        unit = self.granularity or 'day'
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            return db.func.date_trunc(unit, column)
+        pattern = '%Y-%m-%d 00:00:00' if unit == 'day' else '%Y-%m-%d %H:00:00'
+        if dialect == 'mysql':
+            return db.func.date_format(column, pattern)
+        return db.func.strftime(pattern, column)
+
+    def node_filter(self):
+        """Node ids covered by the report (a list or a subquery)."""
+        if self.nodeId is not None:
+            return [self.nodeId]
+        return db.select(Node.id).where(Node.ownerId == self.ownerId)
+
+    def aggregate(self, start, end, names=None):
+        """Aggregate one chunk in SQL; returns report rows ordered by bucket and node.
+
+        Performance metrics come from the hourly rollups (raw samples are
+        only kept for a few days), on-chain data from the raw table.
+        """
+        node_filter = self.node_filter()
+        names = names or {}
+
+        rollup = PerformanceRollup
+        bucket = self._bucket(rollup.bucket).label('bucket')
+        performance = db.session.query(
+            rollup.nodeId, bucket, rollup.metric,
+            db.func.sum(rollup.count),
+            db.func.sum(rollup.avg * rollup.count) / db.func.sum(rollup.count),
+            db.func.min(rollup.min),
+            db.func.max(rollup.max)
+        ).filter(
+            rollup.resolution == 3600,
+            rollup.nodeId.in_(node_filter),
+            rollup.bucket >= start,
+            rollup.bucket < end
+        ).group_by(rollup.nodeId, bucket, rollup.metric)
+
+        bucket = self._bucket(OnchainData.timestamp).label('bucket')
+        onchain = db.session.query(
+            OnchainData.nodeId, bucket,
+            db.func.max(OnchainData.blockHeight),
+            db.func.sum(OnchainData.transactionCount)
+        ).filter(
+            OnchainData.nodeId.in_(node_filter),
+            OnchainData.timestamp >= start,
+            OnchainData.timestamp < end
+        ).group_by(OnchainData.nodeId, bucket)
+
+        rows = {}
+
+        def row_for(node_id, bucket):
+            if isinstance(bucket, str):
+                bucket = datetime.fromisoformat(bucket)
+            key = (bucket, node_id)
+            if key not in rows:
+                rows[key] = dict.fromkeys(self.COLUMNS)
+                rows[key].update(nodeId=node_id, nodeName=names.get(node_id),
+                                 bucket=bucket.isoformat(), samples=0)
+            return rows[key]
+
+        for node_id, bucket, metric, count, avg, min_, max_ in performance:
+            if metric not in PerformanceData.METRICS:
+                continue
+            row = row_for(node_id, bucket)
+            row['samples'] = max(row['samples'], count or 0)
+            row.update({f'{metric}_avg': avg, f'{metric}_min': min_, f'{metric}_max': max_})
+        for node_id, bucket, block_height, transactions in onchain:
+            row = row_for(node_id, bucket)
+            row.update(blockHeight_max=block_height, transactionCount_sum=transactions)
+        return [rows[key] for key in sorted(rows)]
+
+    def open_content(self):
+        """Binary file object of the gzip NDJSON content, or None."""
+        if self.contentPath:
+            return open(self.contentPath, 'rb')
+        if self.contentCompressed is not None:
+            return io.BytesIO(self.contentCompressed)
+        return None
+
+    def iter_rows(self):
+        """Decompress and decode the stored rows one at a time."""
+        content = self.open_content()
+        if content is None:
+            return
+        with content, gzip.GzipFile(fileobj=content) as lines:
+            for line in lines:
+                yield json.loads(line)
+
+    def delete_report(self):
+        path = self.contentPath
+        try:
+            db.session.delete(self)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Failed to delete report: {str(e)}")
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nodeId': self.nodeId,
+            'from': self.startDate.isoformat() if self.startDate else None,
+            'to': self.endDate.isoformat() if self.endDate else None,
+            'granularity': self.granularity,
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+            'rows': self.rowCount,
+            'size': self.contentSize,
+            'createdAt': self.createdAt.isoformat() if self.createdAt else None,
+            'updatedAt': self.updatedAt.isoformat() if self.updatedAt else None,
+            'finishedAt': self.finishedAt.isoformat() if self.finishedAt else None
+        }
+
+class WebDisplay(db.Model):
+    __tablename__ = 'web_displays'
+    __table_args__ = (
+        db.Index('ix_web_displays_nodeId', 'nodeId', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
+    frameUrlLogs = db.Column(db.String(500))
+    frameUrlPerformance = db.Column(db.String(500))
+    
+    def generateIframeUrl(self, id, type):
+        """Compute the panel URL of node ``id`` locally; "" while the dashboard UID is unknown."""
+        node = db.session.get(Node, id)
+        if node is None or type not in DISPLAY_COLUMNS:
+            return ""
+        urls = grafana.node_urls(node.ipAddress, node.portNodeExporter, node.portPromtail)
+        return urls[DISPLAY_COLUMNS[type]] or ""
+    
+    def displayData(self, nodeId):
+        node = db.session.get(Node, nodeId)
+        return WebDisplay.for_node(node) if node is not None else None
+
+    @classmethod
+    def for_node(cls, node):
+        """Iframe URLs of a node without calling Grafana.
+
+        Stored URLs are returned as is. Otherwise they are computed from the
+        cached dashboard UIDs and stored; if a UID is not known yet the node
+        is queued for background registration and its URL is None.
+        """
+        display = cls.query.filter_by(nodeId=node.id).first()
+        if display is not None and display.frameUrlPerformance and display.frameUrlLogs:
+            return display.to_dict()
+
+        grafana.seed_from_db()
+        urls = grafana.node_urls(node.ipAddress, node.portNodeExporter, node.portPromtail)
+        if any(urls.values()):
+            try:
+                if display is None:
+                    display = cls(nodeId=node.id)
+                    db.session.add(display)
+                display.frameUrlPerformance = urls['frameUrlPerformance']
+                display.frameUrlLogs = urls['frameUrlLogs']
+                db.session.commit()
+            except Exception as e:
+                # Another request stored the row first; the computed URLs are still valid
+                db.session.rollback()
+                print(f"Failed to store web display: {str(e)}")
+        if not all(urls.values()):
+            grafana.register([node.id])
+        return dict(urls, nodeId=node.id, pending=not all(urls.values()))
+
+    def to_dict(self):
+        return {
+            'nodeId': self.nodeId,
+            'frameUrlPerformance': self.frameUrlPerformance,
+            'frameUrlLogs': self.frameUrlLogs,
+            'pending': False
+        }
+
+class ScriptBlob(db.Model):
+    """Rendered script content, stored once per distinct content (sha256)."""
+    __tablename__ = 'script_blobs'
+
+    hash = db.Column(db.String(64), primary_key=True)
+    content = db.Column(db.Text, nullable=False)
+    createdAt = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def store(cls, content_hash, content):
+        """Add the blob to the session unless it is already stored."""
+        if db.session.get(cls, content_hash) is None:
+            db.session.add(cls(hash=content_hash, content=content))
+
+    @classmethod
+    def prune(cls, hashes):
+        """Delete the given blobs that no script references any more."""
+        hashes = [h for h in hashes if h]
+        if not hashes:
+            return
+        referenced = db.session.query(ScriptGenerator.id).filter(ScriptGenerator.contentHash == cls.hash)
+        cls.query.filter(cls.hash.in_(hashes), ~referenced.exists()).delete(synchronize_session=False)
+
+class ScriptGenerator(db.Model):
+    __tablename__ = 'script_generators'
+    __table_args__ = (
+        db.Index('ix_script_generators_nodeId_typeScript', 'nodeId', 'typeScript', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    nodeId = db.Column(db.Integer, db.ForeignKey('nodes.id'))
+    typeScript = db.Column(db.Enum(TypeScript))
+    scriptContent = db.Column(db.Text)  # legacy per-row copy; new rows reference script_blobs
+    contentHash = db.Column(db.String(64), db.ForeignKey('script_blobs.hash'), index=True)
+
+    blob = db.relationship('ScriptBlob')
+
+    DEFAULT_PORTS = {TypeScript.NODE_EXPORTER: 9100, TypeScript.PROMTAIL: 9080, TypeScript.LOKI: 3100}
+
+    @property
+    def content(self):
+        return self.blob.content if self.blob is not None else self.scriptContent
+    
+    def generateScript(self, id, port, ip, type, **options):
+        """Render the install script of ``type`` for node ``id`` (cached, see ``script_renderer``)."""
+        type = TypeScript(type)
+        content, self._hash = script_renderer.render(type.value, ip=ip, port=port, **options)
+        self.nodeId = id
+        self.typeScript = type
+        self._content = content
+        return content
+    
+    def saveScript(self):
+        """Store the last generated script; identical content is stored once."""
+        try:
+            previous = self.contentHash
+            ScriptBlob.store(self._hash, self._content)
+            self.contentHash = self._hash
+            self.scriptContent = None
+            db.session.add(self)
+            db.session.flush()
+            if previous != self._hash:
+                ScriptBlob.prune([previous])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Failed to save script: {str(e)}")
+
+    @classmethod
+    def for_node(cls, node, type, **options):
+        """Render a node's script and record it; returns ``(content, content_hash)``.
+
+        The row is only written when the content changed, so repeated
+        downloads of the same script cost no write.
+        """
+        type = TypeScript(type)
+        port = options.pop('port', None) or {
+            TypeScript.NODE_EXPORTER: node.portNodeExporter,
+            TypeScript.PROMTAIL: node.portPromtail,
+        }.get(type) or cls.DEFAULT_PORTS[type]
+        script = cls.query.filter_by(nodeId=node.id, typeScript=type).first() or cls()
+        content = script.generateScript(node.id, port, node.ipAddress, type, **options)
+        if script.contentHash != script._hash:
+            try:
+                script.saveScript()
+            except Exception as e:
+                # Concurrent first download of the same script; serve it anyway
+                print(f"Failed to store script: {str(e)}")
+        return content, script._hash
+
+class ExternalSystem(db.Model):
+    __tablename__ = 'external_systems'
+
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(50))
+    apiKey = db.Column(db.String(200))
+    
+    def fetchIframeUrlFromGrafana(self, nodeId, id, type):
+        """Panel URL of ``type`` for a node, looking the dashboard up in Grafana if needed.
+
+        ``id`` overrides the configured panel id. Meant for background use;
+        request handlers should use ``WebDisplay.for_node``.
+        """
+        node = db.session.get(Node, nodeId)
+        if node is None or type not in DISPLAY_COLUMNS:
+            return ""
+        grafana.resolve(token=self.apiKey)
+        port = node.portNodeExporter if type == 'performance' else node.portPromtail
+        return grafana.panel_url(type, node.ipAddress, port, panel_id=id) or ""
+    
+    def fetchLogFromLoki(self, id, query, startTime=None, endTime=None):
+        """Iterate the log entries of node ``id``; ``query`` is a LogQL pipeline."""
+        node = db.session.get(Node, id)
+        if node is None:
+            return iter(())
+        endTime = endTime or datetime.utcnow()
+        startTime = startTime or endTime - timedelta(hours=1)
+        return loki.entries(loki.node_query(node.ipAddress, query), startTime, endTime, token=self.apiKey)
+    
+    def sendTelegramMessage(self, message, chatId=None):
+        """Queue a message to a chat through this bot; sent in the background."""
+        return notifier.enqueue(chatId, message, token=self.apiKey)
+    
+    def addTargetToGrafana(self, nodeId, ipAddress, port):
+        """Queue the node's display URLs; calls within a short window share one lookup and insert.
+
+        The URLs are computed from the node row, so ``ipAddress`` and
+        ``port`` only need to be stored on it.
+        """
+        return grafana.register([nodeId])
+
+@auth.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    current_user_id = get_jwt_identity()
+    
+    # Log the logout action
+    try:
+        AccessLog.log_access(current_user_id, "User logged out")
+        print("Logout action logged successfully")  # Debug statement
+    except Exception as e:
+        print(f"Failed to log access: {str(e)}")
+    
+    logout_user()
+    return jsonify({'msg': 'User logged out successfully'}), 200
@@ -0,0 +1,234 @@
+"""Incremental alert rule evaluation over ingested PerformanceData.
+
+Rules are ``Alert`` rows with a metric. They are loaded once into memory and
+indexed by ``(nodeId, metric)``, so each ingested sample only touches the
+rules that watch it; the database is not queried per rule or per tick.
+
+``threshold`` rules fire when the condition has held for every sample over
+the last ``duration`` seconds and resolve on the first sample where it does
+not. ``rate`` rules keep a rolling window of ``duration`` seconds and compare
+the per-second change across it. Only transitions (ok -> firing and
+firing -> ok) are acted on: the new state is written to the alert row and,
+once committed, an ``alert.fired`` / ``alert.resolved`` event is published
+to the owner and a notification is queued for the alert's Telegram
+destination. A transition that cannot be stored is rolled back in memory
+and retried on the next sample.
+The stored state is loaded back on restart, so an alert that is already
+firing does not fire again.
+
+Rules are reloaded when an alert or node changes in this process and at
+least every ``ALERT_RULES_REFRESH`` seconds.
+"""
+import operator
+import threading
+import time
+from collections import deque
+
+from app import db
+from app.services.event_hub import event_hub
+from app.services.notifier import notifier
+from app.utils.timeutils import EPOCH
+
+FIRING = 'firing'
+OK = 'ok'
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+
+class RuleState:
+    """In-memory state of one rule."""
+
+    def __init__(self, alert_id, owner_id, kind, metric, op, threshold, duration, state,
+                 message=None, destination=None):
+        self.alert_id = alert_id
+        self.owner_id = owner_id
+        self.message = message
+        self.destination = destination
+        self.kind = kind
+        self.metric = metric
+        self.op = op
+        self.compare = OPERATORS[op]
+        self.threshold = threshold
+        self.duration = duration or 0
+        self.state = state or OK
+        self.breach_since = None
+        self.window = deque()
+
+    def same_rule(self, other):
+        return (self.kind, self.metric, self.op, self.threshold, self.duration) == \
+            (other.kind, other.metric, other.op, other.threshold, other.duration)
+
+    def observe(self, ts, value):
+        """Feed one sample; returns the new state on a transition, else None."""
+        if self.kind == 'rate':
+            breaching = self._observe_rate(ts, value)
+        else:
+            breaching = self._observe_threshold(ts, value)
+        if breaching is None:
+            return None
+
+        state = FIRING if breaching else OK
+        if state == self.state:
+            return None
+        self.state = state
+        return state
+
+    def _observe_threshold(self, ts, value):
+        if not self.compare(value, self.threshold):
+            self.breach_since = None
+            return False
+        if self.breach_since is None:
+            self.breach_since = ts
+        # Keep the current state until the condition has held long enough
+        if ts - self.breach_since >= self.duration:
+            return True
+        return None if self.state == OK else True
+
+    def _observe_rate(self, ts, value):
+        window = self.window
+        window.append((ts, value))
+        while len(window) > 2 and ts - window[1][0] >= self.duration:
+            window.popleft()
+        first_ts, first_value = window[0]
+        elapsed = ts - first_ts
+        if elapsed <= 0 or elapsed < self.duration:
+            return None
+        return self.compare((value - first_value) / elapsed, self.threshold)
+
+
+class AlertEngine:
+    def __init__(self, app=None):
+        self.app = None
+        self.refresh_interval = 300
+        self._index = {}
+        self._loaded_at = None
+        self._dirty = True
+        self._lock = threading.RLock()
+        self._stats = {'samples': 0, 'evaluations': 0, 'fired': 0, 'resolved': 0, 'store_errors': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.refresh_interval = app.config.get('ALERT_RULES_REFRESH', 300)
+        app.extensions['alert_engine'] = self
+
+    def invalidate(self):
+        """Reload the rules before the next evaluation."""
+        self._dirty = True
+
+    def evaluate(self, rows):
+        """Evaluate PerformanceData sample dicts against the indexed rules."""
+        transitions = []
+        with self._lock:
+            self._ensure_loaded()
+            for row in rows:
+                self._stats['samples'] += 1
+                node_id = row['nodeId']
+                ts = (row['timestamp'] - EPOCH).total_seconds()
+                for metric, value in row.items():
+                    if value is None:
+                        continue
+                    for rule in self._index.get((node_id, metric), ()):
+                        self._stats['evaluations'] += 1
+                        state = rule.observe(ts, value)
+                        if state is not None:
+                            self._stats['fired' if state == FIRING else 'resolved'] += 1
+                            transitions.append((rule, node_id, state, value, row['timestamp']))
+        if transitions and not self._apply(transitions):
+            return []
+        return transitions
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['rules'] = sum(len(rules) for rules in self._index.values())
+        return stats
+
+    def _ensure_loaded(self):
+        if (not self._dirty and self._loaded_at is not None
+                and time.monotonic() - self._loaded_at < self.refresh_interval):
+            return
+        from app.models.models import Alert, Node
+
+        with self.app.app_context():
+            rows = db.session.query(
+                Alert.id, Alert.nodeId, Node.ownerId, Alert.kind, Alert.metric,
+                Alert.operator, Alert.threshold, Alert.duration, Alert.state,
+                Alert.message, Alert.destination
+            ).join(Node, Node.id == Alert.nodeId).filter(Alert.metric.isnot(None)).all()
+
+        # Keep the windows of rules that did not change
+        previous = {rule.alert_id: rule for rules in self._index.values() for rule in rules}
+        index = {}
+        for alert_id, node_id, owner_id, kind, metric, op, threshold, duration, state, message, destination in rows:
+            rule = RuleState(alert_id, owner_id, kind or 'threshold', metric, op, threshold, duration, state,
+                             message, destination)
+            old = previous.get(alert_id)
+            if old is not None and old.same_rule(rule):
+                old.message, old.destination = message, destination
+                rule = old
+            index.setdefault((node_id, metric), []).append(rule)
+        self._index = index
+        self._loaded_at = time.monotonic()
+        self._dirty = False
+
+    def _apply(self, transitions):
+        """Persist state changes, then publish them; one UPDATE per transition.
+
+        Returns False if the states could not be stored: the rules are then
+        put back in their previous state so the next sample retries the
+        transition, and nothing is published or sent.
+        """
+        from app.models.models import Alert, User
+
+        alerts = Alert.__table__
+        with self.app.app_context():
+            try:
+                for rule, node_id, state, value, at in transitions:
+                    db.session.execute(
+                        alerts.update().where(alerts.c.id == rule.alert_id)
+                        .values(state=state, stateChangedAt=at)
+                    )
+                User.bump_fleet_version({rule.owner_id for rule, *_ in transitions})
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Failed to store alert states: {str(e)}")
+                with self._lock:
+                    restored = set()
+                    for rule, node_id, state, value, at in transitions:
+                        # The first transition of a rule in the batch tells its previous state
+                        if rule.alert_id not in restored:
+                            restored.add(rule.alert_id)
+                            rule.state = OK if state == FIRING else FIRING
+                        self._stats['fired' if state == FIRING else 'resolved'] -= 1
+                    self._stats['store_errors'] += 1
+                return False
+
+        for rule, node_id, state, value, at in transitions:
+            event_hub.publish(rule.owner_id, 'alert.fired' if state == FIRING else 'alert.resolved', {
+                'id': rule.alert_id,
+                'nodeId': node_id,
+                'metric': rule.metric,
+                'value': value,
+                'state': state,
+                'at': at.isoformat()
+            })
+            if rule.destination:
+                notifier.enqueue(rule.destination, self._notification(rule, node_id, state, value))
+        return True
+
+    @staticmethod
+    def _notification(rule, node_id, state, value):
+        label = 'FIRING' if state == FIRING else 'RESOLVED'
+        metric = f'rate({rule.metric})' if rule.kind == 'rate' else rule.metric
+        return f'[{label}] {rule.message} (node {node_id}: {metric} = {value:g})'
+
+
+alert_engine = AlertEngine()
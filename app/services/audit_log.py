@@ -0,0 +1,117 @@
+"""Buffered writer for AccessLog records.
+
+Login/logout only put a record on an in-memory queue; a flush thread
+bulk-inserts the queue every ``AUDIT_LOG_BATCH_SIZE`` records or
+``AUDIT_LOG_FLUSH_INTERVAL_MS`` milliseconds, whichever comes first. When
+the database falls behind and the queue is full, callers wait up to
+``AUDIT_LOG_ENQUEUE_TIMEOUT_MS`` and the record is then dropped and counted.
+"""
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+from app import db
+
+
+class AuditLogWriter:
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._atexit_registered = False
+        self._stats_lock = threading.Lock()
+        self._stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'flushes': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = app.config.get('AUDIT_LOG_BATCH_SIZE', 100)
+        self.flush_interval = app.config.get('AUDIT_LOG_FLUSH_INTERVAL_MS', 500) / 1000.0
+        self.enqueue_timeout = app.config.get('AUDIT_LOG_ENQUEUE_TIMEOUT_MS', 50) / 1000.0
+        self._queue = queue.Queue(maxsize=app.config.get('AUDIT_LOG_QUEUE_SIZE', 10000))
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+        app.extensions['audit_log'] = self
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Flush whatever is queued and stop the writer thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def log(self, user_id, action):
+        """Queue an access log record; never blocks longer than the enqueue timeout."""
+        if self._thread is None:
+            self.start()
+        record = {'userId': user_id, 'action': action, 'timestamp': datetime.utcnow()}
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._count('dropped')
+            return False
+        self._count('enqueued')
+        return True
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+            if self._stop.is_set() and self._queue.empty():
+                break
+
+    def _collect(self):
+        """Gather up to batch_size records or whatever arrives within one interval."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        from app.models.models import AccessLog
+
+        with self.app.app_context():
+            try:
+                db.session.execute(AccessLog.__table__.insert(), batch)
+                db.session.commit()
+                self._count('written', len(batch))
+                self._count('flushes')
+            except Exception as e:
+                db.session.rollback()
+                self._count('failed', len(batch))
+                print(f"Failed to write access logs: {str(e)}")
+
+
+audit_log = AuditLogWriter()
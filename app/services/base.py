@@ -0,0 +1,41 @@
+"""Shared scaffolding for background services."""
+import threading
+
+
+class PeriodicService:
+    """Call ``run_once`` every ``interval`` seconds on a daemon thread.
+
+    Subclasses set ``name`` and ``interval`` (usually in ``init_app``) and
+    implement ``run_once``. Errors are logged and the loop keeps going.
+    """
+    name = 'periodic-service'
+
+    def __init__(self):
+        self.app = None
+        self.interval = 60
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in {self.name}: {str(e)}")
+            self._stop.wait(self.interval)
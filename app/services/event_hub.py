@@ -0,0 +1,132 @@
+"""In-process broadcast hub for per-user dashboard events.
+
+Producers (the prober, node routes, the alert engine) ``publish`` an event
+for a user; every open ``/api/nodes/stream`` connection of that user gets it
+on its own bounded queue. The last ``SSE_BUFFER_SIZE`` events of each user
+are kept so a reconnecting client can resume from ``Last-Event-ID``; when
+the id is older than the buffer (or from another process lifetime) the
+client gets a fresh snapshot instead.
+
+The hub only reaches streams served by the same process. Serve the app
+from one gevent/threaded worker process with ``BACKGROUND_TASKS_ENABLED``
+set, so the prober, alert engine and report queue publish where the
+clients are connected.
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+
+class Subscription:
+    def __init__(self, user_id, max_size):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=max_size)
+        # Set when the client fell too far behind; it must reconnect and resync
+        self.overflowed = False
+
+    def get(self, timeout=None):
+        """Return the next event, or None if nothing arrived within ``timeout``."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    def __init__(self, app=None):
+        self.app = None
+        self.buffer_size = 1000
+        self.queue_size = 1000
+        # Event ids are "<generation>-<sequence>"; the generation changes per process
+        self.generation = format(int(time.time() * 1000), 'x')
+        self._sequence = 0
+        self._buffers = {}
+        self._evicted = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.buffer_size = app.config.get('SSE_BUFFER_SIZE', self.buffer_size)
+        self.queue_size = app.config.get('SSE_QUEUE_SIZE', self.queue_size)
+        app.extensions['event_hub'] = self
+
+    def publish(self, user_id, event_type, data):
+        """Record an event for a user and fan it out to their open streams."""
+        if user_id is None:
+            return None
+        user_id = int(user_id)
+        with self._lock:
+            self._sequence += 1
+            event = {'id': self.format_id(self._sequence), 'seq': self._sequence,
+                     'type': event_type, 'data': data}
+            buffer = self._buffers.get(user_id)
+            if buffer is None:
+                buffer = self._buffers[user_id] = deque()
+            buffer.append(event)
+            if len(buffer) > self.buffer_size:
+                self._evicted[user_id] = buffer.popleft()['seq']
+            subscribers = list(self._subscribers.get(user_id, ()))
+
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.overflowed = True
+        return event
+
+    def subscribe(self, user_id):
+        """Open a subscription; returns it with the id of the latest event."""
+        subscription = Subscription(int(user_id), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(subscription.user_id, set()).add(subscription)
+            return subscription, self._sequence
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def since(self, user_id, last_event_id):
+        """Return the user's events after ``last_event_id``, or None to resync.
+
+        None means the id is unknown, from another process lifetime, or older
+        than what is still buffered.
+        """
+        sequence = self.parse_id(last_event_id)
+        if sequence is None:
+            return None
+        user_id = int(user_id)
+        with self._lock:
+            if sequence > self._sequence or sequence < self._evicted.get(user_id, 0):
+                return None
+            return [e for e in self._buffers.get(user_id, ()) if e['seq'] > sequence]
+
+    def parse_id(self, event_id):
+        try:
+            generation, sequence = event_id.rsplit('-', 1)
+            sequence = int(sequence)
+        except (AttributeError, ValueError):
+            return None
+        return sequence if generation == self.generation else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'last_event': self._sequence,
+                'users': len(self._buffers),
+                'buffered': sum(len(b) for b in self._buffers.values()),
+                'streams': sum(len(s) for s in self._subscribers.values())
+            }
+
+    def format_id(self, sequence):
+        return f'{self.generation}-{sequence}'
+
+
+event_hub = EventHub()
@@ -0,0 +1,298 @@
+"""Grafana panel URLs for node pages.
+
+A panel URL only depends on the dashboard UID/slug and the node's address,
+so it is computed locally: ``/d-solo/<uid>/<slug>?orgId&panelId&var-...``.
+The UIDs of the configured dashboards (``GRAFANA_PERFORMANCE_DASHBOARD``,
+``GRAFANA_LOGS_DASHBOARD``, matched by title) are looked up with one
+``/api/search`` call and kept in-process; computed URLs are stored in
+``web_displays`` so node pages read them from the database and never wait
+on Grafana. After a restart the UIDs are recovered from a stored URL.
+
+Nodes are registered in the background: ``register`` queues node ids (or
+all nodes of an owner, where the new ids are not known) and a burst within
+``GRAFANA_REGISTER_COALESCE_MS`` becomes one dashboard lookup and one
+bulk insert of display rows. If the lookup fails the nodes stay queued and
+are retried after ``GRAFANA_LOOKUP_RETRY`` seconds.
+"""
+import re
+import threading
+import time
+from string import Template
+from urllib.parse import urlencode, urlparse
+
+from app import db
+from app.services.http_client import http_client
+
+DISPLAY_TYPES = ('performance', 'logs')
+COLUMNS = {'performance': 'frameUrlPerformance', 'logs': 'frameUrlLogs'}
+
+_SOLO_PATH_RE = re.compile(r'/d(?:-solo)?/([^/?#]+)/([^/?#]+)')
+
+
+class GrafanaClient:
+    def __init__(self, app=None):
+        self.app = None
+        self.url = None
+        self.api_url = None
+        self.api_key = None
+        self.org_id = 1
+        self.theme = 'light'
+        self.time_range = ('now-1h', 'now')
+        self.dashboards = {}
+        self.panels = {}
+        self.variables = {}
+        self.retry_interval = 60
+        self.coalesce_delay = 0.5
+        self._uids = {}
+        self._lookup_failed_at = None
+        self._pending_nodes = set()
+        self._pending_owners = set()
+        self._timer = None
+        self._lock = threading.RLock()
+        self._lookup_lock = threading.Lock()
+        self._stats = {'lookups': 0, 'lookup_errors': 0, 'registered': 0, 'computed': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.url = (app.config.get('GRAFANA_URL') or '').rstrip('/') or None
+        self.api_url = (app.config.get('GRAFANA_API_URL') or '').rstrip('/') or self.url
+        self.api_key = app.config.get('GRAFANA_API_KEY')
+        self.org_id = app.config.get('GRAFANA_ORG_ID', self.org_id)
+        self.theme = app.config.get('GRAFANA_THEME', self.theme)
+        self.time_range = (app.config.get('GRAFANA_TIME_FROM', 'now-1h'), app.config.get('GRAFANA_TIME_TO', 'now'))
+        self.dashboards = {
+            'performance': app.config.get('GRAFANA_PERFORMANCE_DASHBOARD', 'Node Exporter Full'),
+            'logs': app.config.get('GRAFANA_LOGS_DASHBOARD', 'Node Logs'),
+        }
+        self.panels = {
+            'performance': app.config.get('GRAFANA_PERFORMANCE_PANEL_ID', 1),
+            'logs': app.config.get('GRAFANA_LOGS_PANEL_ID', 1),
+        }
+        self.variables = {
+            'performance': app.config.get('GRAFANA_PERFORMANCE_VARS', 'instance=$ip:$port'),
+            'logs': app.config.get('GRAFANA_LOGS_VARS', 'host=$ip'),
+        }
+        self.retry_interval = app.config.get('GRAFANA_LOOKUP_RETRY', self.retry_interval)
+        self.coalesce_delay = app.config.get('GRAFANA_REGISTER_COALESCE_MS', 500) / 1000.0
+        with self._lock:
+            self._uids = {}
+            self._lookup_failed_at = None
+        app.extensions['grafana'] = self
+
+    @property
+    def configured(self):
+        return self.url is not None
+
+    def dashboard(self, display_type):
+        """Cached ``(uid, slug)`` of a dashboard, or None; never calls Grafana."""
+        with self._lock:
+            return self._uids.get(display_type)
+
+    def seed(self, display_type, url):
+        """Recover a dashboard UID from a stored panel URL."""
+        match = _SOLO_PATH_RE.search(urlparse(url or '').path)
+        if match:
+            with self._lock:
+                self._uids.setdefault(display_type, (match.group(1), match.group(2)))
+
+    def seed_from_db(self):
+        """Recover the UIDs from stored rows so a restart needs no lookup."""
+        from app.models.models import WebDisplay
+
+        if all(self.dashboard(t) for t in DISPLAY_TYPES):
+            return
+        row = db.session.query(WebDisplay.frameUrlPerformance, WebDisplay.frameUrlLogs).filter(
+            WebDisplay.frameUrlPerformance.isnot(None), WebDisplay.frameUrlLogs.isnot(None)
+        ).first()
+        if row is not None:
+            self.seed('performance', row.frameUrlPerformance)
+            self.seed('logs', row.frameUrlLogs)
+
+    def resolve(self, token=None):
+        """Look up the UIDs of every configured dashboard with one search call.
+
+        Returns True when all of them are known. A failed lookup is not
+        retried for ``GRAFANA_LOOKUP_RETRY`` seconds.
+        """
+        if all(self.dashboard(t) for t in DISPLAY_TYPES):
+            return True
+        if not self.api_url:
+            return False
+        with self._lookup_lock:
+            with self._lock:
+                missing = [t for t in DISPLAY_TYPES if t not in self._uids]
+                failed_at = self._lookup_failed_at
+            if not missing:
+                return True
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_interval:
+                return False
+
+            token = token or self.api_key or self._default_token()
+            headers = {'Authorization': f'Bearer {token}'} if token else {}
+            self._count('lookups')
+            try:
+                response = http_client.get(f'{self.api_url}/api/search', params={'type': 'dash-db'},
+                                           headers=headers)
+                response.raise_for_status()
+                results = response.json()
+            except Exception as e:
+                print(f"Grafana dashboard lookup failed: {str(e)}")
+                self._count('lookup_errors')
+                with self._lock:
+                    self._lookup_failed_at = time.monotonic()
+                return False
+
+            found = {}
+            for display_type in missing:
+                wanted = str(self.dashboards[display_type])
+                for dashboard in results:
+                    if wanted in (dashboard.get('title'), dashboard.get('uid')):
+                        match = _SOLO_PATH_RE.search(dashboard.get('url') or '')
+                        slug = match.group(2) if match else 'dashboard'
+                        found[display_type] = (dashboard['uid'], slug)
+                        break
+                else:
+                    print(f"Grafana dashboard not found: {wanted}")
+            with self._lock:
+                self._uids.update(found)
+                self._lookup_failed_at = None if len(found) == len(missing) else time.monotonic()
+                return all(t in self._uids for t in DISPLAY_TYPES)
+
+    def panel_url(self, display_type, ip_address, port=None, panel_id=None):
+        """Panel iframe URL from the cached UID, or None while it is unknown."""
+        dashboard = self.dashboard(display_type)
+        if dashboard is None or self.url is None or not ip_address:
+            return None
+        uid, slug = dashboard
+        params = [('orgId', self.org_id), ('panelId', panel_id or self.panels[display_type])]
+        variables = Template(self.variables[display_type]).safe_substitute(
+            ip=ip_address, port='' if port is None else port
+        )
+        for pair in variables.split('&'):
+            if '=' in pair:
+                name, value = pair.split('=', 1)
+                params.append((f'var-{name.strip()}', value.strip()))
+        params += [('from', self.time_range[0]), ('to', self.time_range[1]), ('theme', self.theme)]
+        self._count('computed')
+        return f'{self.url}/d-solo/{uid}/{slug}?{urlencode(params)}'
+
+    def node_urls(self, ip_address, port_node_exporter=None, port_promtail=None):
+        """``{column: url}`` of both display types for one node."""
+        return {
+            COLUMNS['performance']: self.panel_url('performance', ip_address, port_node_exporter),
+            COLUMNS['logs']: self.panel_url('logs', ip_address, port_promtail),
+        }
+
+    def register(self, node_ids=(), owner_id=None):
+        """Queue nodes (or every node of ``owner_id``) for display URL computation."""
+        if not self.configured:
+            return False
+        with self._lock:
+            self._pending_nodes.update(node_ids)
+            if owner_id is not None:
+                self._pending_owners.add(owner_id)
+            self._arm(self.coalesce_delay)
+        return True
+
+    def flush(self):
+        """Compute and store the display rows of every queued node now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            node_ids, self._pending_nodes = self._pending_nodes, set()
+            owner_ids, self._pending_owners = self._pending_owners, set()
+        if not node_ids and not owner_ids:
+            return 0
+        with self.app.app_context():
+            self.seed_from_db()
+            if not self.resolve():
+                # Keep them queued and try again once the lookup may be retried
+                with self._lock:
+                    self._pending_nodes.update(node_ids)
+                    self._pending_owners.update(owner_ids)
+                    self._arm(self.retry_interval + self.coalesce_delay)
+                return 0
+            return self._store_displays(node_ids, owner_ids)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['dashboards'] = {t: uid for t, (uid, _) in self._uids.items()}
+            stats['pending'] = len(self._pending_nodes) + len(self._pending_owners)
+        return stats
+
+    def _arm(self, delay):
+        """Schedule a background flush unless one is already scheduled; call with the lock held."""
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_in_background(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Failed to register nodes with Grafana: {str(e)}")
+
+    def _store_displays(self, node_ids, owner_ids):
+        """Insert or update the display rows of the given nodes in one batch each."""
+        from app.models.models import Node, WebDisplay
+
+        conditions = []
+        if node_ids:
+            conditions.append(Node.id.in_(node_ids))
+        if owner_ids:
+            conditions.append(Node.ownerId.in_(owner_ids))
+        rows = db.session.query(
+            Node.id, Node.ipAddress, Node.portNodeExporter, Node.portPromtail, WebDisplay.id
+        ).outerjoin(WebDisplay, WebDisplay.nodeId == Node.id).filter(db.or_(*conditions)).all()
+
+        inserts, updates = [], []
+        for node_id, ip_address, port_node_exporter, port_promtail, display_id in rows:
+            urls = self.node_urls(ip_address, port_node_exporter, port_promtail)
+            if display_id is None:
+                inserts.append(dict(urls, nodeId=node_id))
+            else:
+                updates.append({'display_id': display_id,
+                                'performance_url': urls['frameUrlPerformance'],
+                                'logs_url': urls['frameUrlLogs']})
+
+        displays = WebDisplay.__table__
+        try:
+            if inserts:
+                db.session.execute(displays.insert(), inserts)
+            if updates:
+                db.session.execute(
+                    displays.update().where(displays.c.id == db.bindparam('display_id')).values(
+                        frameUrlPerformance=db.bindparam('performance_url'),
+                        frameUrlLogs=db.bindparam('logs_url')
+                    ),
+                    updates
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self._count('registered', len(rows))
+        return len(rows)
+
+    def _default_token(self):
+        """API key of the ``grafana`` ExternalSystem row, if one is configured."""
+        from app.models.models import ExternalSystem
+
+        with self.app.app_context():
+            system = ExternalSystem.query.filter_by(type='grafana').first()
+            self.api_key = system.apiKey if system is not None else None
+        return self.api_key
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+
+grafana = GrafanaClient()
@@ -0,0 +1,155 @@
+"""Shared HTTP client for probes, scrapes and external integrations.
+
+One ``requests.Session`` with a pooled adapter is shared by every caller, so
+connections to the same host are kept alive and reused instead of paying a
+TCP handshake per request. The adapter keeps up to ``HTTP_POOL_HOSTS``
+per-host pools of ``HTTP_POOL_MAXSIZE`` connections each. Requests use
+``(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)`` unless the caller passes its
+own timeout, and idempotent requests are retried ``HTTP_RETRIES`` times on
+connection errors and 502/503/504 with exponential backoff and full jitter.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+RETRY_STATUSES = (502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+
+class HttpClient:
+    def __init__(self, app=None):
+        self.app = None
+        self.connect_timeout = 3
+        self.read_timeout = 10
+        self.retries = 2
+        self.backoff = 0.2
+        self.backoff_max = 5
+        self.keep_alive = True
+        self.pool_hosts = 1024
+        self.pool_maxsize = 4
+        self._session = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'retries': 0, 'errors': 0}
+        self._hosts = OrderedDict()  # scheme://host:port -> counters, most recent last
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.connect_timeout = app.config.get('HTTP_CONNECT_TIMEOUT', self.connect_timeout)
+        self.read_timeout = app.config.get('HTTP_READ_TIMEOUT', self.read_timeout)
+        self.retries = app.config.get('HTTP_RETRIES', self.retries)
+        self.backoff = app.config.get('HTTP_RETRY_BACKOFF', self.backoff)
+        self.backoff_max = app.config.get('HTTP_RETRY_BACKOFF_MAX', self.backoff_max)
+        self.keep_alive = app.config.get('HTTP_KEEP_ALIVE', self.keep_alive)
+        self.pool_hosts = app.config.get('HTTP_POOL_HOSTS', self.pool_hosts)
+        self.pool_maxsize = app.config.get('HTTP_POOL_MAXSIZE', self.pool_maxsize)
+        self.close()
+        app.extensions['http_client'] = self
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        session = requests.Session()
+        # Retries are done in request() so they can be jittered and overridden per call
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_hosts,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        """Send a request through the shared pool, retrying transient failures."""
+        method = method.upper()
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        if retries is None:
+            retries = self.retries
+        if method not in IDEMPOTENT_METHODS:
+            retries = 0
+
+        host = self._host(url)
+        attempt = 0
+        while True:
+            self._count('requests', host)
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (ConnectionError, Timeout):
+                if attempt >= retries:
+                    self._count('errors', host)
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                response.close()
+            attempt += 1
+            self._count('retries', host)
+            time.sleep(self._backoff(attempt))
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _backoff(self, attempt):
+        """Full jitter: a random delay up to the exponential backoff ceiling."""
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempt - 1)))
+
+    def _count(self, key, host=None):
+        with self._stats_lock:
+            self._stats[key] += 1
+            if host is None:
+                return
+            counts = self._hosts.get(host)
+            if counts is None:
+                counts = self._hosts[host] = {'requests': 0, 'retries': 0, 'errors': 0}
+                # Same bound as the connection pools
+                while len(self._hosts) > self.pool_hosts:
+                    self._hosts.popitem(last=False)
+            else:
+                self._hosts.move_to_end(host)
+            counts[key] += 1
+
+    @staticmethod
+    def _host(url):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        return f'{parts.scheme}://{parts.hostname}:{port}'
+
+    def stats(self):
+        """Request counters, overall and per host, and the number of host pools."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            hosts = [dict(counts, host=host) for host, counts in self._hosts.items()]
+        session = self._session
+        stats['pools'] = len(session.get_adapter('http://').poolmanager.pools) if session is not None else 0
+        stats['hosts'] = hosts
+        return stats
+
+
+http_client = HttpClient()
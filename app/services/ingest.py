@@ -0,0 +1,231 @@
+"""Scrape node_exporter and store PerformanceData samples.
+
+Each node's ``/metrics`` body is parsed line by line while it streams in;
+only the metric families needed for ``PerformanceData`` are kept. Samples
+are inserted with one executemany per batch instead of one commit per row.
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from requests.exceptions import RequestException
+
+from app import db
+from app.services.base import PeriodicService
+from app.services.http_client import http_client
+from app.services.alerting import alert_engine
+
+# Metric families used to derive a PerformanceData row
+WANTED_METRICS = (
+    'node_cpu_seconds_total',
+    'node_memory_MemAvailable_bytes',
+    'node_memory_MemTotal_bytes',
+    'node_filesystem_avail_bytes',
+    'node_filesystem_size_bytes',
+    'node_network_receive_bytes_total',
+    'node_network_transmit_bytes_total',
+    'node_boot_time_seconds',
+    'node_time_seconds',
+)
+
+_LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(lines, wanted=WANTED_METRICS):
+    """Yield ``(name, labels, value)`` from Prometheus text-format lines.
+
+    ``lines`` may be any iterable (e.g. ``response.iter_lines()``) so the
+    body is never held in memory as a whole. Comments and families not in
+    ``wanted`` are skipped before any label parsing happens.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        if not line or line[0] == '#' or not line.startswith(wanted):
+            continue
+
+        brace = line.find('{')
+        if brace == -1:
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            name, labels, rest = parts[0], {}, parts[1]
+        else:
+            close = line.rfind('}')
+            if close == -1:
+                continue
+            name = line[:brace]
+            labels = {k: v.replace('\\"', '"').replace('\\\\', '\\')
+                      for k, v in _LABEL_RE.findall(line[brace + 1:close])}
+            tail = line[close + 1:].split()
+            if not tail:
+                continue
+            rest = tail[0]
+
+        if name not in wanted:
+            continue
+        try:
+            yield name, labels, float(rest)
+        except ValueError:
+            continue
+
+
+class MetricsScraper(PeriodicService):
+    name = 'metrics-scraper'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self._previous = {}
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('INGEST_INTERVAL', 60)
+        self.timeout = app.config.get('INGEST_TIMEOUT', 5)
+        self.max_workers = app.config.get('INGEST_MAX_WORKERS', 16)
+        self.batch_size = app.config.get('INGEST_BATCH_SIZE', 500)
+        app.extensions['metrics_scraper'] = self
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='scrape'
+            )
+        super().start()
+
+    def stop(self):
+        super().stop(timeout=self.timeout * 2)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def run_once(self):
+        self.scrape_all()
+
+    def scrape_all(self):
+        """Scrape every node once and store the derived samples."""
+        from app.models.models import Node
+
+        with self.app.app_context():
+            targets = db.session.query(
+                Node.id, Node.ipAddress, Node.portNodeExporter
+            ).filter(Node.portNodeExporter.isnot(None)).all()
+
+        rows = []
+        for row in self._executor.map(self._scrape_target, targets):
+            if row is None:
+                continue
+            rows.append(row)
+            if len(rows) >= self.batch_size:
+                self._store(rows)
+                rows = []
+        if rows:
+            self._store(rows)
+
+        # Forget counters of nodes that no longer exist
+        node_ids = {target[0] for target in targets}
+        for node_id in list(self._previous):
+            if node_id not in node_ids:
+                del self._previous[node_id]
+
+    def _scrape_target(self, target):
+        node_id, ip, port = target
+        try:
+            with http_client.get(f'http://{ip}:{port}/metrics', timeout=self.timeout, stream=True) as response:
+                if not response.ok:
+                    return None
+                families = self._collect(parse_metrics(response.iter_lines()))
+        except RequestException:
+            return None
+        return self._derive(node_id, families)
+
+    @staticmethod
+    def _collect(samples):
+        """Reduce a sample stream to the few aggregates we store."""
+        families = {
+            'cpu_idle': 0.0, 'cpu_total': 0.0,
+            'rx': 0.0, 'tx': 0.0,
+        }
+        for name, labels, value in samples:
+            if name == 'node_cpu_seconds_total':
+                families['cpu_total'] += value
+                if labels.get('mode') == 'idle':
+                    families['cpu_idle'] += value
+            elif name == 'node_network_receive_bytes_total':
+                if labels.get('device') != 'lo':
+                    families['rx'] += value
+            elif name == 'node_network_transmit_bytes_total':
+                if labels.get('device') != 'lo':
+                    families['tx'] += value
+            elif name in ('node_filesystem_avail_bytes', 'node_filesystem_size_bytes'):
+                if labels.get('mountpoint') == '/':
+                    families[name] = value
+            else:
+                families[name] = value
+        return families
+
+    def _derive(self, node_id, families):
+        """Turn collected families into a PerformanceData row.
+
+        CPU and network figures are rates, so they need the counters of the
+        previous scrape and stay None on the first one.
+        """
+        now = time.monotonic()
+        previous = self._previous.get(node_id)
+        self._previous[node_id] = (now, families['cpu_idle'], families['cpu_total'],
+                                   families['rx'], families['tx'])
+
+        cpu_usage = network_down = network_up = None
+        if previous is not None:
+            elapsed = now - previous[0]
+            cpu_delta = families['cpu_total'] - previous[2]
+            if cpu_delta > 0:
+                cpu_usage = 100.0 * (1 - (families['cpu_idle'] - previous[1]) / cpu_delta)
+            if elapsed > 0:
+                # Counters reset when node_exporter restarts
+                network_down = max(families['rx'] - previous[3], 0) / elapsed
+                network_up = max(families['tx'] - previous[4], 0) / elapsed
+
+        memory_usage = None
+        mem_total = families.get('node_memory_MemTotal_bytes')
+        if mem_total:
+            memory_usage = 100.0 * (1 - families.get('node_memory_MemAvailable_bytes', 0) / mem_total)
+
+        disk_usage = None
+        disk_size = families.get('node_filesystem_size_bytes')
+        if disk_size:
+            disk_usage = 100.0 * (1 - families.get('node_filesystem_avail_bytes', 0) / disk_size)
+
+        uptime = None
+        if 'node_time_seconds' in families and 'node_boot_time_seconds' in families:
+            uptime = families['node_time_seconds'] - families['node_boot_time_seconds']
+
+        return {
+            'nodeId': node_id,
+            'timestamp': datetime.utcnow(),
+            'cpuUsage': cpu_usage,
+            'memoryUsage': memory_usage,
+            'diskUsage': disk_usage,
+            'networkUpUsage': network_up,
+            'networkDownUsage': network_down,
+            'uptime': uptime
+        }
+
+    def _store(self, rows):
+        from app.models.models import PerformanceData
+
+        with self.app.app_context():
+            PerformanceData.bulk_insert(rows, batch_size=self.batch_size)
+
+        # Rules are evaluated on the samples just stored, not re-read from the database
+        try:
+            alert_engine.evaluate(rows)
+        except Exception as e:
+            print(f"Error evaluating alert rules: {str(e)}")
+
+
+scraper = MetricsScraper()
@@ -0,0 +1,267 @@
+"""Loki ``query_range`` client for node log views.
+
+A requested range is split into windows of ``LOKI_SPLIT_INTERVAL`` seconds,
+aligned to multiples of the interval so the same window gets the same key
+across requests. The first pages of up to ``LOKI_PARALLELISM`` windows per
+request are fetched at once on a shared pool of ``LOKI_WORKERS`` threads
+while results are yielded strictly in order. Pages hold at most
+``LOKI_QUERY_LIMIT`` entries, or the request's ``limit`` if smaller, and a
+window's next page is only requested (from its last timestamp) when the
+client reads past the current one, so memory is bounded by the pages in
+flight rather than by the windows or the whole range.
+
+Windows that ended more than ``LOKI_CACHE_MIN_AGE`` seconds ago no longer
+change; once read to the end they are cached already encoded as NDJSON
+lines, keyed by ``(query, window)``, up to ``LOKI_CACHE_MAX_BYTES`` in total.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from string import Template
+
+from app.services.http_client import http_client
+from app.utils.timeutils import EPOCH
+
+NS = 10 ** 9
+DIRECTIONS = ('forward', 'backward')
+
+
+class LokiError(Exception):
+    pass
+
+
+def to_ns(value):
+    """Naive UTC datetime -> Unix nanoseconds."""
+    return (value - EPOCH) // timedelta(microseconds=1) * 1000
+
+
+class LokiClient:
+    def __init__(self, app=None):
+        self.app = None
+        self.url = None
+        self.tenant = None
+        self.node_selector = '{host="$ip"}'
+        self.split_interval = 3600
+        self.parallelism = 4
+        self.workers = 8
+        self.query_limit = 5000
+        self.timeout = 30
+        self.cache_min_age = 300
+        self.cache_max_bytes = 64 * 1024 * 1024
+        self._pool = None
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'windows': 0, 'hits': 0, 'misses': 0, 'queries': 0, 'lines': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.url = (app.config.get('LOKI_URL') or '').rstrip('/') or None
+        self.tenant = app.config.get('LOKI_TENANT_ID')
+        self.node_selector = app.config.get('LOKI_NODE_SELECTOR', self.node_selector)
+        self.split_interval = app.config.get('LOKI_SPLIT_INTERVAL', self.split_interval)
+        self.parallelism = app.config.get('LOKI_PARALLELISM', self.parallelism)
+        self.workers = app.config.get('LOKI_WORKERS', self.workers)
+        self.query_limit = app.config.get('LOKI_QUERY_LIMIT', self.query_limit)
+        self.timeout = app.config.get('LOKI_TIMEOUT', self.timeout)
+        self.cache_min_age = app.config.get('LOKI_CACHE_MIN_AGE', self.cache_min_age)
+        self.cache_max_bytes = app.config.get('LOKI_CACHE_MAX_BYTES', self.cache_max_bytes)
+        self.clear()
+        app.extensions['loki'] = self
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='loki')
+        return self._pool
+
+    def node_query(self, ip_address, pipeline=''):
+        """LogQL for one node: its stream selector followed by an optional pipeline."""
+        selector = Template(self.node_selector).safe_substitute(ip=ip_address)
+        pipeline = (pipeline or '').strip()
+        return f'{selector} {pipeline}' if pipeline else selector
+
+    def windows(self, start_ns, end_ns):
+        """Split ``[start_ns, end_ns)`` at multiples of the split interval."""
+        step = self.split_interval * NS
+        windows = []
+        current = start_ns
+        while current < end_ns:
+            boundary = min(end_ns, (current // step + 1) * step)
+            windows.append((current, boundary))
+            current = boundary
+        return windows
+
+    def stream(self, query, start, end, direction='backward', limit=None, token=None):
+        """Yield the entries of ``query`` between two naive UTC datetimes as NDJSON lines (bytes)."""
+        if self.url is None:
+            raise LokiError('Loki is not configured')
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {', '.join(DIRECTIONS)}")
+        self._count('requests')
+
+        # Never fetch more entries per page than the caller can still use
+        page_limit = self.query_limit if limit is None else max(1, min(self.query_limit, limit))
+        windows = self.windows(to_ns(start), to_ns(end))
+        if direction == 'backward':
+            windows.reverse()
+        windows = iter(windows)
+        pending = deque()
+        sent = 0
+
+        def schedule():
+            window = next(windows, None)
+            if window is not None:
+                pending.append((window, self._window(query, window, direction, page_limit, token)))
+
+        try:
+            for _ in range(self.parallelism):
+                schedule()
+            while pending:
+                window, first = pending.popleft()
+                if isinstance(first, list):
+                    pages = (reversed(first) if direction == 'backward' else first,)
+                else:
+                    pages = self._pages(query, window, direction, page_limit, token, first)
+                schedule()
+                for lines in pages:
+                    for line in lines:
+                        yield line
+                        sent += 1
+                        if limit is not None and sent >= limit:
+                            return
+        finally:
+            # Client went away or the limit was reached: drop windows not started yet
+            for _, first in pending:
+                if not isinstance(first, list):
+                    first.cancel()
+            self._count('lines', sent)
+
+    def entries(self, query, start, end, direction='backward', limit=None, token=None):
+        """Like ``stream`` but yields decoded entry dicts."""
+        loads = self.app.json.loads
+        for line in self.stream(query, start, end, direction, limit, token):
+            yield loads(line)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_windows'] = len(self._cache)
+            stats['cached_bytes'] = self._cache_bytes
+        return stats
+
+    def _window(self, query, window, direction, page_limit, token):
+        """Cached lines of a window (oldest first), or a future of its first page."""
+        key = (token, query) + window
+        self._count('windows')
+        with self._lock:
+            lines = self._cache.get(key)
+            if lines is not None:
+                self._cache.move_to_end(key)
+                self._stats['hits'] += 1
+                return lines
+            self._stats['misses'] += 1
+        return self.pool.submit(self._query_range, query, window[0], window[1], page_limit, direction, token)
+
+    def _pages(self, query, window, direction, page_limit, token, first):
+        """Yield the lines of a window page by page, in ``direction`` order.
+
+        The next page is only requested when the consumer asks for more, so
+        a request limit bounds what is fetched and held. Windows old enough
+        to be immutable are cached, but only once read to the end.
+        """
+        start_ns, end_ns = window
+        dumps = self.app.json.dumps
+        cacheable = end_ns <= (time.time() - self.cache_min_age) * NS
+        kept, kept_bytes = ([] if cacheable else None), 0
+        entries = first.result()
+        seen_at_cursor = set()
+        while True:
+            fresh = [e for e in entries if (e[0], e[2]) not in seen_at_cursor]
+            lines = [(dumps({'ts': str(ts), 'labels': labels, 'line': line}) + '\n').encode()
+                     for ts, labels, line in fresh]
+            if kept is not None:
+                kept.extend(lines)
+                kept_bytes += sum(len(line) for line in lines)
+                if kept_bytes > self.cache_max_bytes // 4:
+                    kept = None  # too large to cache; stop holding it
+            yield lines
+
+            if len(entries) < page_limit:
+                break
+            if not fresh:
+                # A whole page shares the cursor timestamp: a timestamp cursor cannot get past it
+                if page_limit < self.query_limit:
+                    page_limit = self.query_limit
+                else:
+                    raise LokiError(f'More than {page_limit} entries share timestamp {entries[-1][0]}; '
+                                    'narrow the query')
+            else:
+                # Page on from the last timestamp; entries sharing it were already sent
+                cursor = entries[-1][0]
+                seen_at_cursor = {(ts, line) for ts, _, line in entries if ts == cursor}
+            if direction == 'forward':
+                entries = self._query_range(query, cursor, end_ns, page_limit, direction, token)
+            else:
+                entries = self._query_range(query, start_ns, cursor + 1, page_limit, direction, token)
+
+        if kept is not None:
+            self._store((token, query) + window, kept[::-1] if direction == 'backward' else kept)
+
+    def _query_range(self, query, start_ns, end_ns, limit, direction, token):
+        """One query_range call; returns ``(ts, labels, line)`` sorted in ``direction``."""
+        headers = {}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        if self.tenant:
+            headers['X-Scope-OrgID'] = self.tenant
+        self._count('queries')
+        response = http_client.get(
+            f'{self.url}/loki/api/v1/query_range',
+            params={'query': query, 'start': start_ns, 'end': end_ns,
+                    'limit': limit, 'direction': direction},
+            headers=headers,
+            timeout=(http_client.connect_timeout, self.timeout)
+        )
+        if response.status_code != 200:
+            raise LokiError(f'Loki returned {response.status_code}: {response.text.strip()[:200]}')
+        data = response.json().get('data', {})
+        if data.get('resultType') != 'streams':
+            raise LokiError('Only log queries are supported')
+        entries = [(int(ts), stream.get('stream', {}), line)
+                   for stream in data.get('result', ())
+                   for ts, line in stream.get('values', ())]
+        entries.sort(key=lambda e: e[0], reverse=direction == 'backward')
+        return entries
+
+    def _store(self, key, lines):
+        size = sum(len(line) for line in lines)
+        if size > self.cache_max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cache_bytes -= sum(len(line) for line in previous)
+            self._cache[key] = lines
+            self._cache_bytes += size
+            while self._cache_bytes > self.cache_max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= sum(len(line) for line in evicted)
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+
+loki = LokiClient()
@@ -0,0 +1,349 @@
+"""Batched, rate-limited dispatcher for Telegram notifications.
+
+Callers (alert transitions, ``ExternalSystem.sendTelegramMessage``) only put
+a message on an in-memory queue per destination chat and return. A
+scheduler thread hands batches to a pool of ``NOTIFY_WORKERS`` sender
+threads, so request and ingest threads never wait on Telegram.
+
+* Coalescing: messages for the same chat that arrive within
+  ``NOTIFY_COALESCE_MS`` of the first one are sent as a single digest; while
+  a chat is rate limited its messages keep accumulating into the next one.
+* Rate limiting: every chat has a token bucket of ``NOTIFY_BURST`` messages
+  refilled at ``NOTIFY_RATE_PER_MINUTE``, and all chats share a bucket of
+  ``NOTIFY_GLOBAL_RATE`` messages per second (Telegram's own limits).
+* Retries: connection errors, 429 and 5xx are retried up to
+  ``NOTIFY_MAX_RETRIES`` times with jittered exponential backoff, or after
+  the ``retry_after`` Telegram returns with a 429. A 401 with the bot token
+  from the database re-reads the token and retries. Other errors (unknown
+  chat, blocked bot) drop the batch.
+
+Only one batch per chat is in flight at a time, so messages keep their
+order. Point ``TELEGRAM_API_URL`` at ``python manage.py mock-telegram`` to
+run without a real bot.
+"""
+import atexit
+import queue
+import random
+import threading
+import time
+
+from requests.exceptions import RequestException
+
+from app.services.http_client import http_client
+
+# Telegram rejects longer message texts
+MAX_MESSAGE_LENGTH = 4096
+
+
+class _Bucket:
+    """Token bucket; ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+    def full(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Destination:
+    def __init__(self, token, chat_id, bucket):
+        self.token = token
+        self.chat_id = chat_id
+        self.bucket = bucket
+        self.messages = []
+        self.due = None
+        self.not_before = 0
+        self.attempts = 0
+        self.in_flight = False
+
+
+class NotificationDispatcher:
+    def __init__(self, app=None):
+        self.app = None
+        self.api_url = 'https://api.telegram.org'
+        self.bot_token = None
+        self._db_token = None
+        self.workers = 2
+        self.coalesce_window = 5.0
+        self.rate_per_minute = 20
+        self.burst = 3
+        self.global_rate = 25
+        self.max_retries = 5
+        self.backoff = 1.0
+        self.backoff_max = 60.0
+        self.queue_size = 10000
+        self._destinations = {}
+        self._queued = 0
+        self._global = None
+        self._batches = queue.Queue()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._atexit_registered = False
+        self._stats = {'enqueued': 0, 'sent_messages': 0, 'sent_batches': 0,
+                       'retries': 0, 'dropped': 0, 'failed': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.api_url = app.config.get('TELEGRAM_API_URL', self.api_url).rstrip('/')
+        self.bot_token = app.config.get('TELEGRAM_BOT_TOKEN', self.bot_token)
+        self._db_token = None
+        self.workers = app.config.get('NOTIFY_WORKERS', self.workers)
+        self.coalesce_window = app.config.get('NOTIFY_COALESCE_MS', 5000) / 1000.0
+        self.rate_per_minute = app.config.get('NOTIFY_RATE_PER_MINUTE', self.rate_per_minute)
+        self.burst = app.config.get('NOTIFY_BURST', self.burst)
+        self.global_rate = app.config.get('NOTIFY_GLOBAL_RATE', self.global_rate)
+        self.max_retries = app.config.get('NOTIFY_MAX_RETRIES', self.max_retries)
+        self.backoff = app.config.get('NOTIFY_RETRY_BACKOFF', self.backoff)
+        self.backoff_max = app.config.get('NOTIFY_RETRY_BACKOFF_MAX', self.backoff_max)
+        self.queue_size = app.config.get('NOTIFY_QUEUE_SIZE', self.queue_size)
+        with self._cond:
+            self._destinations = {}
+            self._queued = 0
+            self._global = _Bucket(self.global_rate, max(1, self.global_rate))
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+        app.extensions['notifier'] = self
+
+    def start(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            self._threads = [threading.Thread(target=self._schedule, name='notify-scheduler', daemon=True)]
+            for i in range(self.workers):
+                self._threads.append(threading.Thread(target=self._work, name=f'notify-worker-{i}', daemon=True))
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=5):
+        """Send what is queued (as rate limits allow) within ``timeout`` and stop."""
+        if not self._threads:
+            return
+        self.flush(timeout)
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for _ in range(self.workers):
+            self._batches.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def flush(self, timeout=5):
+        """Skip the coalescing window and wait until the queue drains; returns True if it did."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            for destination in self._destinations.values():
+                if destination.messages:
+                    destination.due = 0
+            self._cond.notify_all()
+            while self._threads and (self._queued or any(d.in_flight for d in self._destinations.values())):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def enqueue(self, chat_id, message, token=None):
+        """Queue ``message`` for a Telegram chat; returns False if it was dropped."""
+        if not self._threads:
+            self.start()
+        chat_id = str(chat_id).strip() if chat_id is not None else ''
+        if not chat_id or not message:
+            return False
+        key = (token, chat_id)
+        with self._cond:
+            if self._queued >= self.queue_size:
+                self._stats['dropped'] += 1
+                return False
+            destination = self._destinations.get(key)
+            if destination is None:
+                bucket = _Bucket(self.rate_per_minute / 60.0, max(1, self.burst))
+                destination = self._destinations[key] = _Destination(token, chat_id, bucket)
+            if not destination.messages:
+                destination.due = time.monotonic() + self.coalesce_window
+            destination.messages.append(str(message))
+            self._queued += 1
+            self._stats['enqueued'] += 1
+            self._cond.notify_all()
+        return True
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats['queued'] = self._queued
+            stats['destinations'] = len(self._destinations)
+            stats['in_flight'] = sum(1 for d in self._destinations.values() if d.in_flight)
+        return stats
+
+    def _schedule(self):
+        """Hand due batches to the workers as the buckets allow."""
+        while not self._stop.is_set():
+            with self._cond:
+                wait = self._dispatch_due(time.monotonic())
+                self._cond.wait(wait)
+
+    def _dispatch_due(self, now):
+        """Queue every batch that can go out now; returns how long to sleep."""
+        wait = 1.0
+        for key, destination in list(self._destinations.items()):
+            if destination.in_flight:
+                continue
+            if not destination.messages:
+                # Forget idle chats once their bucket has refilled
+                if destination.bucket.full(now) and destination.not_before <= now:
+                    del self._destinations[key]
+                continue
+            ready_at = max(destination.due, destination.not_before)
+            delay = max(ready_at - now, destination.bucket.wait_time(now), self._global.wait_time(now))
+            if delay > 0:
+                wait = min(wait, delay)
+                continue
+            destination.bucket.take(now)
+            self._global.take(now)
+            batch = self._take_batch(destination)
+            destination.in_flight = True
+            self._batches.put((destination, batch))
+        return max(wait, 0.01)
+
+    def _take_batch(self, destination):
+        """Remove as many queued messages as fit in one Telegram message."""
+        messages = destination.messages
+        count = 1
+        while count < len(messages) and len(self._format(messages[:count + 1])) <= MAX_MESSAGE_LENGTH:
+            count += 1
+        batch, destination.messages = messages[:count], messages[count:]
+        self._queued -= len(batch)
+        if destination.messages:
+            # The rest is already past its window; send when the bucket allows
+            destination.due = 0
+        return batch
+
+    @staticmethod
+    def _format(messages):
+        if len(messages) == 1:
+            return messages[0][:MAX_MESSAGE_LENGTH]
+        lines = [f'{len(messages)} notifications:']
+        lines.extend(f'• {message}' for message in messages)
+        return '\n'.join(lines)
+
+    def _work(self):
+        while True:
+            item = self._batches.get()
+            if item is None:
+                return
+            destination, batch = item
+            try:
+                retry_after = self._send(destination, batch)
+            except Exception as e:
+                print(f"Failed to send Telegram notification: {str(e)}")
+                with self._cond:
+                    self._stats['failed'] += len(batch)
+                retry_after = None
+            self._finish(destination, batch, retry_after)
+
+    def _send(self, destination, batch):
+        """Send one batch; returns None when done, or the seconds to wait before a retry."""
+        token = destination.token or self.bot_token or self._default_token()
+        if not token:
+            print("Telegram bot token is not configured, dropping notification")
+            with self._cond:
+                self._stats['dropped'] += len(batch)
+            return None
+        try:
+            response = http_client.post(
+                f'{self.api_url}/bot{token}/sendMessage',
+                json={'chat_id': destination.chat_id, 'text': self._format(batch)}
+            )
+        except RequestException as e:
+            # The token is part of the URL, which requests repeats in its messages
+            print(f"Telegram request failed: {str(e).replace(token, '***')}")
+            return self._backoff(destination.attempts + 1)
+
+        if response.ok:
+            with self._cond:
+                self._stats['sent_messages'] += len(batch)
+                self._stats['sent_batches'] += 1
+            return None
+        if response.status_code == 429:
+            try:
+                return float(response.json()['parameters']['retry_after'])
+            except (ValueError, KeyError, TypeError):
+                return self._backoff(destination.attempts + 1)
+        if response.status_code >= 500:
+            return self._backoff(destination.attempts + 1)
+        if response.status_code == 401 and not destination.token and not self.bot_token:
+            # The bot token stored in the database may have been rotated
+            if self._default_token(refresh=True) not in (None, token):
+                return 0
+
+        print(f"Telegram rejected notification for chat {destination.chat_id}: "
+              f"{response.status_code} {response.text[:200]}")
+        with self._cond:
+            self._stats['failed'] += len(batch)
+        return None
+
+    def _finish(self, destination, batch, retry_after):
+        with self._cond:
+            destination.in_flight = False
+            if retry_after is None:
+                destination.attempts = 0
+            elif destination.attempts >= self.max_retries:
+                print(f"Giving up on {len(batch)} notification(s) for chat {destination.chat_id}")
+                destination.attempts = 0
+                self._stats['failed'] += len(batch)
+            else:
+                destination.attempts += 1
+                self._stats['retries'] += 1
+                # Put the batch back in front; newer messages join its digest
+                destination.messages = batch + destination.messages
+                destination.due = 0
+                destination.not_before = time.monotonic() + retry_after
+                self._queued += len(batch)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt):
+        """Full jitter, like the HTTP client."""
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempt - 1)))
+
+    def _default_token(self, refresh=False):
+        """Bot token of the ``telegram`` ExternalSystem row, if one is configured.
+
+        Cached until Telegram rejects it (``refresh``), so a rotated token is
+        picked up without a restart.
+        """
+        from app.models.models import ExternalSystem
+
+        if self._db_token is not None and not refresh:
+            return self._db_token
+        with self.app.app_context():
+            system = ExternalSystem.query.filter_by(type='telegram').first()
+            self._db_token = system.apiKey if system is not None else None
+        return self._db_token
+
+
+notifier = NotificationDispatcher()
@@ -0,0 +1,88 @@
+"""Daily range partitions for time-series tables on PostgreSQL.
+
+Tables converted by the ``c7d1e4f9a2b8`` migration are partitioned by
+``timestamp`` with one partition per UTC day named ``<table>_pYYYYMMDD``.
+Partitions are created ahead of time, and retention drops whole partitions
+instead of running a large DELETE.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app import db
+
+PARTITIONED_TABLES = ('performance_data', 'onchain_data')
+
+
+def partition_name(table, day):
+    return f'{table}_p{day:%Y%m%d}'
+
+
+def is_partitioned(table):
+    """Return True if ``table`` is a partitioned table on PostgreSQL."""
+    if db.engine.dialect.name != 'postgresql':
+        return False
+    return db.session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :table"
+    ), {'table': table}).first() is not None
+
+
+def list_partitions(table):
+    """Return ``{day: partition name}`` for the daily partitions of ``table``."""
+    rows = db.session.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {'table': table})
+    partitions = {}
+    prefix = f'{table}_p'
+    for (name,) in rows:
+        if name.startswith(prefix):
+            try:
+                partitions[datetime.strptime(name[len(prefix):], '%Y%m%d').date()] = name
+            except ValueError:
+                continue
+    return partitions
+
+
+def create_partitions(table, days_ahead=7, start=None):
+    """Create missing daily partitions from ``start`` (default today) onwards."""
+    start = start or datetime.utcnow().date()
+    existing = list_partitions(table)
+    created = []
+    try:
+        for offset in range(days_ahead + 1):
+            day = start + timedelta(days=offset)
+            if day in existing:
+                continue
+            name = partition_name(table, day)
+            db.session.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+            ))
+            created.append(name)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return created
+
+
+def drop_partitions(table, before):
+    """Drop daily partitions whose whole day is before ``before``."""
+    if isinstance(before, datetime):
+        before = before.date()
+    dropped = []
+    try:
+        for day, name in sorted(list_partitions(table).items()):
+            if day + timedelta(days=1) <= before:
+                db.session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                dropped.append(name)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return dropped
@@ -0,0 +1,123 @@
+"""Cache of probe results keyed by ``(ip, port, service)``.
+
+A successful result is reused for ``PROBE_CACHE_TTL`` seconds. A failed one
+is kept for ``PROBE_CACHE_NEGATIVE_TTL`` seconds, doubled for every
+consecutive failure up to ``PROBE_CACHE_MAX_BACKOFF``, so a dead host is
+retried less and less often instead of costing a full timeout on every
+call. Concurrent lookups of the same key share one in-flight probe.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry = None
+        self.error = None
+
+
+class ProbeCache:
+    def __init__(self, app=None):
+        self.app = None
+        self.ttl = 30
+        self.negative_ttl = 15
+        self.max_backoff = 600
+        self.max_size = 50000
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'shared': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.ttl = app.config.get('PROBE_CACHE_TTL', self.ttl)
+        self.negative_ttl = app.config.get('PROBE_CACHE_NEGATIVE_TTL', self.negative_ttl)
+        self.max_backoff = app.config.get('PROBE_CACHE_MAX_BACKOFF', self.max_backoff)
+        self.max_size = app.config.get('PROBE_CACHE_SIZE', self.max_size)
+        app.extensions['probe_cache'] = self
+
+    def get_or_probe(self, key, probe, force=False):
+        """Return the cached entry for ``key`` or run ``probe()`` to refresh it.
+
+        ``probe`` returns a dict with at least ``ok``; the stored entry adds
+        ``checked_at`` (when the probe ran) and ``failures`` (consecutive
+        failed probes). ``force`` skips the cache but still joins a probe
+        that is already in flight.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not force and entry['expires'] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._stats['misses'] += 1
+            else:
+                self._stats['shared'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.entry
+
+        try:
+            flight.entry = self._store(key, probe())
+            return flight.entry
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def is_fresh(self, key):
+        """Whether ``get_or_probe(key)`` would return a cached entry without probing."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry['expires'] > time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['backing_off'] = sum(1 for e in self._entries.values() if e['failures'])
+            stats['in_flight'] = len(self._inflight)
+        return stats
+
+    def _store(self, key, result):
+        with self._lock:
+            previous = self._entries.get(key)
+            if result['ok']:
+                failures = 0
+                ttl = self.ttl
+            else:
+                failures = (previous['failures'] if previous else 0) + 1
+                ttl = min(self.max_backoff, self.negative_ttl * 2 ** (failures - 1))
+            entry = dict(
+                result,
+                checked_at=datetime.utcnow(),
+                failures=failures,
+                expires=time.monotonic() + ttl
+            )
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+probe_cache = ProbeCache()
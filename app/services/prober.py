@@ -0,0 +1,328 @@
+"""Background health prober for node_exporter and promtail.
+
+Probes every node on a fixed interval with a bounded thread pool, keeps the
+latest result per node in memory and hands ``status``/``last_checked`` to
+``status_writer``, which only writes the nodes whose status changed. API
+routes read the cached result instead of probing inline.
+
+How a service is checked depends on its probe mode (``PROBE_MODE_*``):
+
+``get``
+    GET the endpoint and read the whole response.
+``stream``
+    Send a streamed GET and read the body without decoding it, in
+    ``PROBE_STREAM_BYTES`` pieces. The exporter gzips its 100-500 KB
+    payload down to a few KB, which is read to the end so the keep-alive
+    connection goes back to the pool. A body still unread after
+    ``PROBE_STREAM_DRAIN_BYTES`` is dropped along with its connection.
+``connect``
+    Only check that the port accepts TCP connections.
+
+Before a full round, every address due for a probe is swept with
+non-blocking asyncio TCP connects (``PROBE_CONNECT_TIMEOUT``); unreachable
+services are marked inactive without tying up a worker thread for the HTTP
+timeout. Services still cached, including dead ones backing off, are
+skipped.
+
+Results go through ``probe_cache``: live services are re-probed after
+``PROBE_CACHE_TTL`` seconds, dead ones back off exponentially, and a node's
+``last_checked`` is the time of its most recent cached probe.
+"""
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from requests.exceptions import ConnectionError, RequestException, Timeout
+
+from app import db
+from app.services.base import PeriodicService
+from app.services.event_hub import event_hub
+from app.services.http_client import http_client
+from app.services.probe_cache import probe_cache
+from app.services.status_writer import status_writer
+
+ACTIVE = 'Active'
+INACTIVE = 'Inactive'
+UNKNOWN = 'Unknown'
+
+PROBE_MODES = ('get', 'stream', 'connect')
+
+# Endpoint checked for each service type
+SERVICE_PATHS = {
+    'nodeExporter': '/metrics',
+    'promtail': '/ready',
+}
+
+
+class HealthProber(PeriodicService):
+    name = 'health-prober'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self._results = {}
+        self._pending = set()
+        self._owners = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('PROBE_INTERVAL', 60)
+        self.timeout = app.config.get('PROBE_TIMEOUT', 2)
+        self.max_workers = app.config.get('PROBE_MAX_WORKERS', 32)
+        self.retries = app.config.get('PROBE_RETRIES', 0)
+        self.modes = {
+            'nodeExporter': app.config.get('PROBE_MODE_NODE_EXPORTER', 'stream'),
+            'promtail': app.config.get('PROBE_MODE_PROMTAIL', 'get'),
+        }
+        for service, mode in self.modes.items():
+            if mode not in PROBE_MODES:
+                raise ValueError(f'Unknown probe mode for {service}: {mode}')
+        self.stream_bytes = app.config.get('PROBE_STREAM_BYTES', 512)
+        self.stream_drain_bytes = app.config.get('PROBE_STREAM_DRAIN_BYTES', 256 * 1024)
+        self.precheck = app.config.get('PROBE_CONNECT_PRECHECK', True)
+        self.connect_timeout = app.config.get('PROBE_CONNECT_TIMEOUT', 0.5)
+        self.connect_concurrency = app.config.get('PROBE_CONNECT_CONCURRENCY', 500)
+        app.extensions['health_prober'] = self
+
+    def start(self):
+        """Start the scheduler thread and the probe worker pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='probe'
+            )
+        super().start()
+
+    def stop(self):
+        super().stop(timeout=self.timeout * 2)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get(self, node_id):
+        """Return the cached probe result for a node, or None if never probed."""
+        with self._lock:
+            return self._results.get(node_id)
+
+    def snapshot(self, node, result=None):
+        """Return the API view of a node's probe state.
+
+        Falls back to the stored status (and schedules a probe) when the node
+        has not been probed by this process yet.
+        """
+        if result is None:
+            result = self.get(node.id)
+        if result is None:
+            self.request_probe(node)
+            return {
+                'nodeExporter': UNKNOWN,
+                'promtail': UNKNOWN,
+                'status': node.status,
+                'last_checked': node.last_checked.isoformat() if node.last_checked else None
+            }
+        return {
+            'nodeExporter': result['nodeExporter'],
+            'promtail': result['promtail'],
+            'status': result['status'],
+            'last_checked': result['last_checked'].isoformat()
+        }
+
+    def get_many(self, node_ids):
+        """Return cached results for several nodes under a single lock."""
+        with self._lock:
+            return {node_id: self._results.get(node_id) for node_id in node_ids}
+
+    def request_probe(self, node):
+        """Schedule a one-off probe for a node that has no cached result yet."""
+        if self._executor is None:
+            return
+        target = (node.id, node.ipAddress, node.portNodeExporter, node.portPromtail)
+        with self._lock:
+            if node.id in self._pending:
+                return
+            self._pending.add(node.id)
+            self._owners[node.id] = node.ownerId
+        self._executor.submit(self._probe_and_store, [target])
+
+    def probe_all(self):
+        """Probe every node once and persist the results."""
+        from app.models.models import Node
+
+        with self.app.app_context():
+            rows = db.session.query(
+                Node.id, Node.ipAddress, Node.portNodeExporter, Node.portPromtail,
+                Node.status, Node.last_checked, Node.ownerId
+            ).all()
+        status_writer.prime((row[0], row[4], row[5]) for row in rows)
+        with self._lock:
+            self._owners = {row[0]: row[6] for row in rows}
+        targets = [tuple(row[:4]) for row in rows]
+        self._probe_and_store(targets)
+
+        # Forget nodes that were deleted since the previous round
+        node_ids = {target[0] for target in targets}
+        with self._lock:
+            for node_id in list(self._results):
+                if node_id not in node_ids:
+                    del self._results[node_id]
+
+    def run_once(self):
+        self.probe_all()
+
+    def _probe_and_store(self, targets):
+        try:
+            if len(targets) == 1:
+                results = [self._probe_target(targets[0])]
+            else:
+                reachable = self._reachable(targets) if self.precheck else None
+                results = list(self._executor.map(
+                    lambda target: self._probe_target(target, reachable), targets
+                ))
+            changed = []
+            with self._lock:
+                for node_id, result in results:
+                    previous = self._results.get(node_id)
+                    if previous is None or any(
+                        previous[key] != result[key] for key in ('status', 'nodeExporter', 'promtail')
+                    ):
+                        changed.append((self._owners.get(node_id), node_id, result))
+                    self._results[node_id] = result
+            for node_id, result in results:
+                status_writer.submit(node_id, result['status'], result['last_checked'])
+            # Push only the nodes whose state changed to open dashboards
+            for owner_id, node_id, result in changed:
+                event_hub.publish(owner_id, 'node.status', {
+                    'id': node_id,
+                    'status': result['status'],
+                    'last_checked': result['last_checked'].isoformat(),
+                    'metrics': {'nodeExporter': result['nodeExporter'], 'promtail': result['promtail']}
+                })
+        except Exception as e:
+            print(f"Error storing probe results: {str(e)}")
+        finally:
+            # Let request_probe schedule these nodes again, even after a failure
+            with self._lock:
+                self._pending.difference_update(target[0] for target in targets)
+
+    def _probe_target(self, target, reachable=None):
+        node_id, ip, port_node_exporter, port_promtail = target
+        results = [
+            self.check_service(service, ip, port, reachable)
+            for service, port in (('nodeExporter', port_node_exporter), ('promtail', port_promtail))
+        ]
+        node_exporter, promtail = (ACTIVE if r['ok'] else INACTIVE for r in results)
+        status = 'active' if ACTIVE in (node_exporter, promtail) else 'inactive'
+        return node_id, {
+            'nodeExporter': node_exporter,
+            'promtail': promtail,
+            'status': status,
+            'last_checked': max(r['checked_at'] for r in results)
+        }
+
+    def check_service(self, service, ip, port, reachable=None, force=False):
+        """Return the cached probe result for one service, probing if it is stale.
+
+        The result has ``ok``, ``status_code``, ``error`` (``'timeout'``,
+        ``'connection'``, another message or None), ``checked_at`` and
+        ``failures``.
+        """
+        if not ip or not port:
+            return {'ok': False, 'status_code': None, 'error': 'connection',
+                    'checked_at': datetime.utcnow(), 'failures': 0}
+        return probe_cache.get_or_probe(
+            (ip, port, service),
+            lambda: self._probe_service(service, ip, port, reachable),
+            force=force
+        )
+
+    def _probe_service(self, service, ip, port, reachable=None):
+        """Probe one service with its configured mode.
+
+        ``reachable`` is the result of a connect sweep; addresses it found
+        closed are reported down without another attempt.
+        """
+        mode = self.modes[service]
+        swept = reachable.get((ip, port)) if reachable is not None else None
+        if swept is False:
+            return {'ok': False, 'status_code': None, 'error': 'connection'}
+        if mode == 'connect':
+            ok = swept or self._connect(ip, port)
+            return {'ok': ok, 'status_code': None, 'error': None if ok else 'connection'}
+
+        url = f'http://{ip}:{port}{SERVICE_PATHS[service]}'
+        try:
+            with http_client.get(url, timeout=self.timeout, retries=self.retries,
+                                 stream=(mode == 'stream')) as response:
+                if mode == 'stream':
+                    self._drain(response)
+                return {'ok': response.ok, 'status_code': response.status_code, 'error': None}
+        except Timeout:
+            return {'ok': False, 'status_code': None, 'error': 'timeout'}
+        except ConnectionError:
+            return {'ok': False, 'status_code': None, 'error': 'connection'}
+        except RequestException as e:
+            return {'ok': False, 'status_code': None, 'error': str(e)}
+
+    def _drain(self, response):
+        """Read the body as sent on the wire (gzip, not decoded) so the connection can be reused.
+
+        Bodies larger than ``PROBE_STREAM_DRAIN_BYTES`` are left unread and
+        their connection is closed instead.
+        """
+        remaining = self.stream_drain_bytes
+        while remaining > 0:
+            chunk = response.raw.read(min(self.stream_bytes, remaining), decode_content=False)
+            if not chunk:
+                return
+            remaining -= len(chunk)
+
+    def _connect(self, ip, port):
+        try:
+            with socket.create_connection((ip, port), timeout=self.connect_timeout):
+                return True
+        except OSError:
+            return False
+
+    def _reachable(self, targets):
+        """Sweep the addresses that will be probed; returns ``{(ip, port): accepts connections}``.
+
+        Services with an unexpired cache entry (including dead ones backing
+        off) are not probed this round, so they are not dialed either.
+        """
+        addresses = set()
+        for _, ip, port_node_exporter, port_promtail in targets:
+            for service, port in (('nodeExporter', port_node_exporter), ('promtail', port_promtail)):
+                if ip and port and not probe_cache.is_fresh((ip, port, service)):
+                    addresses.add((ip, port))
+        if not addresses:
+            return {}
+        open_addresses = asyncio.run(self._connect_all(addresses))
+        return {address: address in open_addresses for address in addresses}
+
+    async def _connect_all(self, addresses):
+        semaphore = asyncio.Semaphore(self.connect_concurrency)
+
+        async def connect(address):
+            async with semaphore:
+                try:
+                    _, writer = await asyncio.wait_for(
+                        asyncio.open_connection(*address), self.connect_timeout
+                    )
+                except (OSError, asyncio.TimeoutError):
+                    return None
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+                return address
+
+        results = await asyncio.gather(*(connect(address) for address in addresses))
+        return {address for address in results if address is not None}
+
+prober = HealthProber()
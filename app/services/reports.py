@@ -0,0 +1,265 @@
+"""Background job queue for reports.
+
+``POST /api/reports`` only inserts a ``queued`` report and puts its id on
+this queue; ``REPORT_WORKERS`` threads build reports outside the request
+threads. A worker claims a report with a conditional UPDATE (so several
+processes can share the table), aggregates it one day at a time in SQL and
+streams the rows into a gzip NDJSON file, committing ``progress`` and
+publishing a ``report.updated`` event after each day. Nothing but the
+current day's aggregate rows is held in memory.
+
+Finished content up to ``REPORT_INLINE_MAX_BYTES`` (compressed) is moved
+into the row, larger content stays in ``REPORT_DIR``.
+
+Every progress commit is also a heartbeat (``updatedAt``) guarded by the
+worker's claim token. A ``running`` report without a heartbeat for
+``REPORT_STALE_AFTER`` seconds belongs to a worker that died; it is reset
+to ``queued`` and built again, and the old worker (if it was only slow)
+notices at its next heartbeat and gives up. Queued and stalled reports are
+recovered at startup and then every ``REPORT_RECOVER_INTERVAL`` seconds.
+"""
+import atexit
+import gzip
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app import db
+from app.services.event_hub import event_hub
+
+
+class _Superseded(Exception):
+    """The report was reclaimed or deleted while this worker built it."""
+
+
+class ReportQueue:
+    def __init__(self, app=None):
+        self.app = None
+        self.workers = 1
+        self.directory = None
+        self.inline_max_bytes = 1024 * 1024
+        self.compress_level = 6
+        self.stale_after = 900
+        self.recover_interval = 60
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._threads = []
+        self._last_recovery = None
+        self._start_lock = threading.Lock()
+        self._atexit_registered = False
+        self._recover_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'submitted': 0, 'done': 0, 'failed': 0, 'rows': 0, 'recovered': 0, 'superseded': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get('REPORT_WORKERS', self.workers)
+        self.directory = app.config.get('REPORT_DIR') or os.path.join(app.instance_path, 'reports')
+        self.inline_max_bytes = app.config.get('REPORT_INLINE_MAX_BYTES', self.inline_max_bytes)
+        self.compress_level = app.config.get('REPORT_GZIP_LEVEL', self.compress_level)
+        self.stale_after = app.config.get('REPORT_STALE_AFTER', self.stale_after)
+        self.recover_interval = app.config.get('REPORT_RECOVER_INTERVAL', self.recover_interval)
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+        app.extensions['report_queue'] = self
+
+    def start(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'report-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self.recover()
+
+    def stop(self, timeout=5):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def submit(self, report_id):
+        """Queue a report for building; starts the workers on first use."""
+        if not self._threads:
+            self.start()
+        self._put(report_id)
+        self._count('submitted')
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats['queued'] = len(self._queued)
+        return stats
+
+    def is_stalled(self, report):
+        """Whether a ``running`` report has missed its heartbeat."""
+        return report.updatedAt is None or report.updatedAt < datetime.utcnow() - timedelta(seconds=self.stale_after)
+
+    def recover(self):
+        """Reset stalled ``running`` reports and queue every ``queued`` one."""
+        from app.models.models import Report
+
+        reports = Report.__table__
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        try:
+            with self.app.app_context():
+                reset = db.session.execute(
+                    reports.update()
+                    .where(reports.c.status == 'running',
+                           db.or_(reports.c.updatedAt.is_(None), reports.c.updatedAt < cutoff))
+                    .values(status='queued', progress=0, worker=None)
+                ).rowcount
+                db.session.commit()
+                ids = [row[0] for row in db.session.query(Report.id).filter(Report.status == 'queued')]
+        except Exception as e:
+            print(f"Failed to recover queued reports: {str(e)}")
+            return
+        finally:
+            self._last_recovery = time.monotonic()
+        if reset:
+            print(f"Re-queued {reset} stalled report(s)")
+            self._count('recovered', reset)
+        for report_id in ids:
+            self._put(report_id)
+
+    def _put(self, report_id):
+        with self._stats_lock:
+            if report_id in self._queued:
+                return
+            self._queued.add(report_id)
+        self._queue.put(report_id)
+
+    def _work(self):
+        while True:
+            try:
+                report_id = self._queue.get(timeout=self.recover_interval)
+            except queue.Empty:
+                self._recover_if_due()
+                continue
+            if report_id is None:
+                return
+            with self._stats_lock:
+                self._queued.discard(report_id)
+            try:
+                self.run(report_id)
+            except Exception as e:
+                print(f"Error building report {report_id}: {str(e)}")
+
+    def _recover_if_due(self):
+        # Workers time out together; one recovery per interval is enough
+        if not self._recover_lock.acquire(blocking=False):
+            return
+        try:
+            if self._last_recovery is None or time.monotonic() - self._last_recovery >= self.recover_interval:
+                self.recover()
+        finally:
+            self._recover_lock.release()
+
+    def run(self, report_id):
+        """Build one report if it is still queued; returns True if this call built it."""
+        from app.models.models import Node, Report
+
+        reports = Report.__table__
+        token = uuid.uuid4().hex
+        with self.app.app_context():
+            claimed = db.session.execute(
+                reports.update()
+                .where(reports.c.id == report_id, reports.c.status == 'queued')
+                .values(status='running', progress=0, worker=token, updatedAt=datetime.utcnow())
+            ).rowcount
+            db.session.commit()
+            if claimed != 1:
+                return False
+
+            report = db.session.get(Report, report_id)
+            owner_id = report.ownerId
+
+            def beat(**values):
+                """Commit ``values`` with a heartbeat while this worker still owns the report."""
+                updated = db.session.execute(
+                    reports.update()
+                    .where(reports.c.id == report_id, reports.c.status == 'running', reports.c.worker == token)
+                    .values(updatedAt=datetime.utcnow(), **values)
+                ).rowcount
+                db.session.commit()
+                if updated != 1:
+                    raise _Superseded()
+                self._publish(owner_id, report_id, values.get('status', 'running'), values.get('progress'))
+
+            self._publish(owner_id, report_id, 'running', 0)
+            os.makedirs(self.directory, exist_ok=True)
+            # Unique per attempt: a superseded worker may still be writing or
+            # publishing its own file, and must not touch this one's
+            path = os.path.join(self.directory, f'report-{report_id}-{token}.ndjson.gz')
+            partial = f'{path}.part'
+            dumps = self.app.json.dumps
+            rows = 0
+            try:
+                names = dict(db.session.query(Node.id, Node.name).filter(Node.id.in_(report.node_filter())))
+                chunks = list(report.chunks())
+                with gzip.open(partial, 'wb', compresslevel=self.compress_level) as out:
+                    for done, (start, end) in enumerate(chunks, start=1):
+                        for row in report.aggregate(start, end, names):
+                            out.write(dumps(row).encode() + b'\n')
+                            rows += 1
+                        beat(progress=done / len(chunks))
+
+                size = os.path.getsize(partial)
+                content = {'contentSize': size, 'rowCount': rows, 'status': 'done', 'progress': 1,
+                           'finishedAt': datetime.utcnow()}
+                if size <= self.inline_max_bytes:
+                    with open(partial, 'rb') as f:
+                        content['contentCompressed'] = f.read()
+                    os.remove(partial)
+                else:
+                    os.replace(partial, path)
+                    content['contentPath'] = path
+                beat(**content)
+                self._count('done')
+                self._count('rows', rows)
+            except _Superseded:
+                db.session.rollback()
+                self._discard(partial)
+                self._discard(path)
+                self._count('superseded')
+                print(f"Report {report_id} was reclaimed or deleted, dropping this build")
+                return False
+            except Exception as e:
+                db.session.rollback()
+                self._discard(partial)
+                self._discard(path)
+                try:
+                    beat(status='failed', error=str(e)[:500], finishedAt=datetime.utcnow())
+                except _Superseded:
+                    return False
+                self._count('failed')
+                print(f"Report {report_id} failed: {str(e)}")
+            return True
+
+    @staticmethod
+    def _discard(path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    @staticmethod
+    def _publish(owner_id, report_id, status, progress):
+        event_hub.publish(owner_id, 'report.updated', {
+            'id': report_id,
+            'status': status,
+            'progress': progress
+        })
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+
+report_queue = ReportQueue()
@@ -0,0 +1,224 @@
+"""Continuous rollups and retention for performance history.
+
+Raw samples are folded into 1m buckets, 1m buckets into 5m and 5m into 1h,
+each level keeping count/min/max/avg/p95 per node and metric. A watermark
+per resolution makes every run only touch buckets that closed since the
+previous one. Expired raw samples and rollups are deleted per resolution;
+when performance_data is partitioned, whole daily partitions are dropped.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app import db
+from app.services import partitions
+from app.services.base import PeriodicService
+from app.utils.timeutils import floor_time
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(int(math.ceil(fraction * len(values))) - 1, 0)
+    return values[index]
+
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'min': values[0],
+        'max': values[-1],
+        'avg': sum(values) / len(values),
+        'p95': percentile(values, 0.95)
+    }
+
+
+def merge(children):
+    """Combine finer rollups into one coarser bucket.
+
+    min/max/avg are exact. p95 is approximated by the count-weighted 95th
+    percentile of the children's p95 values, which keeps each level
+    computable from the one below it without rereading raw samples.
+    """
+    count = sum(child['count'] for child in children)
+    by_p95 = sorted(children, key=lambda child: child['p95'])
+    threshold = 0.95 * count
+    seen = 0
+    p95 = by_p95[-1]['p95']
+    for child in by_p95:
+        seen += child['count']
+        if seen >= threshold:
+            p95 = child['p95']
+            break
+    return {
+        'count': count,
+        'min': min(child['min'] for child in children),
+        'max': max(child['max'] for child in children),
+        'avg': sum(child['avg'] * child['count'] for child in children) / count,
+        'p95': p95
+    }
+
+
+class RollupService(PeriodicService):
+    name = 'performance-rollup'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self._watermarks = {}
+        self._last_expiry = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('ROLLUP_INTERVAL', 60)
+        self.delay = app.config.get('ROLLUP_DELAY', 30)
+        self.retention = app.config.get('PERFORMANCE_RETENTION_DAYS', {})
+        self.expire_interval = app.config.get('ROLLUP_EXPIRE_INTERVAL', 3600)
+        self.partition_days_ahead = app.config.get('PARTITION_DAYS_AHEAD', 7)
+        app.extensions['performance_rollup'] = self
+
+    def run_once(self):
+        from app.models.models import PerformanceRollup
+
+        with self.app.app_context():
+            now = datetime.utcnow()
+            for resolution in PerformanceRollup.RESOLUTIONS:
+                self.rollup(resolution, now)
+            if self._last_expiry is None or (now - self._last_expiry).total_seconds() >= self.expire_interval:
+                self.expire(now)
+                self._last_expiry = now
+
+    def rollup(self, resolution, now):
+        """Aggregate every closed bucket of ``resolution`` past the watermark."""
+        from app.models.models import PerformanceRollup
+
+        end = floor_time(now - timedelta(seconds=self.delay), resolution)
+        start = self._watermark(resolution)
+        if start is None:
+            return
+
+        # Bound the rows held in memory while catching up on history
+        chunk = timedelta(seconds=max(3600, resolution * 6))
+        while start < end:
+            stop = min(start + chunk, end)
+            rows = self._aggregate(resolution, start, stop)
+            if rows:
+                PerformanceRollup.bulk_insert(rows)
+            self._watermarks[resolution] = stop
+            start = stop
+
+    def expire(self, now):
+        """Delete raw samples, on-chain data and rollups older than their retention."""
+        from app.models.models import OnchainData, PerformanceData, PerformanceRollup
+
+        deletes = []
+        for model, days in ((PerformanceData, self.retention.get('raw')),
+                            (OnchainData, self.retention.get('onchain'))):
+            table = model.__tablename__
+            if table in partitions.PARTITIONED_TABLES and partitions.is_partitioned(table):
+                # Inserts fail once they run past the last partition, so keep creating ahead;
+                # retention becomes a metadata-only DROP of whole daily partitions
+                partitions.create_partitions(table, days_ahead=self.partition_days_ahead)
+                if days:
+                    partitions.drop_partitions(table, now - timedelta(days=days))
+            elif days:
+                deletes.append((model, days))
+
+        try:
+            for model, days in deletes:
+                model.query.filter(
+                    model.timestamp < now - timedelta(days=days)
+                ).delete(synchronize_session=False)
+            for resolution in PerformanceRollup.RESOLUTIONS:
+                days = self.retention.get(resolution)
+                if days:
+                    PerformanceRollup.query.filter(
+                        PerformanceRollup.resolution == resolution,
+                        PerformanceRollup.bucket < now - timedelta(days=days)
+                    ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _source(self, resolution):
+        """Return the resolution a level is built from (0 = raw samples)."""
+        from app.models.models import PerformanceRollup
+
+        index = PerformanceRollup.RESOLUTIONS.index(resolution)
+        return PerformanceRollup.RESOLUTIONS[index - 1] if index else 0
+
+    def _watermark(self, resolution):
+        """Start of the first bucket that has not been rolled up yet."""
+        from app.models.models import PerformanceData, PerformanceRollup
+
+        if resolution in self._watermarks:
+            return self._watermarks[resolution]
+
+        latest = db.session.query(func.max(PerformanceRollup.bucket)).filter(
+            PerformanceRollup.resolution == resolution
+        ).scalar()
+        if latest is not None:
+            watermark = latest + timedelta(seconds=resolution)
+        else:
+            source = self._source(resolution)
+            if source == 0:
+                earliest = db.session.query(func.min(PerformanceData.timestamp)).scalar()
+            else:
+                earliest = db.session.query(func.min(PerformanceRollup.bucket)).filter(
+                    PerformanceRollup.resolution == source
+                ).scalar()
+            if earliest is None:
+                return None
+            watermark = floor_time(earliest, resolution)
+
+        self._watermarks[resolution] = watermark
+        return watermark
+
+    def _aggregate(self, resolution, start, stop):
+        from app.models.models import PerformanceData, PerformanceRollup
+
+        source = self._source(resolution)
+        rows = []
+
+        if source == 0:
+            columns = [getattr(PerformanceData, metric) for metric in PerformanceData.METRICS]
+            samples = defaultdict(list)
+            query = db.session.query(PerformanceData.nodeId, PerformanceData.timestamp, *columns).filter(
+                PerformanceData.timestamp >= start,
+                PerformanceData.timestamp < stop
+            )
+            for row in query.yield_per(5000):
+                bucket = floor_time(row[1], resolution)
+                for metric, value in zip(PerformanceData.METRICS, row[2:]):
+                    if value is not None:
+                        samples[(row[0], bucket, metric)].append(value)
+            for (node_id, bucket, metric), values in samples.items():
+                rows.append(dict(summarize(values), nodeId=node_id, resolution=resolution,
+                                 bucket=bucket, metric=metric))
+            return rows
+
+        children = defaultdict(list)
+        query = db.session.query(
+            PerformanceRollup.nodeId, PerformanceRollup.bucket, PerformanceRollup.metric,
+            PerformanceRollup.count, PerformanceRollup.min, PerformanceRollup.max,
+            PerformanceRollup.avg, PerformanceRollup.p95
+        ).filter(
+            PerformanceRollup.resolution == source,
+            PerformanceRollup.bucket >= start,
+            PerformanceRollup.bucket < stop
+        )
+        for node_id, bucket, metric, count, min_, max_, avg, p95 in query.yield_per(5000):
+            children[(node_id, floor_time(bucket, resolution), metric)].append(
+                {'count': count, 'min': min_, 'max': max_, 'avg': avg, 'p95': p95}
+            )
+        for (node_id, bucket, metric), child_rows in children.items():
+            rows.append(dict(merge(child_rows), nodeId=node_id, resolution=resolution,
+                             bucket=bucket, metric=metric))
+        return rows
+
+
+rollups = RollupService()
@@ -0,0 +1,126 @@
+"""Install scripts rendered from Jinja templates, one per ``TypeScript``.
+
+The templates in ``app/templates/scripts`` are compiled once at startup in
+their own environment (no HTML autoescaping, strict undefined variables,
+``sh`` filter for shell quoting). For each template the variables it
+actually uses are found with ``jinja2.meta``, and rendered output is cached
+under a hash of the template and only those variables: the node_exporter
+script does not use the node IP, so every node with the same port and
+version shares one rendering (and one stored copy, see ``ScriptBlob``).
+"""
+import hashlib
+import os
+import shlex
+import threading
+from collections import OrderedDict
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, meta
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'scripts')
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class _CompiledScript:
+    def __init__(self, template, source):
+        self.template = template
+        self.source_hash = content_hash(source)
+        self.variables = frozenset(meta.find_undeclared_variables(template.environment.parse(source)))
+
+
+class ScriptRenderer:
+    def __init__(self, app=None):
+        self.app = None
+        self.cache_size = 1024
+        self.versions = {}
+        self.defaults = {}
+        self._scripts = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'renders': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.cache_size = app.config.get('SCRIPT_CACHE_SIZE', self.cache_size)
+        self.versions = {
+            'node_exporter': app.config.get('SCRIPT_NODE_EXPORTER_VERSION', '1.8.2'),
+            'promtail': app.config.get('SCRIPT_PROMTAIL_VERSION', '3.2.1'),
+            'loki': app.config.get('SCRIPT_LOKI_VERSION', '3.2.1'),
+        }
+        loki_url = (app.config.get('LOKI_URL') or 'http://localhost:3100').rstrip('/')
+        self.defaults = {
+            'loki_push_url': app.config.get('SCRIPT_LOKI_PUSH_URL') or f'{loki_url}/loki/api/v1/push',
+            'name_logs': app.config.get('SCRIPT_PROMTAIL_JOB', 'varlogs'),
+            'log_path': app.config.get('SCRIPT_PROMTAIL_LOG_PATH', '/var/log/*log'),
+        }
+        self._compile()
+        app.extensions['script_renderer'] = self
+
+    def _compile(self):
+        env = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            undefined=StrictUndefined,
+            keep_trailing_newline=True,
+            autoescape=False
+        )
+        env.filters['sh'] = lambda value: shlex.quote(str(value))
+        scripts = {}
+        for filename in sorted(os.listdir(TEMPLATE_DIR)):
+            if not filename.endswith('.sh.j2'):
+                continue
+            source = env.loader.get_source(env, filename)[0]
+            scripts[filename[:-len('.sh.j2')]] = _CompiledScript(env.get_template(filename), source)
+        with self._lock:
+            self._scripts = scripts
+            self._cache.clear()
+
+    @property
+    def types(self):
+        return tuple(self._scripts)
+
+    def variables(self, script_type):
+        """Names of the variables the template of ``script_type`` uses."""
+        return self._scripts[script_type].variables
+
+    def key(self, script_type, variables):
+        """Cache key: hash of the template and the variables it uses, nothing else."""
+        script = self._scripts[script_type]
+        values = {**self.defaults, 'version': self.versions.get(script_type), **variables}
+        used = sorted((name, str(values.get(name))) for name in script.variables)
+        parts = [script_type, script.source_hash] + [f'{name}={value}' for name, value in used]
+        return content_hash('\0'.join(parts)), values
+
+    def render(self, script_type, **variables):
+        """Return ``(content, content_hash)`` for a script; ValueError for unknown types."""
+        if script_type not in self._scripts:
+            raise ValueError(f'Unknown script type: {script_type}')
+        key, values = self.key(script_type, variables)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._stats['hits'] += 1
+                return cached
+
+        content = self._scripts[script_type].template.render(values)
+        result = (content, content_hash(content))
+        with self._lock:
+            self._stats['renders'] += 1
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached'] = len(self._cache)
+        stats['templates'] = {name: sorted(script.variables) for name, script in self._scripts.items()}
+        return stats
+
+
+script_renderer = ScriptRenderer()
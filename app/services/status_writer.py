@@ -0,0 +1,145 @@
+"""Coalesced writer for ``Node.status`` / ``Node.last_checked``.
+
+Probe results are submitted here instead of being written directly. Only
+nodes whose status differs from what was last persisted are written (plus
+nodes whose stored ``last_checked`` is older than
+``STATUS_TOUCH_INTERVAL``), and all pending changes are flushed every
+``STATUS_FLUSH_INTERVAL`` seconds. On PostgreSQL a flush is one
+``UPDATE nodes ... FROM (VALUES ...)`` per ``PROBE_WRITE_BATCH_SIZE`` rows,
+with rows ordered by id so concurrent flushes lock them in the same order.
+"""
+import threading
+from datetime import timedelta
+
+from sqlalchemy import bindparam, column, values, DateTime, Integer, String
+
+from app import db
+from app.services.base import PeriodicService
+
+
+class StatusWriter(PeriodicService):
+    name = 'status-writer'
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.batch_size = 500
+        self.touch_interval = timedelta(minutes=10)
+        self._pending = {}
+        self._persisted = {}
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'written': 0, 'flushes': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('STATUS_FLUSH_INTERVAL', 5)
+        self.batch_size = app.config.get('PROBE_WRITE_BATCH_SIZE', 500)
+        self.touch_interval = timedelta(seconds=app.config.get('STATUS_TOUCH_INTERVAL', 600))
+        app.extensions['status_writer'] = self
+
+    def stop(self):
+        super().stop()
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Failed to flush node statuses: {str(e)}")
+
+    def prime(self, rows):
+        """Replace the known persisted state with ``(node_id, status, last_checked)`` rows.
+
+        Called with a fresh read of the table before each probe round, so
+        edits made through the API and deleted nodes are picked up.
+        """
+        persisted = {node_id: (status, last_checked) for node_id, status, last_checked in rows}
+        with self._lock:
+            self._persisted = persisted
+
+    def submit(self, node_id, status, checked_at):
+        """Queue a probe result; returns True if it will be written."""
+        with self._lock:
+            self._stats['submitted'] += 1
+            persisted = self._persisted.get(node_id)
+            if persisted is not None:
+                persisted_status, persisted_at = persisted
+                if (persisted_status == status and persisted_at is not None
+                        and checked_at - persisted_at < self.touch_interval):
+                    self._pending.pop(node_id, None)
+                    return False
+            self._pending[node_id] = (status, checked_at)
+            return True
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
+
+    def run_once(self):
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+        rows = sorted((node_id, status, checked_at) for node_id, (status, checked_at) in pending.items())
+        with self.app.app_context():
+            try:
+                for i in range(0, len(rows), self.batch_size):
+                    batch = rows[i:i + self.batch_size]
+                    self._update(batch)
+                    self._bump_versions([row[0] for row in batch])
+                    db.session.commit()
+            except Exception:
+                db.session.rollback()
+                # Retry on the next flush unless a newer result arrived meanwhile
+                with self._lock:
+                    for node_id, result in pending.items():
+                        self._pending.setdefault(node_id, result)
+                raise
+
+        with self._lock:
+            for node_id, status, checked_at in rows:
+                self._persisted[node_id] = (status, checked_at)
+            self._stats['written'] += len(rows)
+            self._stats['flushes'] += 1
+
+    @staticmethod
+    def _bump_versions(node_ids):
+        """Invalidate the ETags of the owners of the written nodes."""
+        from app.models.models import Node, User
+
+        User.bump_fleet_version(
+            db.select(Node.ownerId).where(Node.id.in_(node_ids)).distinct()
+        )
+
+    def _update(self, rows):
+        from app.models.models import Node
+
+        nodes = Node.__table__
+        if db.session.get_bind().dialect.name == 'postgresql':
+            changes = values(
+                column('id', Integer), column('status', String), column('last_checked', DateTime),
+                name='changes'
+            ).data(rows)
+            db.session.execute(
+                nodes.update()
+                .values(status=changes.c.status, last_checked=changes.c.last_checked)
+                .where(nodes.c.id == changes.c.id)
+            )
+            return
+
+        # Other databases: one executemany
+        db.session.execute(
+            nodes.update().where(nodes.c.id == bindparam('node_id')).values(
+                status=bindparam('new_status'),
+                last_checked=bindparam('checked_at')
+            ),
+            [{'node_id': node_id, 'new_status': status, 'checked_at': checked_at}
+             for node_id, status, checked_at in rows]
+        )
+
+
+status_writer = StatusWriter()
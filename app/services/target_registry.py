@@ -0,0 +1,177 @@
+"""Prometheus file_sd target registry.
+
+Adds and removes are queued and coalesced: a burst of changes within
+``TARGET_REGISTRY_COALESCE_MS`` becomes a single write. Each write takes an
+exclusive file lock, re-reads the file (other workers may have changed it),
+applies the queued changes and replaces the file atomically (temp file +
+fsync + rename). The file is the only state, so a remove works for targets
+another worker added.
+
+``add`` and ``remove`` wait for the write that carries their change and
+raise if it failed, so callers never report a change that was lost.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+
+class TargetRegistry:
+    def __init__(self, app=None):
+        self.app = None
+        self.path = None
+        self.coalesce_delay = 0.2
+        self.write_timeout = 10
+        self._pending_add = {}  # ordered set
+        self._pending_remove = set()
+        self._owners = {}  # target -> token of the caller that queued it first
+        self._future = None
+        self._timer = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._atexit_registered = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.path = app.config.get('PROMETHEUS_FILE_SD_PATH')
+        self.coalesce_delay = app.config.get('TARGET_REGISTRY_COALESCE_MS', 200) / 1000.0
+        self.write_timeout = app.config.get('TARGET_REGISTRY_WRITE_TIMEOUT', self.write_timeout)
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+        app.extensions['target_registry'] = self
+
+    def targets(self):
+        """Targets currently in the file."""
+        return {t for group in self._read() for t in group.get('targets', [])}
+
+    def add(self, targets):
+        """Add targets and wait for the write; returns how many were new."""
+        future, token = self._submit(add=set(targets))
+        added, _, owners = future.result(timeout=self.write_timeout)
+        return sum(1 for t in added if owners.get(t) is token)
+
+    def remove(self, targets):
+        """Remove targets and wait for the write; returns how many were present."""
+        future, token = self._submit(remove=set(targets))
+        _, removed, owners = future.result(timeout=self.write_timeout)
+        return sum(1 for t in removed if owners.get(t) is token)
+
+    def flush(self):
+        """Write queued changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            future, self._future = self._future, None
+            pending_add, self._pending_add = list(self._pending_add), {}
+            pending_remove, self._pending_remove = self._pending_remove, set()
+            owners, self._owners = self._owners, {}
+        if future is None:
+            return
+        try:
+            with self._write_lock:
+                added, removed = self._write(pending_add, pending_remove)
+        except Exception as e:
+            print(f"Failed to write Prometheus targets: {str(e)}")
+            future.set_exception(e)
+            raise
+        future.set_result((added, removed, owners))
+
+    def _submit(self, add=(), remove=()):
+        """Queue changes; returns the future of the write that will carry them and a caller token."""
+        token = object()
+        with self._lock:
+            for target in add:
+                self._pending_remove.discard(target)
+                self._pending_add[target] = None
+                self._owners.setdefault(target, token)
+            for target in remove:
+                self._pending_add.pop(target, None)
+                self._pending_remove.add(target)
+                self._owners.setdefault(target, token)
+            if self._future is None:
+                self._future = Future()
+            future = self._future
+            if self._timer is None:
+                self._timer = threading.Timer(self.coalesce_delay, self._flush_quietly)
+                self._timer.daemon = True
+                self._timer.start()
+        return future, token
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception:
+            pass  # already reported to the waiting callers
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                groups = json.load(f)
+        except FileNotFoundError:
+            return []
+        return groups if isinstance(groups, list) else []
+
+    def _write(self, pending_add, pending_remove):
+        """Apply the changes to the file; returns the ``(added, removed)`` targets."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with open(f'{self.path}.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                groups = self._read()
+                if not groups:
+                    groups = [{'targets': [], 'labels': {}}]
+
+                seen, removed = set(), set()
+                for group in groups:
+                    kept = []
+                    for target in group.get('targets', []):
+                        if target in pending_remove:
+                            removed.add(target)
+                        elif target not in seen:
+                            seen.add(target)
+                            kept.append(target)
+                    group['targets'] = kept
+                added = [t for t in pending_add if t not in seen]
+                groups[0]['targets'].extend(added)
+                if not added and not removed:
+                    return set(), set()
+
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tg_', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w') as tmp:
+                        json.dump(groups, tmp, indent=2)
+                        tmp.flush()
+                        os.fsync(tmp.fileno())
+                    os.replace(tmp_path, self.path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+                    raise
+
+                if hasattr(os, 'O_DIRECTORY'):
+                    dir_fd = os.open(directory, os.O_DIRECTORY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+                return set(added), removed
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+target_registry = TargetRegistry()
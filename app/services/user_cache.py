@@ -0,0 +1,110 @@
+"""In-process TTL/LRU cache for User lookups.
+
+Flask-Login's user_loader and the JWT-protected auth routes resolve the
+current user on every request. The cache keeps a snapshot of the user's
+columns and re-attaches it to the request's session without a query, so a
+hit costs no database round trip. Entries expire after ``USER_CACHE_TTL``
+seconds and are invalidated explicitly whenever a user is changed.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, has_app_context
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from app import db
+
+
+class UserCache:
+    def __init__(self, app=None):
+        self.app = None
+        self.ttl = 60
+        self.max_size = 10000
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.ttl = app.config.get('USER_CACHE_TTL', 60)
+        self.max_size = app.config.get('USER_CACHE_SIZE', 10000)
+        app.extensions['user_cache'] = self
+
+    def get_user(self, user_id):
+        """Return the User attached to the current session, or None."""
+        from app.models.models import User
+
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        # Several lookups within one request share the same instance
+        memo = g.setdefault('_cached_users', {}) if has_app_context() else {}
+        if user_id in memo:
+            return memo[user_id]
+
+        columns = self._get(user_id)
+        if columns is None:
+            user = db.session.get(User, user_id)
+            if user is not None:
+                self._put(user_id, {c.key: getattr(user, c.key) for c in User.__table__.columns})
+        else:
+            user = self._attach(User, columns)
+
+        memo[user_id] = user
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+            self._stats['invalidations'] += 1
+        if has_app_context():
+            g.pop('_cached_users', None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        return stats
+
+    def _get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._stats['hits'] += 1
+            return entry[1]
+
+    def _put(self, user_id, columns):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, columns)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _attach(model, columns):
+        """Rebuild a persistent instance from cached columns without a SELECT."""
+        key = identity_key(model, columns['id'])
+        if key in db.session.identity_map:
+            return db.session.identity_map[key]
+        user = model(**columns)
+        make_transient_to_detached(user)
+        db.session.add(user)
+        return user
+
+
+user_cache = UserCache()
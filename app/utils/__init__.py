@@ -0,0 +1 @@
+"""Utility helpers shared by the blueprints and services."""
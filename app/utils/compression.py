@@ -0,0 +1,45 @@
+"""gzip/brotli compression of JSON responses.
+
+Registered as an ``after_request`` hook. JSON bodies of at least
+``COMPRESS_MIN_SIZE`` bytes are compressed with brotli when the client
+accepts it and the optional ``brotli`` package is installed, otherwise with
+gzip. Streamed responses (NDJSON export, SSE) are left alone.
+"""
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+def compress_response(response):
+    if (response.status_code != 200
+            or response.mimetype != 'application/json'
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        encoding = 'br'
+    elif accepted['gzip']:
+        encoding = 'gzip'
+    else:
+        return response
+
+    data = response.get_data()
+    if len(data) < current_app.config.get('COMPRESS_MIN_SIZE', 1024):
+        return response
+
+    if encoding == 'br':
+        data = brotli.compress(data, quality=current_app.config.get('COMPRESS_BROTLI_QUALITY', 4))
+    else:
+        data = gzip.compress(data, compresslevel=current_app.config.get('COMPRESS_GZIP_LEVEL', 6))
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,40 @@
+"""Conditional GETs keyed on the per-user fleet version.
+
+``users.fleetVersion`` is bumped in the same transaction as every change to
+a user's nodes, alerts or profile, and by the status writer. A weak ETag of
+``user id + fleet version`` therefore changes whenever any of those
+responses could, and a matching ``If-None-Match`` is answered with
+``304 Not Modified`` before the view queries or serializes anything.
+"""
+from functools import wraps
+
+from flask import Response, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+
+def fleet_etag(view):
+    """Decorate a JWT-protected view; only GET/HEAD requests are conditional."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        from app.models.models import User
+
+        if request.method not in ('GET', 'HEAD'):
+            return view(*args, **kwargs)
+
+        user_id = get_jwt_identity()
+        version = User.get_fleet_version(user_id)
+        if version is None:
+            return view(*args, **kwargs)
+        etag = f'{user_id}-{version}'
+
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        # Responses depend on the bearer token, so only the browser may keep them
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
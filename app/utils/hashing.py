@@ -0,0 +1,107 @@
+"""Configurable password hashing.
+
+The scheme and its cost come from config (``PASSWORD_HASH_SCHEME`` and the
+``PASSWORD_*`` parameters). Hashes made with another scheme or a lower cost
+still verify, and ``needs_rehash`` tells the login path to upgrade them.
+
+Supported schemes: ``pbkdf2`` and ``scrypt`` (werkzeug), ``bcrypt`` and
+``argon2`` (only when ``argon2-cffi`` is installed).
+"""
+import bcrypt
+from werkzeug.security import generate_password_hash, check_password_hash
+
+try:
+    import argon2
+except ImportError:  # optional dependency
+    argon2 = None
+
+SCHEMES = ('pbkdf2', 'scrypt', 'bcrypt', 'argon2')
+
+
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.scheme = 'pbkdf2'
+        self.pbkdf2_iterations = 600000
+        self.scrypt_n = 32768
+        self.scrypt_r = 8
+        self.scrypt_p = 1
+        self.bcrypt_rounds = 12
+        self.argon2_time_cost = 3
+        self.argon2_memory_cost = 65536
+        self.argon2_parallelism = 4
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.configure(
+            scheme=app.config.get('PASSWORD_HASH_SCHEME', self.scheme),
+            pbkdf2_iterations=app.config.get('PASSWORD_PBKDF2_ITERATIONS', self.pbkdf2_iterations),
+            scrypt_n=app.config.get('PASSWORD_SCRYPT_N', self.scrypt_n),
+            scrypt_r=app.config.get('PASSWORD_SCRYPT_R', self.scrypt_r),
+            scrypt_p=app.config.get('PASSWORD_SCRYPT_P', self.scrypt_p),
+            bcrypt_rounds=app.config.get('PASSWORD_BCRYPT_ROUNDS', self.bcrypt_rounds),
+            argon2_time_cost=app.config.get('PASSWORD_ARGON2_TIME_COST', self.argon2_time_cost),
+            argon2_memory_cost=app.config.get('PASSWORD_ARGON2_MEMORY_COST', self.argon2_memory_cost),
+            argon2_parallelism=app.config.get('PASSWORD_ARGON2_PARALLELISM', self.argon2_parallelism),
+        )
+        app.extensions['password_hasher'] = self
+
+    def configure(self, **params):
+        scheme = params.get('scheme', self.scheme)
+        if scheme not in SCHEMES:
+            raise ValueError(f'Unknown password hash scheme: {scheme}')
+        if scheme == 'argon2' and argon2 is None:
+            raise ValueError('argon2 password hashing requires the argon2-cffi package')
+        for key, value in params.items():
+            setattr(self, key, value)
+        return self
+
+    def hash(self, password):
+        if self.scheme == 'pbkdf2':
+            return generate_password_hash(password, method=f'pbkdf2:sha256:{self.pbkdf2_iterations}')
+        if self.scheme == 'scrypt':
+            return generate_password_hash(
+                password, method=f'scrypt:{self.scrypt_n}:{self.scrypt_r}:{self.scrypt_p}'
+            )
+        if self.scheme == 'bcrypt':
+            return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.bcrypt_rounds)).decode('ascii')
+        return self._argon2().hash(password)
+
+    def verify(self, hashed, password):
+        if not hashed or password is None:
+            return False
+        if hashed.startswith('$2'):
+            try:
+                return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('ascii'))
+            except ValueError:
+                return False
+        if hashed.startswith('$argon2'):
+            if argon2 is None:
+                return False
+            try:
+                return self._argon2().verify(hashed, password)
+            except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+                return False
+        return check_password_hash(hashed, password)
+
+    def needs_rehash(self, hashed):
+        """Return True if ``hashed`` uses another scheme or different cost."""
+        if self.scheme == 'pbkdf2':
+            return not hashed.startswith(f'pbkdf2:sha256:{self.pbkdf2_iterations}$')
+        if self.scheme == 'scrypt':
+            return not hashed.startswith(f'scrypt:{self.scrypt_n}:{self.scrypt_r}:{self.scrypt_p}$')
+        if self.scheme == 'bcrypt':
+            return not (hashed.startswith('$2') and hashed[4:6] == f'{self.bcrypt_rounds:02d}')
+        if not hashed.startswith('$argon2'):
+            return True
+        return self._argon2().check_needs_rehash(hashed)
+
+    def _argon2(self):
+        return argon2.PasswordHasher(
+            time_cost=self.argon2_time_cost,
+            memory_cost=self.argon2_memory_cost,
+            parallelism=self.argon2_parallelism
+        )
+
+
+hasher = PasswordHasher()
@@ -0,0 +1,59 @@
+"""Flask JSON provider backed by orjson, with a stdlib fallback.
+
+orjson encodes ``datetime`` (as ISO-8601, like ``isoformat()``), ``date``,
+``UUID`` and dataclasses natively and returns bytes, so responses skip the
+str round trip. Without orjson installed the provider falls back to the
+stdlib encoder but keeps the same ISO-8601 datetime format, so row dicts
+can carry raw ``datetime`` values either way. ``dumps`` keyword arguments
+orjson cannot honour (``ensure_ascii``, ``separators``, ``cls``, an indent
+other than 2, ...) send that call to the stdlib encoder.
+"""
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+ORJSON_DUMPS_KWARGS = {'indent', 'sort_keys'}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(o):
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, pretty=False, sort_keys=None):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        # orjson can honour sort_keys and a 2-space indent; anything else goes to the stdlib
+        indent = kwargs.get('indent')
+        if orjson is None or not kwargs.keys() <= ORJSON_DUMPS_KWARGS or indent not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        option = self._orjson_options(pretty=indent is not None, sort_keys=kwargs.get('sort_keys'))
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(
+            obj, default=self.default, option=self._orjson_options(pretty) | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
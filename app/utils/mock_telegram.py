@@ -0,0 +1,93 @@
+"""Minimal stand-in for the Telegram Bot API, for local runs and tests.
+
+Accepts ``POST /bot<token>/sendMessage`` and records every message. With
+``rate_per_minute`` set, a chat that exceeds it gets the same 429 response
+(``parameters.retry_after``) as the real API; ``fail_every`` makes every
+n-th request fail with a 502 to exercise retries.
+
+    server = make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # TELEGRAM_API_URL = f'http://127.0.0.1:{server.server_port}'
+    ...
+    server.messages  # [{'token', 'chat_id', 'text', 'at'}, ...]
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 2 or not parts[0].startswith('bot') or parts[1] != 'sendMessage':
+            return self._reply(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._reply(400, {'ok': False, 'error_code': 400, 'description': 'Bad Request: invalid JSON'})
+        chat_id, text = body.get('chat_id'), body.get('text')
+        if not chat_id or not text:
+            return self._reply(400, {'ok': False, 'error_code': 400,
+                                     'description': 'Bad Request: chat_id and text are required'})
+
+        status, payload = server.handle_message(parts[0][3:], str(chat_id), text)
+        self._reply(status, payload)
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class MockTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, rate_per_minute=None, fail_every=None, verbose=False):
+        super().__init__(address, _Handler)
+        self.rate_per_minute = rate_per_minute
+        self.fail_every = fail_every
+        self.verbose = verbose
+        self.messages = []
+        self.requests = 0
+        self._sent = {}
+        self._lock = threading.Lock()
+
+    def handle_message(self, token, chat_id, text):
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            if self.fail_every and self.requests % self.fail_every == 0:
+                return 502, {'ok': False, 'error_code': 502, 'description': 'Bad Gateway'}
+            if self.rate_per_minute:
+                sent = self._sent.setdefault(chat_id, deque())
+                while sent and now - sent[0] >= 60:
+                    sent.popleft()
+                if len(sent) >= self.rate_per_minute:
+                    retry_after = max(1, int(60 - (now - sent[0])) + 1)
+                    return 429, {'ok': False, 'error_code': 429,
+                                 'description': f'Too Many Requests: retry after {retry_after}',
+                                 'parameters': {'retry_after': retry_after}}
+                sent.append(now)
+            message = {'token': token, 'chat_id': chat_id, 'text': text, 'at': time.time()}
+            self.messages.append(message)
+            message_id = len(self.messages)
+        if self.verbose:
+            print(f"[{chat_id}] {text}")
+        return 200, {'ok': True, 'result': {'message_id': message_id, 'chat': {'id': chat_id}, 'text': text}}
+
+
+def make_server(host='127.0.0.1', port=8081, rate_per_minute=None, fail_every=None, verbose=False):
+    """Create the mock server; call ``serve_forever()`` on it (``port=0`` picks a free port)."""
+    return MockTelegramServer((host, port), rate_per_minute=rate_per_minute,
+                              fail_every=fail_every, verbose=verbose)
@@ -0,0 +1,30 @@
+"""Opaque keyset-pagination cursors.
+
+A cursor encodes the sort key and id of the last row of a page, so the next
+page is fetched with ``WHERE (key, id) > (:key, :id)`` instead of OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(sort, value, row_id):
+    """Encode the position after ``(value, row_id)`` for the given sort."""
+    if isinstance(value, datetime):
+        value = {'dt': value.isoformat()}
+    payload = json.dumps([sort, value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Return ``(value, row_id)`` from a cursor produced for the same sort."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value['dt'])
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort or not isinstance(row_id, int):
+        raise ValueError('Cursor does not match the requested sort')
+    return value, row_id
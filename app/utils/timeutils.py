@@ -0,0 +1,27 @@
+"""Time helpers for API query parameters and bucketing."""
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def parse_time(value, default=None):
+    """Parse an ISO-8601 string or epoch seconds into a naive UTC datetime."""
+    if value is None or value == '':
+        return default
+    try:
+        return datetime.utcfromtimestamp(float(value))
+    except (ValueError, OverflowError, OSError, TypeError):
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError(f'Invalid time: {value}')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def floor_time(value, seconds):
+    """Round a naive UTC datetime down to a multiple of ``seconds``."""
+    offset = int((value - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=offset - offset % seconds)
@@ -1,58 +1,198 @@
-#!/usr/bin/env python
-"""
-Script quản lý các tác vụ chung của dự án
-"""
-import click
-import sys
-from app import create_app, db
-from app.models import User
-from werkzeug.security import generate_password_hash
-from flask.cli import FlaskGroup
-
-app = create_app()
-cli = FlaskGroup(app)
-
-@cli.command("init-db")
-def init_db():
-    """Khởi tạo database"""
-    from migrations.manage import init_db
-    init_db()
-    click.echo("Database đã được khởi tạo")
-
-@cli.command("create-admin")
-@click.argument("username")
-@click.argument("password")
-@click.argument("email")
-def create_admin(username, password, email):
-    """Tạo tài khoản admin"""
-    with app.app_context():
-        user = User.query.filter_by(username=username).first()
-        if user:
-            click.echo(f"Người dùng {username} đã tồn tại")
-            return
-        
-        new_user = User(
-            username=username,
-            email=email,
-            role="admin",
-            password=generate_password_hash(password)
-        )
-        db.session.add(new_user)
-        db.session.commit()
-        click.echo(f"Tài khoản admin {username} đã được tạo")
-
-@cli.command("list-users")
-def list_users():
-    """Liệt kê tất cả người dùng"""
-    with app.app_context():
-        users = User.query.all()
-        if not users:
-            click.echo("Chưa có người dùng nào")
-            return
-        
-        click.echo("Danh sách người dùng:")
-        for user in users:
-            click.echo(f"ID: {user.id}, Username: {user.username}, Email: {user.email}, Role: {user.role}")
-
-if __name__ == "__main__":
+#!/usr/bin/env python
+"""
+Script quản lý các tác vụ chung của dự án
+"""
+import os
+import click
+import sys
+
+# CLI commands must not start the background service threads
+os.environ.setdefault('BACKGROUND_TASKS_ENABLED', 'false')
+
+from app import create_app, db
+from app.models import User
+from app.utils.hashing import hasher, SCHEMES, PasswordHasher
+from flask.cli import FlaskGroup
+
+app = create_app()
+cli = FlaskGroup(app)
+
+@cli.command("init-db")
+def init_db():
+    """Khởi tạo database"""
+    from migrations.manage import init_db
+    init_db()
+    click.echo("Database đã được khởi tạo")
+
+@cli.command("create-admin")
+@click.argument("username")
+@click.argument("password")
+@click.argument("email")
+def create_admin(username, password, email):
+    """Tạo tài khoản admin"""
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        if user:
+            click.echo(f"Người dùng {username} đã tồn tại")
+            return
+        
+        new_user = User(
+            username=username,
+            email=email,
+            role="admin",
+            password=hasher.hash(password)
+        )
+        db.session.add(new_user)
+        db.session.commit()
+        click.echo(f"Tài khoản admin {username} đã được tạo")
+
+@cli.command("list-users")
+def list_users():
+    """Liệt kê tất cả người dùng"""
+    with app.app_context():
+        users = User.query.all()
+        if not users:
+            click.echo("Chưa có người dùng nào")
+            return
+        
+        click.echo("Danh sách người dùng:")
+        for user in users:
+            click.echo(f"ID: {user.id}, Username: {user.username}, Email: {user.email}, Role: {user.role}")
+
+@cli.command("bench-hash")
+@click.option("--scheme", type=click.Choice(SCHEMES), default=None, help="Chỉ đo một scheme")
+@click.option("--count", default=10, show_default=True, help="Số lần hash mỗi scheme")
+def bench_hash(scheme, count):
+    """Đo tốc độ hash mật khẩu (hashes/giây trên một core) với cấu hình hiện tại"""
+    import time
+    schemes = [scheme] if scheme else SCHEMES
+    for name in schemes:
+        try:
+            # Same cost parameters as the configured hasher, other scheme
+            bench = PasswordHasher().configure(**dict(vars(hasher), scheme=name))
+        except ValueError as e:
+            click.echo(f"{name:8s} bỏ qua: {e}")
+            continue
+        hashed = bench.hash("benchmark-password")
+        start = time.perf_counter()
+        for _ in range(count):
+            bench.hash("benchmark-password")
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(count):
+            bench.verify(hashed, "benchmark-password")
+        verify_elapsed = time.perf_counter() - start
+        marker = " (đang dùng)" if name == hasher.scheme else ""
+        click.echo(
+            f"{name:8s} hash: {count / elapsed:8.2f}/s ({elapsed / count * 1000:8.2f} ms)  "
+            f"verify: {count / verify_elapsed:8.2f}/s{marker}"
+        )
+
+@cli.command("bench-json")
+@click.option("--count", default=10000, show_default=True, help="Số nodes")
+@click.option("--repeat", default=5, show_default=True, help="Số lần đo, lấy kết quả tốt nhất")
+def bench_json(count, repeat):
+    """So sánh tốc độ serialize danh sách nodes: ORM + to_dict + json chuẩn và cột + FastJSONProvider"""
+    import time
+    from datetime import datetime, timedelta
+    from flask.json.provider import DefaultJSONProvider
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+    from app.models.models import Node
+    from app.utils.json_provider import orjson
+
+    # Separate in-memory database so the bench never touches real data
+    engine = create_engine("sqlite://")
+    db.metadata.create_all(engine, tables=[User.__table__, Node.__table__])
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"username": "bench", "password": "x"}])
+        conn.execute(Node.__table__.insert(), [
+            {"name": f"node-{i}", "ipAddress": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+             "status": "active" if i % 3 else "inactive", "portNodeExporter": 9100,
+             "portPromtail": 9080, "ownerId": 1, "last_checked": now - timedelta(seconds=i)}
+            for i in range(count)
+        ])
+
+    def measure(load, to_dicts, dumps):
+        best = None
+        for _ in range(repeat):
+            with Session(engine) as session:
+                start = time.perf_counter()
+                rows = load(session)
+                loaded = time.perf_counter()
+                body = dumps({"nodes": to_dicts(rows)})
+                done = time.perf_counter()
+            timing = (loaded - start, done - loaded, len(body))
+            if best is None or sum(timing[:2]) < sum(best[:2]):
+                best = timing
+        return best
+
+    with app.app_context():
+        before = measure(
+            lambda session: session.scalars(select(Node)).all(),
+            lambda nodes: [node.to_dict() for node in nodes],
+            DefaultJSONProvider(app).dumps
+        )
+        after = measure(
+            lambda session: session.execute(select(*Node.api_columns())).all(),
+            lambda rows: [Node.row_to_dict(row) for row in rows],
+            app.json.dumps
+        )
+
+    click.echo(f"{count} nodes, tốt nhất trong {repeat} lần (orjson: {'có' if orjson else 'không'})")
+    for label, (load, encode, size) in (("trước", before), ("sau", after)):
+        click.echo(
+            f"{label:6s} truy vấn: {load * 1000:8.1f} ms  serialize: {encode * 1000:8.1f} ms  "
+            f"tổng: {(load + encode) * 1000:8.1f} ms  ({size} bytes)"
+        )
+
+@cli.command("create-partitions")
+@click.option("--days-ahead", default=7, show_default=True, help="Số ngày tạo partition trước")
+def create_partitions(days_ahead):
+    """Tạo trước các partition theo ngày cho bảng time-series"""
+    from app.services import partitions
+    with app.app_context():
+        for table in partitions.PARTITIONED_TABLES:
+            if not partitions.is_partitioned(table):
+                click.echo(f"Bảng {table} chưa được partition, bỏ qua")
+                continue
+            created = partitions.create_partitions(table, days_ahead=days_ahead)
+            click.echo(f"{table}: đã tạo {len(created)} partition")
+
+@cli.command("drop-partitions")
+@click.option("--older-than", required=True, type=int, help="Xoá partition cũ hơn số ngày này")
+@click.option("--table", default=None, help="Chỉ xử lý một bảng")
+def drop_partitions(older_than, table):
+    """Xoá các partition cũ (retention không cần DELETE)"""
+    from datetime import datetime, timedelta
+    from app.services import partitions
+    tables = [table] if table else partitions.PARTITIONED_TABLES
+    with app.app_context():
+        cutoff = datetime.utcnow() - timedelta(days=older_than)
+        for name in tables:
+            if not partitions.is_partitioned(name):
+                click.echo(f"Bảng {name} chưa được partition, bỏ qua")
+                continue
+            dropped = partitions.drop_partitions(name, cutoff)
+            click.echo(f"{name}: đã xoá {len(dropped)} partition")
+
+@cli.command("mock-telegram")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8081, show_default=True)
+@click.option("--rate-per-minute", default=None, type=int, help="Trả về 429 khi một chat vượt quá số tin nhắn/phút")
+@click.option("--fail-every", default=None, type=int, help="Cứ n request thì trả về 502 một lần")
+def mock_telegram(host, port, rate_per_minute, fail_every):
+    """Chạy server giả lập Telegram Bot API (đặt TELEGRAM_API_URL trỏ tới server này)"""
+    from app.utils.mock_telegram import make_server
+    server = make_server(host, port, rate_per_minute=rate_per_minute, fail_every=fail_every, verbose=True)
+    click.echo(f"Mock Telegram đang chạy tại http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
     cli() 
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""Add unique index on web_displays.nodeId
+
+Revision ID: 3c6a9e1f4b72
+Revises: 9d4e7b3a2f60
+Create Date: 2026-10-18 17:21:36.904518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c6a9e1f4b72'
+down_revision = '9d4e7b3a2f60'
+branch_labels = None
+depends_on = None
+
+
+web_displays = sa.table(
+    'web_displays',
+    sa.column('id', sa.Integer),
+    sa.column('nodeId', sa.Integer),
+)
+
+
+def upgrade():
+    # Keep the newest display of nodes that have several, the index below rejects duplicates
+    keep = sa.select(sa.func.max(web_displays.c.id).label('id')).group_by(web_displays.c.nodeId).subquery()
+    op.execute(
+        web_displays.delete()
+        .where(web_displays.c.nodeId.isnot(None), web_displays.c.id.notin_(sa.select(keep.c.id)))
+    )
+    # One display row per node; the rows are looked up by nodeId on every node page
+    op.create_index('ix_web_displays_nodeId', 'web_displays', ['nodeId'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_web_displays_nodeId', table_name='web_displays')
@@ -0,0 +1,42 @@
+"""Add node search indexes
+
+Revision ID: 4f1c2a9b7d3e
+Revises: de76325d2783
+Create Date: 2026-10-18 09:12:41.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1c2a9b7d3e'
+down_revision = 'de76325d2783'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    op.create_index('ix_nodes_ownerId_status', 'nodes', ['ownerId', 'status'], unique=False)
+
+    if bind.dialect.name == 'postgresql':
+        # Trigram GIN indexes serve both ILIKE '%term%' and LIKE 'prefix%'
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_nodes_name_trgm', 'nodes', ['name'], unique=False,
+                        postgresql_using='gin',
+                        postgresql_ops={'name': 'gin_trgm_ops'})
+        op.create_index('ix_nodes_ipAddress_trgm', 'nodes', ['ipAddress'], unique=False,
+                        postgresql_using='gin',
+                        postgresql_ops={'ipAddress': 'gin_trgm_ops'})
+    else:
+        # No pg_trgm (e.g. SQLite): plain B-tree indexes still help prefix searches
+        op.create_index('ix_nodes_name_trgm', 'nodes', ['name'], unique=False)
+        op.create_index('ix_nodes_ipAddress_trgm', 'nodes', ['ipAddress'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_nodes_ipAddress_trgm', table_name='nodes')
+    op.drop_index('ix_nodes_name_trgm', table_name='nodes')
+    op.drop_index('ix_nodes_ownerId_status', table_name='nodes')
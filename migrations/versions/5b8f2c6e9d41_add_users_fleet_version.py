@@ -0,0 +1,26 @@
+"""Add users.fleetVersion for conditional GETs
+
+Revision ID: 5b8f2c6e9d41
+Revises: e2b94f7a1c05
+Create Date: 2026-10-18 16:02:47.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8f2c6e9d41'
+down_revision = 'e2b94f7a1c05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fleetVersion', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('fleetVersion')
@@ -0,0 +1,102 @@
+"""Store script content once in script_blobs
+
+Revision ID: 7e2d5c8a1b93
+Revises: 3c6a9e1f4b72
+Create Date: 2026-10-18 17:58:04.261937
+
+"""
+import hashlib
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2d5c8a1b93'
+down_revision = '3c6a9e1f4b72'
+branch_labels = None
+depends_on = None
+
+
+script_generators = sa.table(
+    'script_generators',
+    sa.column('id', sa.Integer),
+    sa.column('nodeId', sa.Integer),
+    sa.column('typeScript', sa.String),
+    sa.column('scriptContent', sa.Text),
+    sa.column('contentHash', sa.String(64)),
+)
+script_blobs = sa.table(
+    'script_blobs',
+    sa.column('hash', sa.String(64)),
+    sa.column('content', sa.Text),
+    sa.column('createdAt', sa.DateTime),
+)
+
+
+def upgrade():
+    # Keep the newest script per node and type, the unique index below rejects duplicates
+    keep = (
+        sa.select(sa.func.max(script_generators.c.id).label('id'))
+        .group_by(script_generators.c.nodeId, script_generators.c.typeScript)
+        .subquery()
+    )
+    op.execute(
+        script_generators.delete()
+        .where(script_generators.c.nodeId.isnot(None), script_generators.c.typeScript.isnot(None),
+               script_generators.c.id.notin_(sa.select(keep.c.id)))
+    )
+
+    op.create_table('script_blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('createdAt', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    with op.batch_alter_table('script_generators', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('contentHash', sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key('fk_script_generators_contentHash', 'script_blobs', ['contentHash'], ['hash'])
+        batch_op.create_index('ix_script_generators_contentHash', ['contentHash'], unique=False)
+        batch_op.create_index('ix_script_generators_nodeId_typeScript', ['nodeId', 'typeScript'], unique=True)
+
+    # Move existing per-row copies into blobs
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(script_generators.c.id, script_generators.c.scriptContent)
+        .where(script_generators.c.scriptContent.isnot(None))
+    ).all()
+    blobs = {}
+    for row_id, content in rows:
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        blobs[digest] = content
+        bind.execute(
+            script_generators.update().where(script_generators.c.id == row_id)
+            .values(contentHash=digest, scriptContent=None)
+        )
+    if blobs:
+        now = datetime.utcnow()
+        op.bulk_insert(script_blobs, [{'hash': digest, 'content': content, 'createdAt': now}
+                                      for digest, content in blobs.items()])
+
+
+def downgrade():
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(script_generators.c.id, script_blobs.c.content)
+        .join(script_blobs, script_blobs.c.hash == script_generators.c.contentHash)
+    ).all()
+    for row_id, content in rows:
+        bind.execute(
+            script_generators.update().where(script_generators.c.id == row_id).values(scriptContent=content)
+        )
+
+    with op.batch_alter_table('script_generators', schema=None) as batch_op:
+        batch_op.drop_index('ix_script_generators_nodeId_typeScript')
+        batch_op.drop_index('ix_script_generators_contentHash')
+        if bind.dialect.name != 'sqlite':
+            # SQLite does not reflect the constraint name; the table copy drops it with the column
+            batch_op.drop_constraint('fk_script_generators_contentHash', type_='foreignkey')
+        batch_op.drop_column('contentHash')
+
+    op.drop_table('script_blobs')
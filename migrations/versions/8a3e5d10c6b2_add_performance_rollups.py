@@ -0,0 +1,38 @@
+"""Add performance_rollups table
+
+Revision ID: 8a3e5d10c6b2
+Revises: 4f1c2a9b7d3e
+Create Date: 2026-10-18 10:03:17.842051
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a3e5d10c6b2'
+down_revision = '4f1c2a9b7d3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('performance_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nodeId', sa.Integer(), nullable=False),
+    sa.Column('resolution', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('min', sa.Float(), nullable=True),
+    sa.Column('max', sa.Float(), nullable=True),
+    sa.Column('avg', sa.Float(), nullable=True),
+    sa.Column('p95', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['nodeId'], ['nodes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('nodeId', 'resolution', 'bucket', 'metric', name='uq_performance_rollups_bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('performance_rollups')
@@ -0,0 +1,38 @@
+"""Add rule and state columns to alerts
+
+Revision ID: 9d4e7b3a2f60
+Revises: 5b8f2c6e9d41
+Create Date: 2026-10-18 16:48:12.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4e7b3a2f60'
+down_revision = '5b8f2c6e9d41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('alerts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('kind', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('metric', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('operator', sa.String(length=2), nullable=True))
+        batch_op.add_column(sa.Column('threshold', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('duration', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('state', sa.String(length=20), nullable=True, server_default='ok'))
+        batch_op.add_column(sa.Column('stateChangedAt', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('alerts', schema=None) as batch_op:
+        batch_op.drop_column('stateChangedAt')
+        batch_op.drop_column('state')
+        batch_op.drop_column('duration')
+        batch_op.drop_column('threshold')
+        batch_op.drop_column('operator')
+        batch_op.drop_column('metric')
+        batch_op.drop_column('kind')
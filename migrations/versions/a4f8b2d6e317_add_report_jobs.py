@@ -0,0 +1,86 @@
+"""Add report job columns and compressed report content
+
+Revision ID: a4f8b2d6e317
+Revises: 7e2d5c8a1b93
+Create Date: 2026-10-18 18:34:52.770148
+
+"""
+import gzip
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f8b2d6e317'
+down_revision = '7e2d5c8a1b93'
+branch_labels = None
+depends_on = None
+
+
+reports = sa.table(
+    'reports',
+    sa.column('id', sa.Integer),
+    sa.column('content', sa.Text),
+    sa.column('contentCompressed', sa.LargeBinary),
+    sa.column('contentSize', sa.Integer),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ownerId', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('granularity', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('status', sa.String(length=20), nullable=True, server_default='queued'))
+        batch_op.add_column(sa.Column('progress', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('error', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('rowCount', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('createdAt', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('finishedAt', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('contentCompressed', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('contentPath', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('contentSize', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_reports_ownerId', 'users', ['ownerId'], ['id'])
+        batch_op.create_index('ix_reports_ownerId_createdAt', ['ownerId', 'createdAt'], unique=False)
+
+    # Existing reports were stored inline as text; compress them and mark them done
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(reports.c.id, reports.c.content).where(reports.c.content.isnot(None))).all()
+    for report_id, content in rows:
+        compressed = gzip.compress(content.encode())
+        bind.execute(reports.update().where(reports.c.id == report_id)
+                     .values(contentCompressed=compressed, contentSize=len(compressed)))
+    op.execute("UPDATE reports SET status = 'done', progress = 1")
+
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.drop_column('content')
+
+
+def downgrade():
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(reports.c.id, reports.c.contentCompressed).where(reports.c.contentCompressed.isnot(None))
+    ).all()
+    for report_id, compressed in rows:
+        bind.execute(reports.update().where(reports.c.id == report_id)
+                     .values(content=gzip.decompress(compressed).decode()))
+
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.drop_index('ix_reports_ownerId_createdAt')
+        if bind.dialect.name != 'sqlite':
+            # SQLite does not reflect the constraint name; the table copy drops it with the column
+            batch_op.drop_constraint('fk_reports_ownerId', type_='foreignkey')
+        batch_op.drop_column('contentSize')
+        batch_op.drop_column('contentPath')
+        batch_op.drop_column('contentCompressed')
+        batch_op.drop_column('finishedAt')
+        batch_op.drop_column('createdAt')
+        batch_op.drop_column('rowCount')
+        batch_op.drop_column('error')
+        batch_op.drop_column('progress')
+        batch_op.drop_column('status')
+        batch_op.drop_column('granularity')
+        batch_op.drop_column('ownerId')
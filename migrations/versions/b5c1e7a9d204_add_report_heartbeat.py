@@ -0,0 +1,28 @@
+"""Add reports.updatedAt heartbeat and worker claim token
+
+Revision ID: b5c1e7a9d204
+Revises: a4f8b2d6e317
+Create Date: 2026-10-18 19:12:07.318452
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5c1e7a9d204'
+down_revision = 'a4f8b2d6e317'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updatedAt', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('worker', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.drop_column('worker')
+        batch_op.drop_column('updatedAt')
@@ -0,0 +1,113 @@
+"""Add time-series indexes and optional daily partitioning
+
+Revision ID: c7d1e4f9a2b8
+Revises: 8a3e5d10c6b2
+Create Date: 2026-10-18 11:26:54.130972
+
+Partitioning is opt-in: set TIMESERIES_PARTITIONING=true when running the
+upgrade on PostgreSQL to convert performance_data and onchain_data into
+tables range-partitioned by day on "timestamp". Rows without a timestamp
+cannot be placed in a partition and are not copied.
+
+"""
+import os
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d1e4f9a2b8'
+down_revision = '8a3e5d10c6b2'
+branch_labels = None
+depends_on = None
+
+PARTITIONED_TABLES = ('performance_data', 'onchain_data')
+DAYS_AHEAD = 7
+
+
+def _partitioning_enabled():
+    return (op.get_bind().dialect.name == 'postgresql'
+            and os.environ.get('TIMESERIES_PARTITIONING', 'false').lower() == 'true')
+
+
+def _partition(table):
+    """Turn ``table`` into a daily range-partitioned table, keeping its rows."""
+    bind = op.get_bind()
+    legacy = f'{table}_legacy'
+
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+    op.execute(f'ALTER INDEX "{table}_pkey" RENAME TO "{legacy}_pkey"')
+    op.execute(f'ALTER INDEX "ix_{table}_nodeId_timestamp" RENAME TO "ix_{legacy}_nodeId_timestamp"')
+    op.execute(
+        f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS) '
+        f'PARTITION BY RANGE ("timestamp")'
+    )
+    op.execute(f'ALTER TABLE "{table}" ALTER COLUMN "timestamp" SET NOT NULL')
+    # The partition key has to be part of the primary key
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id, "timestamp")')
+    op.execute(f'ALTER TABLE "{table}" ADD FOREIGN KEY ("nodeId") REFERENCES nodes (id)')
+    op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+    op.create_index(f'ix_{table}_nodeId_timestamp', table, ['nodeId', sa.text('"timestamp" DESC')])
+
+    first = bind.execute(sa.text(f'SELECT min("timestamp") FROM "{legacy}"')).scalar()
+    today = datetime.utcnow().date()
+    day = first.date() if first is not None else today
+    while day <= today + timedelta(days=DAYS_AHEAD):
+        op.execute(
+            f'CREATE TABLE "{table}_p{day:%Y%m%d}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        )
+        day += timedelta(days=1)
+
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}" WHERE "timestamp" IS NOT NULL')
+    op.execute(f'DROP TABLE "{legacy}"')
+
+
+def _unpartition(table):
+    """Turn a partitioned ``table`` back into a plain table."""
+    partitioned = f'{table}_partitioned'
+
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{partitioned}"')
+    op.execute(f'ALTER INDEX "{table}_pkey" RENAME TO "{partitioned}_pkey"')
+    op.execute(f'ALTER INDEX "ix_{table}_nodeId_timestamp" RENAME TO "ix_{partitioned}_nodeId_timestamp"')
+    op.execute(f'CREATE TABLE "{table}" (LIKE "{partitioned}" INCLUDING DEFAULTS)')
+    op.execute(f'ALTER TABLE "{table}" ALTER COLUMN "timestamp" DROP NOT NULL')
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id)')
+    op.execute(f'ALTER TABLE "{table}" ADD FOREIGN KEY ("nodeId") REFERENCES nodes (id)')
+    op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{partitioned}"')
+    op.execute(f'DROP TABLE "{partitioned}"')
+
+
+def upgrade():
+    op.create_index('ix_performance_data_nodeId_timestamp', 'performance_data',
+                    ['nodeId', sa.text('"timestamp" DESC')], unique=False)
+    op.create_index('ix_onchain_data_nodeId_timestamp', 'onchain_data',
+                    ['nodeId', sa.text('"timestamp" DESC')], unique=False)
+    op.create_index('ix_access_logs_userId_timestamp', 'access_logs',
+                    ['userId', sa.text('"timestamp" DESC')], unique=False)
+    op.create_index('ix_performance_rollups_resolution_bucket', 'performance_rollups',
+                    ['resolution', 'bucket'], unique=False)
+
+    if _partitioning_enabled():
+        for table in PARTITIONED_TABLES:
+            _partition(table)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for table in PARTITIONED_TABLES:
+            partitioned = bind.execute(sa.text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table"
+            ), {'table': table}).first()
+            if partitioned is not None:
+                _unpartition(table)
+
+    op.drop_index('ix_performance_rollups_resolution_bucket', table_name='performance_rollups')
+    op.drop_index('ix_access_logs_userId_timestamp', table_name='access_logs')
+    op.drop_index('ix_onchain_data_nodeId_timestamp', table_name='onchain_data')
+    op.drop_index('ix_performance_data_nodeId_timestamp', table_name='performance_data')
@@ -0,0 +1,33 @@
+"""Widen users.password for configurable hash schemes
+
+Revision ID: e2b94f7a1c05
+Revises: c7d1e4f9a2b8
+Create Date: 2026-10-18 12:41:09.307716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b94f7a1c05'
+down_revision = 'c7d1e4f9a2b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # scrypt hashes from werkzeug are ~160 characters
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=128),
+               existing_nullable=False)
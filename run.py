@@ -1,10 +1,16 @@
-#!/usr/bin/env python
-"""
-Script khởi chạy ứng dụng Flask
-"""
-from app import create_app
-
-app = create_app()
-
-if __name__ == '__main__':
+#!/usr/bin/env python
+"""
+Script khởi chạy ứng dụng Flask
+"""
+import os
+
+if __name__ == '__main__':
+    # The development server is a single process: run the background services in it
+    os.environ.setdefault('BACKGROUND_TASKS_ENABLED', 'true')
+
+from app import create_app
+
+app = create_app()
+
+if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,36 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import User
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='bob', password='secret', email='bob@example.com')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def headers(app, user):
+    with app.test_request_context():
+        token = create_access_token(identity=user.id)
+    return {'Authorization': f'Bearer {token}'}
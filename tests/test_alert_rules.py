@@ -0,0 +1,90 @@
+import pytest
+
+from app.models import Alert
+from app.services.alerting import FIRING, OK, RuleState
+
+
+@pytest.mark.parametrize('rule, expected', [
+    ('cpuUsage > 90 for 5m',
+     {'kind': 'threshold', 'metric': 'cpuUsage', 'operator': '>', 'threshold': 90.0, 'duration': 300}),
+    ('memoryUsage<=12.5',
+     {'kind': 'threshold', 'metric': 'memoryUsage', 'operator': '<=', 'threshold': 12.5, 'duration': 0}),
+    ('rate(networkDownUsage) >= 1000000 for 10m',
+     {'kind': 'rate', 'metric': 'networkDownUsage', 'operator': '>=', 'threshold': 1000000.0, 'duration': 600}),
+    ('diskUsage < -1 for 2h',
+     {'kind': 'threshold', 'metric': 'diskUsage', 'operator': '<', 'threshold': -1.0, 'duration': 7200}),
+    ('uptime > 0 for 30',
+     {'kind': 'threshold', 'metric': 'uptime', 'operator': '>', 'threshold': 0.0, 'duration': 30}),
+])
+def test_parse_rule_string(rule, expected):
+    assert Alert.parse_rule({'rule': rule}) == expected
+
+
+def test_parse_rule_fields():
+    rule = Alert.parse_rule({'metric': 'cpuUsage', 'threshold': '75', 'duration': '120', 'kind': 'rate'})
+    assert rule == {'kind': 'rate', 'metric': 'cpuUsage', 'operator': '>', 'threshold': 75.0, 'duration': 120}
+    assert Alert.parse_rule({'message': 'plain note'}) is None
+
+
+@pytest.mark.parametrize('data', [
+    {'rule': 'cpuUsage > ninety'},
+    {'rule': 'cpuUsage == 90'},
+    {'rule': 'cpuUsage > 90 for 5d'},
+    {'rule': 'load > 1'},
+    {'metric': 'cpuUsage'},
+    {'metric': 'cpuUsage', 'threshold': 'high'},
+    {'metric': 'cpuUsage', 'threshold': 1, 'operator': '!='},
+    {'metric': 'cpuUsage', 'threshold': 1, 'kind': 'delta'},
+    {'metric': 'cpuUsage', 'threshold': 1, 'duration': -5},
+])
+def test_parse_rule_rejects_invalid_rules(data):
+    with pytest.raises(ValueError):
+        Alert.parse_rule(data)
+
+
+def rule(kind='threshold', op='>', threshold=90, duration=300, state=OK):
+    return RuleState(1, 1, kind, 'cpuUsage', op, threshold, duration, state)
+
+
+def feed(state, samples):
+    return [state.observe(ts, value) for ts, value in samples]
+
+
+def test_threshold_fires_once_the_condition_held_for_the_duration():
+    state = rule()
+    assert feed(state, [(0, 95), (60, 95), (240, 99)]) == [None, None, None]
+    assert state.observe(300, 95) == FIRING
+    assert state.observe(360, 95) is None
+    assert state.observe(420, 50) == OK
+    assert state.observe(480, 50) is None
+    assert state.state == OK
+
+
+def test_threshold_breach_restarts_after_an_ok_sample():
+    state = rule()
+    assert feed(state, [(0, 95), (200, 50), (300, 95), (500, 95)]) == [None, None, None, None]
+    assert state.observe(600, 95) == FIRING
+
+
+def test_threshold_without_duration_fires_on_the_first_breach():
+    state = rule(op='<', threshold=10, duration=0)
+    assert state.observe(0, 5) == FIRING
+    assert state.observe(1, 10) == OK
+
+
+def test_stored_firing_state_does_not_fire_again():
+    state = rule(state=FIRING)
+    assert feed(state, [(0, 95), (300, 95)]) == [None, None]
+    assert state.observe(360, 10) == OK
+
+
+def test_rate_compares_the_change_per_second_over_the_window():
+    state = rule(kind='rate', threshold=10, duration=60)
+    # Not enough history yet, then exactly 10/s, which is not above the threshold
+    assert feed(state, [(0, 0), (30, 300), (60, 600)]) == [None, None, None]
+    # (1500 - 300) / 60 = 20/s over the last minute
+    assert state.observe(90, 1500) == FIRING
+    assert state.observe(120, 1800) is None
+    # (1850 - 1500) / 60 < 10/s
+    assert state.observe(150, 1850) == OK
+    assert state.window[0] == (90, 1500)
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from app.models import Node
+
+
+def ndjson(*rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows) + '\n'
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    sizes = []
+    original = Node.bulk_create
+
+    def bulk_create(owner_id, rows):
+        sizes.append(len(rows))
+        return original(owner_id, rows)
+
+    monkeypatch.setattr(Node, 'bulk_create', bulk_create)
+    return sizes
+
+
+def post(app, headers, body, mimetype='application/x-ndjson', **query):
+    return app.test_client().post('/api/nodes/bulk', headers=headers, data=body,
+                                  content_type=mimetype, query_string=query)
+
+
+def test_valid_rows_are_inserted_in_batches(app, user, headers, batches):
+    rows = [{'name': f'node-{i}', 'ipAddress': f'10.0.0.{i}', 'portNodeExporter': 9100} for i in range(5)]
+    response = post(app, headers, ndjson(*rows), batch_size=2)
+
+    assert response.status_code == 200
+    assert response.get_json() == {'inserted': 5, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    assert batches == [2, 2, 1]
+    nodes = Node.query.filter_by(ownerId=user.id).order_by(Node.id).all()
+    assert [node.name for node in nodes] == [f'node-{i}' for i in range(5)]
+    assert {node.status for node in nodes} == {'inactive'}
+
+
+def test_invalid_rows_give_207_with_per_row_errors(app, user, headers, batches):
+    body = ndjson(
+        {'name': 'ok-1', 'ipAddress': '10.0.0.1'},
+        '{not json',
+        {'ipAddress': '10.0.0.3'},
+        {'name': 'bad-port', 'ipAddress': '10.0.0.4', 'portPromtail': 70000},
+        {'name': 7, 'ipAddress': '10.0.0.5'},
+        ['not', 'an', 'object'],
+        {'name': 'bad-status', 'ipAddress': '10.0.0.7', 'status': 'up'},
+        {'name': 'ok-2', 'ipAddress': '10.0.0.8', 'status': 'active'},
+    )
+    response = post(app, headers, body, batch_size=10)
+
+    assert response.status_code == 207
+    result = response.get_json()
+    assert result['inserted'] == 2
+    assert result['failed'] == 6
+    assert [error['row'] for error in result['errors']] == [2, 3, 4, 5, 6, 7]
+    assert result['errors'][0]['error'].startswith('Invalid JSON')
+    assert result['errors'][1]['error'] == 'Missing name'
+    assert result['errors'][3]['error'] == 'name must be a string'
+    assert batches == [2]
+    assert sorted(node.name for node in Node.query.filter_by(ownerId=user.id)) == ['ok-1', 'ok-2']
+
+
+def test_a_failed_batch_reports_its_rows_and_keeps_the_others(app, user, headers, monkeypatch):
+    original = Node.bulk_create
+    calls = []
+
+    def bulk_create(owner_id, rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise Exception('Failed to import nodes: database is locked')
+        return original(owner_id, rows)
+
+    monkeypatch.setattr(Node, 'bulk_create', bulk_create)
+    rows = [{'name': f'node-{i}', 'ipAddress': f'10.0.0.{i}'} for i in range(5)]
+    response = post(app, headers, ndjson(*rows), batch_size=2)
+
+    assert response.status_code == 207
+    result = response.get_json()
+    assert result['inserted'] == 3
+    assert [error['row'] for error in result['errors']] == [3, 4]
+    assert Node.query.filter_by(ownerId=user.id).count() == 3
+
+
+def test_csv_rows_with_invalid_utf8_are_reported(app, user, headers):
+    body = b'name,ipAddress,portNodeExporter\nalpha,10.0.0.1,9100\nbeta\xff,10.0.0.2,\ngamma,10.0.0.3,abc\n'
+    response = post(app, headers, body, mimetype='text/csv')
+
+    assert response.status_code == 207
+    result = response.get_json()
+    assert result['inserted'] == 1
+    assert result['errors'] == [
+        {'row': 2, 'error': 'Invalid UTF-8'},
+        {'row': 3, 'error': 'portNodeExporter must be an integer'},
+    ]
+    assert [node.name for node in Node.query.filter_by(ownerId=user.id)] == ['alpha']
+
+
+def test_errors_are_truncated_to_the_configured_maximum(app, headers):
+    app.config['NODES_BULK_MAX_ERRORS'] = 2
+    response = post(app, headers, ndjson(*[{'name': f'n{i}'} for i in range(4)]))
+
+    result = response.get_json()
+    assert response.status_code == 207
+    assert result['failed'] == 4
+    assert len(result['errors']) == 2
+    assert result['errors_truncated'] is True
+
+
+def test_batch_size_must_be_positive(app, headers):
+    assert post(app, headers, ndjson({'name': 'n', 'ipAddress': '10.0.0.1'}), batch_size=0).status_code == 400
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Node
+from app.utils.pagination import decode_cursor, encode_cursor
+
+NAMES = ['b', None, 'a', 'b', None, 'c', 'b', 'a']
+CHECKED = [datetime(2026, 1, 2), None, datetime(2026, 1, 1), datetime(2026, 1, 2),
+           None, datetime(2026, 1, 3), datetime(2026, 1, 2), None]
+
+
+@pytest.fixture
+def nodes(user):
+    nodes = [Node(name=name, ipAddress=f'10.0.0.{i}', ownerId=user.id, last_checked=checked)
+             for i, (name, checked) in enumerate(zip(NAMES, CHECKED))]
+    db.session.add_all(nodes)
+    db.session.commit()
+    return nodes
+
+
+def fetch_all(client, headers, sort, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = {'sort': sort, 'limit': limit}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get('/api/nodes', headers=headers, query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['nodes']) <= limit
+        ids.extend(node['id'] for node in body['nodes'])
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize('sort', Node.SORT_OPTIONS)
+@pytest.mark.parametrize('limit', [1, 2, 3])
+def test_pages_cover_every_node_once_in_a_stable_order(app, headers, nodes, sort, limit):
+    def key(node):
+        value = Node.sort_value(node, sort)
+        return (value, node.id)
+
+    expected = [node.id for node in sorted(nodes, key=key, reverse=sort.startswith('-'))]
+    ids, pages = fetch_all(app.test_client(), headers, sort, limit)
+    assert ids == expected
+    assert pages == -(-len(nodes) // limit)
+
+
+def test_ties_and_null_keys_are_ordered_by_id(app, user, nodes):
+    rows = Node.get_nodes_by_user(user.id, sort='name')
+    assert [(row.name, row.id) for row in rows][:2] == [(None, nodes[1].id), (None, nodes[4].id)]
+    assert [row.id for row in rows if row.name == 'b'] == [nodes[0].id, nodes[3].id, nodes[6].id]
+
+
+def test_keyset_continues_after_a_tie(app, user, nodes):
+    # The cursor sits in the middle of the 'b' group; the rest of it follows
+    after = ('b', nodes[0].id)
+    rows = Node.get_nodes_by_user(user.id, sort='name', after=after)
+    assert [row.id for row in rows] == [nodes[3].id, nodes[6].id, nodes[5].id]
+
+    after = ('', nodes[4].id)
+    rows = Node.get_nodes_by_user(user.id, sort='-name', after=after)
+    assert [row.id for row in rows] == [nodes[1].id]
+
+
+@pytest.mark.parametrize('sort, value', [
+    ('name', 'b'),
+    ('-status', ''),
+    ('last_checked', datetime(2026, 1, 2, 3, 4, 5)),
+    ('id', 7),
+])
+def test_cursor_round_trip(sort, value):
+    assert decode_cursor(encode_cursor(sort, value, 42), sort) == (value, 42)
+
+
+def test_cursor_of_another_sort_is_rejected(app, headers, nodes):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor('name', 'b', 1), '-name')
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor', 'name')
+
+    client = app.test_client()
+    cursor = client.get('/api/nodes', headers=headers,
+                        query_string={'sort': 'name', 'limit': 2}).get_json()['next_cursor']
+    response = client.get('/api/nodes', headers=headers,
+                          query_string={'sort': 'status', 'limit': 2, 'cursor': cursor})
+    assert response.status_code == 400
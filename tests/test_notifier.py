@@ -0,0 +1,119 @@
+import os
+
+os.environ.setdefault('BACKGROUND_TASKS_ENABLED', 'false')
+
+import threading
+import time
+
+import pytest
+
+from app import create_app
+from app.services.notifier import notifier
+from app.utils.mock_telegram import make_server
+from config import Config
+
+TOKEN = '123456:secret-bot-token'
+
+
+def make_config(api_url, **overrides):
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        TELEGRAM_API_URL = api_url
+        TELEGRAM_BOT_TOKEN = TOKEN
+        NOTIFY_COALESCE_MS = 200
+        NOTIFY_RATE_PER_MINUTE = 6000
+        NOTIFY_BURST = 10
+        NOTIFY_MAX_RETRIES = 2
+        NOTIFY_RETRY_BACKOFF = 0.01
+        NOTIFY_RETRY_BACKOFF_MAX = 0.05
+
+    for key, value in overrides.items():
+        setattr(TestConfig, key, value)
+    return TestConfig
+
+
+@pytest.fixture
+def telegram():
+    servers = []
+
+    def start(**options):
+        server = make_server(port=0, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        create_app(make_config(f'http://127.0.0.1:{server.server_port}'))
+        return server
+
+    yield start
+    notifier.stop(timeout=1)
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('timed out')
+        time.sleep(0.01)
+
+
+def test_messages_within_the_window_become_one_digest(telegram):
+    server = telegram()
+    for text in ('disk full', 'cpu high', 'node down'):
+        assert notifier.enqueue('chat-1', text)
+    notifier.enqueue('chat-2', 'other chat')
+
+    wait_for(lambda: len(server.messages) == 2)
+    time.sleep(0.3)
+    assert len(server.messages) == 2
+    digest = next(m for m in server.messages if m['chat_id'] == 'chat-1')
+    assert digest['token'] == TOKEN
+    assert digest['text'] == '3 notifications:\n• disk full\n• cpu high\n• node down'
+    assert next(m for m in server.messages if m['chat_id'] == 'chat-2')['text'] == 'other chat'
+
+
+def test_rate_limited_batch_is_resent_after_retry_after(telegram):
+    server = telegram(rate_per_minute=1)
+    before = notifier.stats()
+    notifier.enqueue('chat-1', 'first')
+    wait_for(lambda: len(server.messages) == 1)
+    # Age the first send so the 429 asks for the shortest retry_after (1 second)
+    server._sent['chat-1'][0] -= 59.5
+    limited_at = time.monotonic()
+    notifier.enqueue('chat-1', 'second')
+
+    wait_for(lambda: len(server.messages) == 2)
+    assert time.monotonic() - limited_at >= 1
+    assert server.messages[1]['text'] == 'second'
+    assert server.requests == 3
+    stats = notifier.stats()
+    assert stats['retries'] - before['retries'] == 1
+    assert stats['failed'] == before['failed']
+
+
+def test_server_errors_are_retried_up_to_max_retries(telegram):
+    server = telegram(fail_every=1)
+    before = notifier.stats()
+    notifier.enqueue('chat-1', 'always fails')
+
+    wait_for(lambda: notifier.stats()['failed'] - before['failed'] == 1)
+    time.sleep(0.2)
+    # The first attempt plus NOTIFY_MAX_RETRIES retries, then the batch is dropped
+    assert server.requests == 3
+    assert server.messages == []
+    assert notifier.stats()['retries'] - before['retries'] == 2
+
+
+def test_connection_errors_do_not_log_the_bot_token(capsys):
+    create_app(make_config('http://127.0.0.1:9', NOTIFY_MAX_RETRIES=0))
+    try:
+        before = notifier.stats()
+        notifier.enqueue('chat-1', 'unreachable')
+        wait_for(lambda: notifier.stats()['failed'] - before['failed'] == 1)
+    finally:
+        notifier.stop(timeout=1)
+    output = capsys.readouterr().out
+    assert 'Telegram request failed' in output
+    assert TOKEN not in output
@@ -0,0 +1,48 @@
+import os
+
+os.environ.setdefault('BACKGROUND_TASKS_ENABLED', 'false')
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import User
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+@pytest.fixture
+def client():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(username='alice', password='secret', email='alice@example.com')
+        db.session.add(user)
+        db.session.commit()
+        with app.test_request_context():
+            token = create_access_token(identity=user.id)
+        yield app.test_client(), {'Authorization': f'Bearer {token}'}
+        db.session.remove()
+        db.drop_all()
+
+
+def test_profile_update_makes_old_etag_stale(client):
+    client, headers = client
+    response = client.get('/auth/profile', headers=headers)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    response = client.get('/auth/profile', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    response = client.put('/auth/profile', headers=headers, json={'email': 'alice@example.org'})
+    assert response.status_code == 200
+
+    response = client.get('/auth/profile', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['email'] == 'alice@example.org'
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Node, User
+from app.services.status_writer import status_writer
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+@pytest.fixture
+def nodes(user):
+    nodes = [
+        Node(name='unchanged', ipAddress='10.0.0.1', ownerId=user.id, status='active',
+             last_checked=NOW - timedelta(minutes=1)),
+        Node(name='changed', ipAddress='10.0.0.2', ownerId=user.id, status='active',
+             last_checked=NOW - timedelta(minutes=1)),
+        Node(name='stale', ipAddress='10.0.0.3', ownerId=user.id, status='active',
+             last_checked=NOW - timedelta(hours=1)),
+    ]
+    db.session.add_all(nodes)
+    db.session.commit()
+    status_writer.prime(db.session.query(Node.id, Node.status, Node.last_checked))
+    return nodes
+
+
+@pytest.fixture
+def node_updates(app):
+    updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE nodes'):
+            updates.extend(parameters if executemany else [parameters])
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield updates
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def test_flush_writes_only_changed_and_stale_rows(app, user, nodes, node_updates):
+    unchanged, changed, stale = nodes
+    before = status_writer.stats()
+    version = user.fleetVersion
+
+    assert status_writer.submit(unchanged.id, 'active', NOW) is False
+    assert status_writer.submit(changed.id, 'inactive', NOW) is True
+    assert status_writer.submit(stale.id, 'active', NOW) is True
+    status_writer.flush()
+
+    assert len(node_updates) == 2
+    assert sorted(params[-1] for params in node_updates) == [changed.id, stale.id]
+    assert status_writer.stats()['written'] - before['written'] == 2
+
+    db.session.expire_all()
+    assert db.session.get(Node, unchanged.id).last_checked == NOW - timedelta(minutes=1)
+    assert db.session.get(Node, changed.id).status == 'inactive'
+    assert db.session.get(Node, changed.id).last_checked == NOW
+    assert db.session.get(Node, stale.id).last_checked == NOW
+    assert db.session.get(User, user.id).fleetVersion != version
+
+
+def test_results_are_coalesced_per_node(app, nodes, node_updates):
+    _, changed, _ = nodes
+    status_writer.submit(changed.id, 'inactive', NOW)
+    status_writer.submit(changed.id, 'active', NOW + timedelta(seconds=5))
+    status_writer.submit(changed.id, 'inactive', NOW + timedelta(seconds=10))
+    status_writer.flush()
+
+    assert len(node_updates) == 1
+    db.session.expire_all()
+    assert db.session.get(Node, changed.id).last_checked == NOW + timedelta(seconds=10)
+
+
+def test_a_flushed_status_is_not_written_again(app, nodes, node_updates):
+    _, changed, _ = nodes
+    status_writer.submit(changed.id, 'inactive', NOW)
+    status_writer.flush()
+    assert status_writer.submit(changed.id, 'inactive', NOW + timedelta(seconds=30)) is False
+    status_writer.flush()
+
+    assert len(node_updates) == 1
+    assert status_writer.stats()['pending'] == 0
+
+
+def test_a_result_back_to_the_stored_status_cancels_the_pending_write(app, nodes, node_updates):
+    unchanged = nodes[0]
+    status_writer.submit(unchanged.id, 'inactive', NOW)
+    status_writer.submit(unchanged.id, 'active', NOW + timedelta(seconds=5))
+    status_writer.flush()
+
+    assert node_updates == []
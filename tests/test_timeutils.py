@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.timeutils import parse_time
+
+
+def test_parse_time_accepts_epoch_and_iso():
+    assert parse_time('0') == datetime(1970, 1, 1)
+    assert parse_time(1700000000) == datetime(2023, 11, 14, 22, 13, 20)
+    assert parse_time('2026-01-01T02:00:00+02:00') == datetime(2026, 1, 1)
+    assert parse_time('2026-01-01T00:00:00Z') == datetime(2026, 1, 1)
+    assert parse_time(None, 'default') == 'default'
+
+
+@pytest.mark.parametrize('value', ['1e20', 'inf', '-inf', 'nan', 'yesterday', {'at': 1}, [1]])
+def test_parse_time_rejects_bad_values_with_value_error(value):
+    with pytest.raises(ValueError, match='Invalid time'):
+        parse_time(value)